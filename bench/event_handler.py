@@ -0,0 +1,121 @@
+"""
+bench/event_handler
+~~~~~~~~~~~~~~~~~~~
+
+Compares receiving a small-request workload as lists of events, dispatched by
+the application with ``isinstance`` checks, against reporting it to an
+``EventHandler``. A client sends many small requests and then receives their
+responses, each a HEADERS frame followed by one small DATA frame that ends
+the stream.
+
+Run with ``python bench/event_handler.py``.
+"""
+from __future__ import annotations
+
+import time
+
+from hpack import Encoder
+from hyperframe.frame import DataFrame, HeadersFrame
+
+from h2.config import H2Configuration
+from h2.connection import H2Connection
+from h2.events import DataReceived, ResponseReceived, StreamEnded
+from h2.handlers import EventHandler
+
+REQUEST_COUNTS = [100, 1000]
+REQUEST_HEADERS = [
+    (":method", "GET"), (":path", "/"),
+    (":scheme", "https"), (":authority", "example.com"),
+]
+RESPONSE_HEADERS = [(":status", "200"), ("content-type", "text/plain")]
+
+
+class CountingHandler(EventHandler):
+    def __init__(self) -> None:
+        self.responses = 0
+        self.bytes = 0
+
+    def on_response(self, stream_id, headers, end_stream) -> None:
+        self.responses += 1
+
+    def on_data(self, stream_id, data, flow_controlled_length, end_stream) -> None:
+        self.bytes += len(data)
+
+
+def _dispatch(events, counts: CountingHandler) -> None:
+    """
+    The application side of the event-list path.
+    """
+    for event in events:
+        if isinstance(event, ResponseReceived):
+            counts.on_response(event.stream_id, event.headers, event.stream_ended is not None)
+        elif isinstance(event, DataReceived):
+            counts.on_data(
+                event.stream_id, event.data, event.flow_controlled_length,
+                event.stream_ended is not None,
+            )
+        elif isinstance(event, StreamEnded):
+            pass
+
+
+def _responses(count: int) -> bytes:
+    encoder = Encoder()
+    chunks = []
+    for i in range(count):
+        headers = HeadersFrame(2 * i + 1)
+        headers.data = encoder.encode(RESPONSE_HEADERS)
+        headers.flags.add("END_HEADERS")
+        data = DataFrame(2 * i + 1)
+        data.data = b"x" * 64
+        data.flags.add("END_STREAM")
+        chunks.append(headers.serialize() + data.serialize())
+    return b"".join(chunks)
+
+
+def _connection(count: int) -> H2Connection:
+    """
+    Builds a client connection with ``count`` requests in flight.
+    """
+    c = H2Connection(config=H2Configuration(client_side=True))
+    c.initiate_connection()
+    c.receive_data(
+        b"\x00\x00\x00\x04\x00\x00\x00\x00\x00" +
+        b"\x00\x00\x00\x04\x01\x00\x00\x00\x00",
+    )
+    c.increment_flow_control_window(2**31 - 1 - 65535)
+    for i in range(count):
+        c.send_headers(2 * i + 1, REQUEST_HEADERS, end_stream=True)
+    c.clear_outbound_data_buffer()
+    return c
+
+
+def bench(count: int, handler: bool, repeat: int = 5) -> float:
+    """
+    Returns the best observed per-response receive time, in nanoseconds.
+    """
+    data = _responses(count)
+    best = float("inf")
+    for _ in range(repeat):
+        c = _connection(count)
+        counts = CountingHandler()
+        start = time.perf_counter()
+        if handler:
+            c.set_event_handler(counts)
+            c.receive_data(data)
+        else:
+            _dispatch(c.receive_data(data), counts)
+        best = min(best, time.perf_counter() - start)
+        assert counts.responses == count
+    return best / count * 1e9
+
+
+def main() -> None:
+    print(f"{'responses':>9} {'events ns':>10} {'handler ns':>11}")  # noqa: T201
+    for count in REQUEST_COUNTS:
+        events = bench(count, handler=False)
+        handler = bench(count, handler=True)
+        print(f"{count:>9} {events:>10.0f} {handler:>11.0f}")  # noqa: T201
+
+
+if __name__ == "__main__":
+    main()
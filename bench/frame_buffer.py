@@ -0,0 +1,59 @@
+"""
+bench/frame_buffer
+~~~~~~~~~~~~~~~~~~
+
+Measures the per-frame cost of parsing received data as the size of a single
+``receive_data`` call grows. The cost per frame should stay flat: parsing a
+frame must not depend on how much data is still waiting behind it.
+
+Run with ``python bench/frame_buffer.py``.
+"""
+from __future__ import annotations
+
+import time
+
+from hyperframe.frame import DataFrame
+
+from h2.frame_buffer import FrameBuffer
+
+FRAME_PAYLOAD = b"x" * 64
+READ_SIZES = [2**14, 2**16, 2**18, 2**20, 2**22]
+
+
+def _frames_for(read_size: int) -> tuple[bytes, int]:
+    f = DataFrame(1)
+    f.data = FRAME_PAYLOAD
+    frame = f.serialize()
+    count = read_size // len(frame)
+    return frame * count, count
+
+
+def bench_read(read_size: int, repeat: int = 3) -> float:
+    """
+    Returns the best observed per-frame parse time, in nanoseconds, for a
+    single read of ``read_size`` bytes full of small DATA frames.
+    """
+    data, count = _frames_for(read_size)
+    best = float("inf")
+    for _ in range(repeat):
+        buffer = FrameBuffer(server=False)
+        buffer.max_frame_size = 2**14
+        start = time.perf_counter()
+        buffer.add_data(data)
+        for _ in buffer:
+            pass
+        best = min(best, time.perf_counter() - start)
+
+    return best / count * 1e9
+
+
+def main() -> None:
+    print(f"{'read size':>12} {'frames':>8} {'ns/frame':>10}")  # noqa: T201
+    for read_size in READ_SIZES:
+        _, count = _frames_for(read_size)
+        per_frame = bench_read(read_size)
+        print(f"{read_size:>12} {count:>8} {per_frame:>10.0f}")  # noqa: T201
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+bench/scheduling
+~~~~~~~~~~~~~~~~
+
+Measures how fairly 1,000 concurrent downloads share a connection, when their
+data is buffered with ``send_data_buffered`` and the connection window opens
+by a fixed amount per tick. Most downloads are small and a few are large, and
+they are started in an interleaved order.
+
+Compares the default deficit round-robin scheduler against sending each
+stream's data in the order it was buffered, which is what a loop over the
+streams calling ``send_data`` does. Reports the completion time of the small
+downloads, in ticks, and Jain's fairness index of the per-stream throughput.
+
+Run with ``python bench/scheduling.py``.
+"""
+from __future__ import annotations
+
+import statistics
+import time
+
+from hyperframe.frame import HeadersFrame, SettingsFrame, WindowUpdateFrame
+
+from h2.config import H2Configuration
+from h2.connection import H2Connection
+from h2.scheduling import DeficitRoundRobinScheduler, Scheduler
+from h2.settings import SettingCodes
+
+STREAM_COUNT = 1000
+SMALL_SIZE = 16 * 1024
+LARGE_SIZE = 256 * 1024
+LARGE_EVERY = 10
+TICK_BYTES = 64 * 1024
+
+
+class FifoScheduler(Scheduler):
+    """
+    Sends each stream's data in full before moving on to the next stream.
+    """
+
+    def __init__(self) -> None:
+        self.streams: dict[int, object] = {}
+
+    def add_stream(self, stream) -> None:
+        self.streams.setdefault(stream.stream_id, stream)
+
+    def next_frames(self, budget_bytes) -> list:
+        frames = []
+        for stream_id, stream in list(self.streams.items()):
+            if not budget_bytes:
+                break
+            length = stream.buffered_data_length
+            frames.extend(stream.send_buffered_data(
+                min(budget_bytes, stream.outbound_flow_control_window),
+            ))
+            budget_bytes -= length - stream.buffered_data_length
+            if not stream.has_buffered_data:
+                del self.streams[stream_id]
+        return frames
+
+
+def _connection(scheduler: Scheduler) -> tuple[H2Connection, dict[int, int]]:
+    """
+    Builds a server connection with every download's body buffered. Returns
+    it with the size of each download.
+    """
+    c = H2Connection(config=H2Configuration(client_side=False))
+    c.initiate_connection()
+    c.set_scheduler(scheduler)
+    c.update_settings({SettingCodes.MAX_CONCURRENT_STREAMS: STREAM_COUNT})
+
+    settings = SettingsFrame(0)
+    settings.settings = {SettingCodes.INITIAL_WINDOW_SIZE: 2**31 - 1}
+    settings_ack = SettingsFrame(0)
+    settings_ack.flags.add("ACK")
+    data = [
+        b"PRI * HTTP/2.0\r\n\r\nSM\r\n\r\n",
+        settings.serialize(),
+        settings_ack.serialize(),
+    ]
+    for i in range(STREAM_COUNT):
+        headers = HeadersFrame(i * 2 + 1)
+        headers.data = c.encoder.encode([
+            (":method", "GET"), (":path", f"/{i}"),
+            (":scheme", "https"), (":authority", "example.com"),
+        ])
+        headers.flags.add("END_HEADERS")
+        headers.flags.add("END_STREAM")
+        data.append(headers.serialize())
+    c.receive_data(b"".join(data))
+
+    sizes = {}
+    for i in range(STREAM_COUNT):
+        stream_id = i * 2 + 1
+        sizes[stream_id] = LARGE_SIZE if i % LARGE_EVERY == 0 else SMALL_SIZE
+        c.send_headers(stream_id, [(":status", "200")])
+    for stream_id, size in sizes.items():
+        c.send_data_buffered(stream_id, b"x" * size, end_stream=True)
+    c.clear_outbound_data_buffer()
+    return c, sizes
+
+
+def run(scheduler: Scheduler) -> tuple[dict[int, int], dict[int, int], float]:
+    """
+    Opens the connection window a tick at a time until every download has
+    finished. Returns the sizes of the downloads, the tick on which each one
+    finished and the time taken.
+    """
+    c, sizes = _connection(scheduler)
+    streams = {stream_id: c.streams[stream_id] for stream_id in sizes}
+    finished: dict[int, int] = {}
+    window_update = WindowUpdateFrame(0)
+    window_update.window_increment = TICK_BYTES
+    window_update_data = window_update.serialize()
+
+    tick = 0
+    start = time.perf_counter()
+    while streams:
+        tick += 1
+        c.receive_data(window_update_data)
+        c.clear_outbound_data_buffer()
+        for stream_id, stream in list(streams.items()):
+            if stream.closed:
+                finished[stream_id] = tick
+                del streams[stream_id]
+    return sizes, finished, time.perf_counter() - start
+
+
+def jain(values: list[float]) -> float:
+    """
+    Jain's fairness index: 1 when every value is the same, 1/n when one value
+    has everything.
+    """
+    return sum(values) ** 2 / (len(values) * sum(v * v for v in values))
+
+
+def main() -> None:
+    print(  # noqa: T201
+        f"{'scheduler':>10} {'small p50':>10} {'small p99':>10} "
+        f"{'large p50':>10} {'last':>6} {'fairness':>9} {'time s':>7}",
+    )
+    for name, scheduler in (
+        ("fifo", FifoScheduler()),
+        ("drr", DeficitRoundRobinScheduler()),
+    ):
+        sizes, finished, elapsed = run(scheduler)
+        small = sorted(t for s, t in finished.items() if sizes[s] == SMALL_SIZE)
+        large = sorted(t for s, t in finished.items() if sizes[s] != SMALL_SIZE)
+        throughput = [sizes[s] / t for s, t in finished.items()]
+        print(  # noqa: T201
+            f"{name:>10} {statistics.median(small):>10.0f} "
+            f"{small[int(len(small) * 0.99)]:>10} "
+            f"{statistics.median(large):>10.0f} {max(finished.values()):>6} "
+            f"{jain(throughput):>9.3f} {elapsed:>7.2f}",
+        )
+
+
+if __name__ == "__main__":
+    main()
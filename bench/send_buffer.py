@@ -0,0 +1,76 @@
+"""
+bench/send_buffer
+~~~~~~~~~~~~~~~~~
+
+Measures draining a large outbound backlog in socket-sized pieces with
+``data_to_send(amount)``, comparing the chunk queue against the previous
+contiguous ``bytearray`` buffer, which copied the whole remainder on every
+partial read.
+
+Run with ``python bench/send_buffer.py``.
+"""
+from __future__ import annotations
+
+import time
+
+from hyperframe.frame import DataFrame
+
+from h2.send_buffer import SendBuffer
+
+BACKLOG_SIZE = 64 * 2**20
+READ_SIZE = 64 * 2**10
+FRAME_SIZE = 2**14
+
+
+def _frames() -> list[DataFrame]:
+    payload = b"x" * FRAME_SIZE
+    frames = []
+    for _ in range(BACKLOG_SIZE // FRAME_SIZE):
+        f = DataFrame(1)
+        f.data = payload
+        frames.append(f)
+    return frames
+
+
+def _drain_bytearray(frames: list[DataFrame]) -> int:
+    """
+    The reference implementation: one bytearray, re-sliced on every read.
+    """
+    buffer = bytearray(b"".join(f.serialize() for f in frames))
+    reads = 0
+    while buffer:
+        bytes(buffer[:READ_SIZE])
+        buffer = buffer[READ_SIZE:]
+        reads += 1
+    return reads
+
+
+def _drain_send_buffer(frames: list[DataFrame]) -> int:
+    buffer = SendBuffer()
+    buffer.write_frames(frames)
+    reads = 0
+    while len(buffer):
+        buffer.read(READ_SIZE)
+        reads += 1
+    return reads
+
+
+def _best(func, frames: list[DataFrame], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(frames)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    frames = _frames()
+    reference = _best(_drain_bytearray, frames, repeat=1)
+    chunked = _best(_drain_send_buffer, frames, repeat=3)
+    print(f"{'bytearray s':>12} {'chunk queue s':>14}")  # noqa: T201
+    print(f"{reference:>12.3f} {chunked:>14.3f}")  # noqa: T201
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+bench/skip_filters
+~~~~~~~~~~~~~~~~~~
+
+Measures how quickly WINDOW_UPDATE frames for reset streams are dropped when
+the frame buffer's skip filter drops them without parsing, against parsing and
+dispatching them, for single reads carrying between 1k and 100k frames.
+
+Run with ``python bench/skip_filters.py``.
+"""
+from __future__ import annotations
+
+import time
+
+from hyperframe.frame import HeadersFrame, WindowUpdateFrame
+
+from h2.config import H2Configuration
+from h2.connection import H2Connection
+
+FRAME_COUNTS = [1000, 10000, 100000]
+
+
+def _reset_stream_connection(skip: bool) -> tuple[H2Connection, bytes]:
+    """
+    Builds a server connection with a stream that has been reset and cleaned
+    up, and returns it along with the client preamble and request.
+    """
+    c = H2Connection(config=H2Configuration(client_side=False))
+    c.initiate_connection()
+    headers = HeadersFrame(1)
+    headers.data = c.encoder.encode([
+        (":method", "GET"), (":path", "/"),
+        (":scheme", "https"), (":authority", "example.com"),
+    ])
+    headers.flags.add("END_HEADERS")
+    c.receive_data(b"PRI * HTTP/2.0\r\n\r\nSM\r\n\r\n" + b"\x00\x00\x00\x04\x00\x00\x00\x00\x00" + headers.serialize())
+    c.reset_stream(1)
+    c.clear_outbound_data_buffer()
+    if not skip:
+        c.incoming_buffer.skip_filters.clear()
+
+    wu = WindowUpdateFrame(1)
+    wu.window_increment = 1024
+    return c, wu.serialize()
+
+
+def main() -> None:
+    print(f"{'frames':>8} {'dispatched ns':>14} {'skipped ns':>11}")  # noqa: T201
+    for count in FRAME_COUNTS:
+        results = []
+        for skip in (False, True):
+            c, frame = _reset_stream_connection(skip)
+            start = time.perf_counter()
+            c.receive_data(frame * count)
+            results.append((time.perf_counter() - start) / count * 1e9)
+        print(f"{count:>8} {results[0]:>14.0f} {results[1]:>11.0f}")  # noqa: T201
+
+
+if __name__ == "__main__":
+    main()
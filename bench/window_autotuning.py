@@ -0,0 +1,123 @@
+"""
+bench/window_autotuning
+~~~~~~~~~~~~~~~~~~~~~~~
+
+Simulates one large download over a link with a fixed delay and bandwidth,
+between a client and a server connection that exchange bytes a tick (one
+millisecond) at a time. The client acknowledges data as soon as it receives
+it.
+
+Compares the default flow control windows, which cap the throughput at one
+window per round trip, against the client tuning its windows automatically
+with ``window_autotuning_ceiling``, both with the default window strategy and
+with one that updates the windows once a quarter of them has been processed,
+as gRPC does. Reports the time the download took, in ticks, the throughput,
+and the largest inbound window the client reached.
+
+Run with ``python bench/window_autotuning.py``.
+"""
+from __future__ import annotations
+
+import time
+from collections import deque
+
+from h2.config import H2Configuration
+from h2.connection import H2Connection
+from h2.events import DataReceived, RequestReceived, StreamEnded
+from h2.windows import DEFAULT_WINDOW_STRATEGY, RatioWindowStrategy, WindowStrategy
+
+DOWNLOAD_SIZE = 16 * 1024 * 1024
+ONE_WAY_DELAY = 25
+LINK_BYTES_PER_TICK = 128 * 1024
+CEILING = 16 * 1024 * 1024
+
+
+class Link:
+    """
+    One direction of the link: bytes sent on a tick arrive ``ONE_WAY_DELAY``
+    ticks later, and at most ``LINK_BYTES_PER_TICK`` are sent per tick.
+    """
+
+    def __init__(self) -> None:
+        self.in_flight: deque[tuple[int, bytes]] = deque()
+
+    def send(self, tick: int, conn: H2Connection) -> None:
+        data = conn.data_to_send(LINK_BYTES_PER_TICK)
+        if data:
+            self.in_flight.append((tick + ONE_WAY_DELAY, data))
+
+    def deliver(self, tick: int) -> bytes:
+        data = []
+        while self.in_flight and self.in_flight[0][0] <= tick:
+            data.append(self.in_flight.popleft()[1])
+        return b"".join(data)
+
+
+def run(ceiling: int | None, strategy: WindowStrategy) -> tuple[int, int, float]:
+    """
+    Runs the download. Returns the tick on which it finished, the largest
+    inbound window of the client and the time taken.
+    """
+    client = H2Connection(config=H2Configuration(
+        window_autotuning_ceiling=ceiling, window_strategy=strategy,
+    ))
+    server = H2Connection(config=H2Configuration(client_side=False))
+    client.initiate_connection()
+    server.initiate_connection()
+    client.send_headers(1, [
+        (":method", "GET"), (":path", "/"),
+        (":scheme", "https"), (":authority", "example.com"),
+    ], end_stream=True)
+
+    upstream, downstream = Link(), Link()
+    remaining = None
+    largest_window = 0
+    tick = 0
+    start = time.perf_counter()
+    while True:
+        tick += 1
+        for event in server.receive_data(upstream.deliver(tick)):
+            if isinstance(event, RequestReceived):
+                server.send_headers(1, [(":status", "200")])
+                remaining = DOWNLOAD_SIZE
+
+        while remaining:
+            size = min(
+                remaining,
+                server.local_flow_control_window(1),
+                server.max_outbound_frame_size,
+            )
+            if not size:
+                break
+            remaining -= size
+            server.send_data(1, b"x" * size, end_stream=not remaining)
+
+        for event in client.receive_data(downstream.deliver(tick)):
+            if isinstance(event, DataReceived):
+                client.acknowledge_received_data(event.flow_controlled_length, 1)
+            elif isinstance(event, StreamEnded):
+                return tick, largest_window, time.perf_counter() - start
+        largest_window = max(largest_window, client.local_settings.initial_window_size)
+
+        upstream.send(tick, client)
+        downstream.send(tick, server)
+
+
+def main() -> None:
+    print(  # noqa: T201
+        f"{'windows':>16} {'ticks':>7} {'MB/s':>7} {'window':>10} {'time s':>7}",
+    )
+    for name, ceiling, strategy in (
+        ("default", None, DEFAULT_WINDOW_STRATEGY),
+        ("autotuned", CEILING, DEFAULT_WINDOW_STRATEGY),
+        ("autotuned, 1/4", CEILING, RatioWindowStrategy(0.25)),
+    ):
+        ticks, window, elapsed = run(ceiling, strategy)
+        throughput = DOWNLOAD_SIZE / ticks / 1000
+        print(  # noqa: T201
+            f"{name:>16} {ticks:>7} {throughput:>7.1f} {window:>10} {elapsed:>7.2f}",
+        )
+
+
+if __name__ == "__main__":
+    main()
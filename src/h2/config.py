@@ -9,6 +9,9 @@ from __future__ import annotations
 import sys
 from typing import Any
 
+from .frame_buffer import CONTINUATION_BACKLOG
+from .windows import DEFAULT_WINDOW_STRATEGY, WindowStrategy
+
 
 class _BooleanConfigOption:
     """
@@ -30,6 +33,52 @@ class _BooleanConfigOption:
         setattr(instance, self.attr_name, value)
 
 
+class _IntegerConfigOption:
+    """
+    Descriptor for handling an integer config option. This will block
+    attempts to set such options to anything other than an integer that is at
+    least ``minimum``.
+    """
+
+    def __init__(self, name: str, minimum: int = 1) -> None:
+        self.name = name
+        self.attr_name = f"_{self.name}"
+        self.minimum = minimum
+
+    def __get__(self, instance: Any, owner: Any) -> int:
+        return getattr(instance, self.attr_name)  # type: ignore
+
+    def __set__(self, instance: Any, value: int) -> None:
+        if not isinstance(value, int) or isinstance(value, bool) or value < self.minimum:
+            msg = f"{self.name} must be an integer of at least {self.minimum}"
+            raise ValueError(msg)
+        setattr(instance, self.attr_name, value)
+
+
+class _OptionalIntegerConfigOption:
+    """
+    Descriptor for handling an integer config option that may also be
+    ``None``. This will block attempts to set such options to anything other
+    than ``None`` or an integer that is at least ``minimum``.
+    """
+
+    def __init__(self, name: str, minimum: int = 1) -> None:
+        self.name = name
+        self.attr_name = f"_{self.name}"
+        self.minimum = minimum
+
+    def __get__(self, instance: Any, owner: Any) -> int | None:
+        return getattr(instance, self.attr_name)  # type: ignore
+
+    def __set__(self, instance: Any, value: int | None) -> None:
+        if value is not None and (
+            not isinstance(value, int) or isinstance(value, bool) or value < self.minimum
+        ):
+            msg = f"{self.name} must be None or an integer of at least {self.minimum}"
+            raise ValueError(msg)
+        setattr(instance, self.attr_name, value)
+
+
 class DummyLogger:
     """
     A Logger object that does not actual logging, hence a DummyLogger.
@@ -88,6 +137,8 @@ class H2Configuration:
     This object has very little behaviour of its own: it mostly just ensures
     that configuration is self-consistent.
 
+    The parameters from ``max_frames_per_receive`` onwards are keyword-only.
+
     :param client_side: Whether this object is to be used on the client side of
         a connection, or on the server side. Affects the logic used by the
         state machine, the default settings values, the allowable stream IDs,
@@ -149,6 +200,140 @@ class H2Configuration:
         .. versionadded:: 2.6.0
 
     :type logger: ``logging.Logger``
+
+    :param max_frames_per_receive: The most frames that a single call to
+        :meth:`receive_data <h2.connection.H2Connection.receive_data>` (or
+        one of its siblings) will process. Any further complete frames are
+        left in the receive buffer, to be processed by a later call. Defaults
+        to ``None``, meaning no limit.
+
+        .. versionadded:: 4.3.0
+
+    :type max_frames_per_receive: ``int`` or ``None``
+
+    :param max_bytes_per_receive: Once a single call to :meth:`receive_data
+        <h2.connection.H2Connection.receive_data>` (or one of its siblings)
+        has processed frames totalling at least this many bytes, it stops and
+        leaves any further frames in the receive buffer. Defaults to ``None``,
+        meaning no limit.
+
+        .. versionadded:: 4.3.0
+
+    :type max_bytes_per_receive: ``int`` or ``None``
+
+    :param max_header_block_frames: The most frames that a received header
+        block may be split across, counting the HEADERS or PUSH_PROMISE frame
+        as well as the CONTINUATION frames. Defaults to 64.
+
+        .. versionadded:: 4.3.0
+
+    :type max_header_block_frames: ``int``
+
+    :param max_header_block_size: The largest received header block, in
+        bytes, that may be assembled from CONTINUATION frames. Larger blocks
+        are treated as a denial of service attempt as soon as they exceed the
+        limit. Defaults to ``None``, meaning a limit derived from the local
+        value of ``SETTINGS_MAX_HEADER_LIST_SIZE``.
+
+        .. versionadded:: 4.3.0
+
+    :type max_header_block_size: ``int`` or ``None``
+
+    :param outbound_buffer_high_watermark: Once the outbound data buffer
+        holds at least this many bytes, :data:`outbound_buffer_full
+        <h2.connection.H2Connection.outbound_buffer_full>` becomes ``True``,
+        until the buffer has been drained down to the low watermark. Defaults
+        to ``None``, meaning the buffer is never considered full.
+
+        .. versionadded:: 4.3.0
+
+    :type outbound_buffer_high_watermark: ``int`` or ``None``
+
+    :param outbound_buffer_low_watermark: The size, in bytes, that a full
+        outbound data buffer must be drained down to before it is no longer
+        considered full. Defaults to ``None``, meaning half of the high
+        watermark.
+
+        .. versionadded:: 4.3.0
+
+    :type outbound_buffer_low_watermark: ``int`` or ``None``
+
+    :param strict_outbound_buffer: Whether :meth:`send_data
+        <h2.connection.H2Connection.send_data>` refuses to add data to a full
+        outbound data buffer, raising :class:`OutboundBufferFullError
+        <h2.exceptions.OutboundBufferFullError>`. Defaults to ``False``.
+
+        .. versionadded:: 4.3.0
+
+    :type strict_outbound_buffer: ``bool``
+
+    :param data_coalescing_threshold: Payloads passed to :meth:`send_data
+        <h2.connection.H2Connection.send_data>` that are smaller than this
+        many bytes, and not padded, are held back and merged with the next
+        ones on the same stream into a single DATA frame. The frame is sent
+        once it holds at least this many bytes, when the stream is ended or
+        another DATA, HEADERS or PUSH_PROMISE frame is sent on it, or when
+        :meth:`flush_data <h2.connection.H2Connection.flush_data>` is called.
+        It is discarded if the stream is reset. Defaults to ``None``, meaning
+        payloads are never held back.
+
+        .. versionadded:: 4.3.0
+
+    :type data_coalescing_threshold: ``int`` or ``None``
+
+    :param window_strategy: The strategy that decides when the inbound flow
+        control windows of the connection and its streams are updated, as
+        received data is acknowledged with :meth:`acknowledge_received_data
+        <h2.connection.H2Connection.acknowledge_received_data>`. It can be
+        changed for the connection or a single stream with
+        :meth:`set_window_strategy
+        <h2.connection.H2Connection.set_window_strategy>`. Defaults to a
+        :class:`HalfWindowStrategy <h2.windows.HalfWindowStrategy>`.
+
+        .. versionadded:: 4.3.0
+
+    :type window_strategy: :class:`WindowStrategy <h2.windows.WindowStrategy>`
+
+    :param window_autotuning_ceiling: Enables automatic tuning of the inbound
+        flow control windows, growing them to this many bytes at most. While
+        data is received, PINGs are sent to measure how much data arrives
+        per round trip, and when the windows are limiting that, the
+        connection window is grown with a WINDOW_UPDATE frame and the stream
+        windows with ``SETTINGS_INITIAL_WINDOW_SIZE``. The acknowledgements
+        of these PINGs do not cause :class:`PingAckReceived
+        <h2.events.PingAckReceived>` events. The windows only grow while
+        data is acknowledged promptly, and grow faster with a window strategy
+        that updates them early, such as a :class:`RatioWindowStrategy
+        <h2.windows.RatioWindowStrategy>` with a ratio of 0.25. Increments
+        that the application makes to the connection window itself are taken
+        into account. Defaults to ``None``, meaning the windows are not tuned.
+
+        .. versionadded:: 4.3.0
+
+    :type window_autotuning_ceiling: ``int`` or ``None``
+
+    :param auto_acknowledge_received_data: Whether received data is
+        acknowledged automatically as it is received, as if by
+        :meth:`acknowledge_received_data
+        <h2.connection.H2Connection.acknowledge_received_data>`, so that the
+        application does not have to. The window strategy still decides when
+        WINDOW_UPDATE frames are emitted. Defaults to ``False``.
+
+        .. versionadded:: 4.3.0
+
+    :type auto_acknowledge_received_data: ``bool``
+
+    :param auto_acknowledge_stream_budget: When received data is acknowledged
+        automatically, only the first this many flow controlled bytes of each
+        stream are. The application must acknowledge the rest itself with
+        :meth:`acknowledge_received_data
+        <h2.connection.H2Connection.acknowledge_received_data>`, which lets it
+        apply backpressure. Defaults to ``None``, meaning all received data is
+        acknowledged.
+
+        .. versionadded:: 4.3.0
+
+    :type auto_acknowledge_stream_budget: ``int`` or ``None``
     """
 
     client_side = _BooleanConfigOption("client_side")
@@ -167,6 +352,37 @@ class H2Configuration:
     normalize_inbound_headers = _BooleanConfigOption(
         "normalize_inbound_headers",
     )
+    max_frames_per_receive = _OptionalIntegerConfigOption(
+        "max_frames_per_receive",
+    )
+    max_bytes_per_receive = _OptionalIntegerConfigOption(
+        "max_bytes_per_receive",
+    )
+    max_header_block_frames = _IntegerConfigOption(
+        "max_header_block_frames",
+    )
+    max_header_block_size = _OptionalIntegerConfigOption(
+        "max_header_block_size",
+    )
+    outbound_buffer_high_watermark = _OptionalIntegerConfigOption(
+        "outbound_buffer_high_watermark",
+    )
+    outbound_buffer_low_watermark = _OptionalIntegerConfigOption(
+        "outbound_buffer_low_watermark", minimum=0,
+    )
+    strict_outbound_buffer = _BooleanConfigOption("strict_outbound_buffer")
+    data_coalescing_threshold = _OptionalIntegerConfigOption(
+        "data_coalescing_threshold",
+    )
+    window_autotuning_ceiling = _OptionalIntegerConfigOption(
+        "window_autotuning_ceiling",
+    )
+    auto_acknowledge_received_data = _BooleanConfigOption(
+        "auto_acknowledge_received_data",
+    )
+    auto_acknowledge_stream_budget = _OptionalIntegerConfigOption(
+        "auto_acknowledge_stream_budget", minimum=0,
+    )
 
     def __init__(self,
                  client_side: bool = True,
@@ -176,7 +392,20 @@ class H2Configuration:
                  split_outbound_cookies: bool = False,
                  validate_inbound_headers: bool = True,
                  normalize_inbound_headers: bool = True,
-                 logger: DummyLogger | OutputLogger | None = None) -> None:
+                 logger: DummyLogger | OutputLogger | None = None,
+                 *,
+                 max_frames_per_receive: int | None = None,
+                 max_bytes_per_receive: int | None = None,
+                 max_header_block_frames: int = CONTINUATION_BACKLOG,
+                 max_header_block_size: int | None = None,
+                 outbound_buffer_high_watermark: int | None = None,
+                 outbound_buffer_low_watermark: int | None = None,
+                 strict_outbound_buffer: bool = False,
+                 data_coalescing_threshold: int | None = None,
+                 window_strategy: WindowStrategy = DEFAULT_WINDOW_STRATEGY,
+                 window_autotuning_ceiling: int | None = None,
+                 auto_acknowledge_received_data: bool = False,
+                 auto_acknowledge_stream_budget: int | None = None) -> None:
         self.client_side = client_side
         self.header_encoding = header_encoding
         self.validate_outbound_headers = validate_outbound_headers
@@ -185,6 +414,18 @@ class H2Configuration:
         self.validate_inbound_headers = validate_inbound_headers
         self.normalize_inbound_headers = normalize_inbound_headers
         self.logger = logger or DummyLogger(__name__)
+        self.max_frames_per_receive = max_frames_per_receive
+        self.max_bytes_per_receive = max_bytes_per_receive
+        self.max_header_block_frames = max_header_block_frames
+        self.max_header_block_size = max_header_block_size
+        self.outbound_buffer_high_watermark = outbound_buffer_high_watermark
+        self.outbound_buffer_low_watermark = outbound_buffer_low_watermark
+        self.strict_outbound_buffer = strict_outbound_buffer
+        self.data_coalescing_threshold = data_coalescing_threshold
+        self.window_strategy = window_strategy
+        self.window_autotuning_ceiling = window_autotuning_ceiling
+        self.auto_acknowledge_received_data = auto_acknowledge_received_data
+        self.auto_acknowledge_stream_budget = auto_acknowledge_stream_budget
 
     @property
     def header_encoding(self) -> bool | str | None:
@@ -210,3 +451,23 @@ class H2Configuration:
             msg = "header_encoding cannot be True"
             raise ValueError(msg)
         self._header_encoding = value
+
+    @property
+    def window_strategy(self) -> WindowStrategy:
+        """
+        The strategy that decides when the inbound flow control windows of the
+        connection and its streams are updated.
+
+        .. versionadded:: 4.3.0
+        """
+        return self._window_strategy
+
+    @window_strategy.setter
+    def window_strategy(self, value: WindowStrategy) -> None:
+        """
+        Enforces constraints on the value of the window strategy.
+        """
+        if not isinstance(value, WindowStrategy):
+            msg = "window_strategy must be a WindowStrategy"
+            raise ValueError(msg)  # noqa: TRY004
+        self._window_strategy = value
@@ -39,6 +39,7 @@ from .events import (
     PingAckReceived,
     PingReceived,
     PriorityUpdated,
+    PriorityUpdateReceived,
     RemoteSettingsChanged,
     RequestReceived,
     ResponseReceived,
@@ -50,26 +51,37 @@ from .events import (
 from .exceptions import (
     DenialOfServiceError,
     FlowControlError,
+    FrameDataMissingError,
     FrameTooLargeError,
     NoAvailableStreamIDError,
     NoSuchStreamError,
+    OutboundBufferFullError,
     ProtocolError,
     RFC1122Error,
     StreamClosedError,
     StreamIDTooLowError,
     TooManyStreamsError,
 )
-from .frame_buffer import FrameBuffer
+from .frame_buffer import FrameBuffer, ReceivedDataFrame
+from .priority import DEFAULT_URGENCY, PRIORITY_UPDATE_FRAME_TYPE, parse_priority_field, priority_field_value
+from .scheduling import DeficitRoundRobinScheduler, Scheduler
+from .send_buffer import SendBuffer
 from .settings import ChangedSetting, SettingCodes, Settings
 from .stream import H2Stream, StreamClosedBy
 from .utilities import SizeLimitDict, guard_increment_window
-from .windows import WindowManager
+from .windows import BDPEstimator, WindowManager, WindowStrategy
 
 if TYPE_CHECKING:  # pragma: no cover
-    from collections.abc import Iterable
+    from collections.abc import Iterable, Iterator
 
     from hpack.struct import Header, HeaderWeaklyTyped
 
+    from .handlers import EventHandler
+
+# The opaque data of the PINGs sent to probe the bandwidth-delay product when
+# the inbound windows are tuned automatically.
+_BDP_PING_DATA = b"h2bdpest"
+
 
 class ConnectionState(Enum):
     IDLE = 0
@@ -317,9 +329,19 @@ class H2Connection:
     # The initial default value of SETTINGS_MAX_HEADER_LIST_SIZE.
     DEFAULT_MAX_HEADER_LIST_SIZE = 2**16
 
+    # Unless configured otherwise, a header block assembled from CONTINUATION
+    # frames may be at most this many times SETTINGS_MAX_HEADER_LIST_SIZE.
+    # HPACK's Huffman code expands an octet to at most 30 bits, so no header
+    # list within the limit needs a larger block.
+    HEADER_BLOCK_SIZE_FACTOR = 4
+
     # Keep in memory limited amount of results for streams closes
     MAX_CLOSED_STREAMS = 2**16
 
+    # The number of RFC 9218 PRIORITY_UPDATE frames for streams that have not
+    # been opened yet that are kept until the streams are opened.
+    MAX_PENDING_PRIORITY_UPDATES = 100
+
     def __init__(self, config: H2Configuration | None = None) -> None:
         self.state_machine = H2ConnectionStateMachine()
         self.streams: dict[int, H2Stream] = {}
@@ -376,13 +398,59 @@ class H2Connection:
 
         # Buffer for incoming data.
         self.incoming_buffer = FrameBuffer(server=not self.config.client_side)
+        self.incoming_buffer.skip_filters[WindowUpdateFrame.type] = (
+            self._skip_window_update_frame
+        )
+        self.incoming_buffer.decode_data_frames = True
+
+        # The object that events are reported to, if events are not being
+        # returned from the receive methods.
+        self._event_handler: EventHandler | None = None
+
+        # The arguments for the event handler's on_data call for the DATA
+        # frame that was just received, when it was received without building
+        # any events.
+        self._handler_data: tuple[int, bytes, int, bool] | None = None
 
         # A private variable to store a sequence of received header frames
         # until completion.
         self._header_frames: list[Frame] = []
 
         # Data that needs to be sent.
-        self._data_to_send = bytearray()
+        self._send_buffer = SendBuffer()
+        high_watermark = self.config.outbound_buffer_high_watermark
+        if high_watermark is not None:
+            low_watermark = self.config.outbound_buffer_low_watermark
+            if low_watermark is None:
+                low_watermark = high_watermark // 2
+            self._send_buffer.high_watermark = high_watermark
+            self._send_buffer.low_watermark = min(low_watermark, high_watermark)
+
+        # The frames held back while the connection is corked, and the number
+        # of calls to cork that have not yet been matched by uncork.
+        self._corked_frames: list[Frame] = []
+        self._cork_depth = 0
+
+        # The payloads held back by data coalescing for each stream, waiting
+        # to be sent as one DATA frame.
+        self._pending_data: dict[int, bytearray] = {}
+
+        # While a receive call is processing frames, the WINDOW_UPDATE
+        # increments it produces for each stream, summed, to be sent once the
+        # frames have been processed.
+        self._deferred_window_updates: dict[int, int] | None = None
+
+        #: The number of DATA frames that have not had to be sent because
+        #: their payloads were merged into other frames by data coalescing.
+        #: See the ``data_coalescing_threshold`` option of
+        #: :class:`H2Configuration <h2.config.H2Configuration>`.
+        #:
+        #: .. versionadded:: 4.3.0
+        self.coalesced_data_frames = 0
+
+        # Decides the order in which data buffered by send_data_buffered is
+        # sent.
+        self._scheduler: Scheduler = DeficitRoundRobinScheduler()
 
         # Keeps track of how streams are closed.
         # Used to ensure that we don't blow up in the face of frames that were
@@ -394,17 +462,34 @@ class H2Connection:
             size_limit=self.MAX_CLOSED_STREAMS,
         )
 
+        # The priorities from PRIORITY_UPDATE frames received for streams that
+        # have not been opened yet, as urgency and incremental.
+        self._pending_priority_updates: dict[int, tuple[int, bool]] = SizeLimitDict(
+            size_limit=self.MAX_PENDING_PRIORITY_UPDATES,
+        )
+
         # The flow control window manager for the connection.
         self._inbound_flow_control_window_manager = WindowManager(
             max_window_size=self.local_settings.initial_window_size,
+            strategy=self.config.window_strategy,
         )
 
+        # Estimates how large the inbound windows should grow, when they are
+        # tuned automatically.
+        self._bdp_estimator: BDPEstimator | None = None
+        if self.config.window_autotuning_ceiling is not None:
+            self._bdp_estimator = BDPEstimator(
+                self.local_settings.initial_window_size,
+                self.config.window_autotuning_ceiling,
+            )
+
         # When in doubt use dict-dispatch.
-        self._frame_dispatch_table: dict[type[Frame], Callable] = {  # type: ignore
+        self._frame_dispatch_table: dict[type[Frame | ReceivedDataFrame], Callable] = {  # type: ignore
             HeadersFrame: self._receive_headers_frame,
             PushPromiseFrame: self._receive_push_promise_frame,
             SettingsFrame: self._receive_settings_frame,
             DataFrame: self._receive_data_frame,
+            ReceivedDataFrame: self._receive_data_frame,
             WindowUpdateFrame: self._receive_window_update_frame,
             PingFrame: self._receive_ping_frame,
             RstStreamFrame: self._receive_rst_stream_frame,
@@ -418,7 +503,50 @@ class H2Connection:
     def _prepare_for_sending(self, frames: list[Frame]) -> None:
         if not frames:
             return
-        self._data_to_send += b"".join(f.serialize() for f in frames)
+        if self._pending_data:
+            frames = self._flush_pending_data(frames)
+        self._write_frames(frames)
+
+    def _flush_pending_data(self, frames: list[Frame]) -> list[Frame]:
+        """
+        Data held back on a stream must be sent before any DATA, HEADERS or
+        PUSH_PROMISE frame that follows it on the stream. Data held back on a
+        stream that is being reset is discarded instead. Other frames, such as
+        WINDOW_UPDATE frames, leave the data held back.
+        """
+        flushed: list[Frame] = []
+        for f in frames:
+            if f.stream_id in self._pending_data:
+                if isinstance(f, RstStreamFrame):
+                    self._discard_pending_data(f.stream_id)
+                elif isinstance(f, (DataFrame, HeadersFrame, PushPromiseFrame)):
+                    pending = self._pending_data.pop(f.stream_id)
+                    flushed.extend(self._pending_data_frames(f.stream_id, pending))
+            flushed.append(f)
+        return flushed
+
+    def _write_frames(self, frames: list[Frame]) -> None:
+        """
+        Add frames to the outbound data buffer, in the order given, unless
+        they are held back by the cork or, for WINDOW_UPDATE frames, until
+        the end of a receive call.
+        """
+        deferred = self._deferred_window_updates
+        if deferred is not None:
+            kept: list[Frame] = []
+            for f in frames:
+                if isinstance(f, WindowUpdateFrame):
+                    stream_id = f.stream_id
+                    deferred[stream_id] = deferred.get(stream_id, 0) + f.window_increment
+                else:
+                    kept.append(f)
+            if not kept:
+                return
+            frames = kept
+        if self._cork_depth:
+            self._corked_frames.extend(frames)
+            return
+        self._send_buffer.write_frames(frames)
         assert all(f.body_len <= self.max_outbound_frame_size for f in frames)
 
     def _open_streams(self, remainder: int) -> int:
@@ -439,6 +567,8 @@ class H2Connection:
         for stream_id in to_delete:
             stream = self.streams.pop(stream_id)
             self._closed_streams[stream_id] = stream.closed_by
+            self._scheduler.remove_stream(stream)
+            self._discard_pending_data(stream_id)
 
         return count
 
@@ -502,6 +632,8 @@ class H2Connection:
         )
         self.config.logger.debug("Stream ID %d created", stream_id)
         s.max_outbound_frame_size = self.max_outbound_frame_size
+        s.window_strategy = self.config.window_strategy
+        s.auto_acknowledge_remaining = self.config.auto_acknowledge_stream_budget
 
         self.streams[stream_id] = s
         self.config.logger.debug("Current streams: %s", self.streams.keys())
@@ -532,7 +664,7 @@ class H2Connection:
             "Send Settings frame: %s", self.local_settings,
         )
 
-        self._data_to_send += preamble + f.serialize()
+        self._send_buffer.write(preamble + f.serialize(), control=True)
 
     def initiate_upgrade_connection(self, settings_header: bytes | None = None) -> bytes | None:
         """
@@ -789,7 +921,28 @@ class H2Connection:
         self.config.logger.debug(
             "Send headers on stream ID %d", stream_id,
         )
+        self._prepare_for_sending(self._headers_frames(
+            stream_id,
+            headers,
+            end_stream,
+            priority_weight=priority_weight,
+            priority_depends_on=priority_depends_on,
+            priority_exclusive=priority_exclusive,
+        ))
 
+    def _headers_frames(self,
+                        stream_id: int,
+                        headers: Iterable[HeaderWeaklyTyped],
+                        end_stream: bool = False,
+                        *,
+                        priority_weight: int | None = None,
+                        priority_depends_on: int | None = None,
+                        priority_exclusive: bool | None = None) -> list[Frame]:
+        """
+        Does the work of :meth:`send_headers
+        <h2.connection.H2Connection.send_headers>`, returning the frames to
+        send rather than adding them to the outbound buffer.
+        """
         # Check we can open the stream.
         if stream_id not in self.streams:
             max_open_streams = self.remote_settings.max_concurrent_streams
@@ -802,6 +955,7 @@ class H2Connection:
         stream = self._get_or_create_stream(
             stream_id, AllowedStreamIDs(self.config.client_side),
         )
+        self._check_no_buffered_data(stream)
 
         frames: list[Frame] = []
         frames.extend(stream.send_headers(
@@ -831,7 +985,7 @@ class H2Connection:
                 priority_exclusive,
             )
 
-        self._prepare_for_sending(frames)
+        return frames
 
     def send_data(self,
                   stream_id: int,
@@ -852,7 +1006,19 @@ class H2Connection:
 
         h2 does this to avoid buffering the data internally. If the user
         has more data to send than h2 will allow, consider breaking it up
-        and buffering it externally.
+        and buffering it externally, or having h2 buffer it with
+        :meth:`send_data_buffered
+        <h2.connection.H2Connection.send_data_buffered>`. Data that fits in
+        the flow control window but not in a single frame can be sent with
+        :meth:`send_data_chunked
+        <h2.connection.H2Connection.send_data_chunked>`.
+
+        If the connection is configured with ``strict_outbound_buffer`` and
+        the outbound data buffer is full (see :data:`outbound_buffer_full
+        <h2.connection.H2Connection.outbound_buffer_full>`), an
+        :class:`OutboundBufferFullError
+        <h2.exceptions.OutboundBufferFullError>` is raised instead of adding
+        more data to it.
 
         :param stream_id: The ID of the stream on which to send the data.
         :type stream_id: ``int``
@@ -870,10 +1036,115 @@ class H2Connection:
 
         :type pad_length: ``int``
         :returns: Nothing
+
+        .. versionchanged:: 4.3.0
+           Small payloads may be merged into one frame, if the
+           ``data_coalescing_threshold`` option is set on the
+           :class:`H2Configuration <h2.config.H2Configuration>`.
         """
         self.config.logger.debug(
             "Send data on stream ID %d with len %d", stream_id, len(data),
         )
+        frames = self._data_frames(stream_id, data, end_stream, pad_length)
+
+        threshold = self.config.data_coalescing_threshold
+        if threshold is not None and pad_length is None:
+            self._coalesce_data(stream_id, data, end_stream, frames)
+        else:
+            self._prepare_for_sending(frames)
+
+    def _coalesce_data(self,
+                       stream_id: int,
+                       data: bytes | memoryview,
+                       end_stream: bool,
+                       frames: list[Frame]) -> None:
+        """
+        Hold back a payload that has been accounted for by :meth:`send_data
+        <h2.connection.H2Connection.send_data>`, merging it with the payloads
+        already held back on the stream, until there is enough to send.
+        ``frames`` are the frames that would have sent it on its own.
+        """
+        threshold = self.config.data_coalescing_threshold
+        assert threshold is not None
+        pending = self._pending_data.get(stream_id)
+        if pending is not None and len(pending) + len(data) > self.max_outbound_frame_size:
+            self.flush_data(stream_id)
+            pending = None
+
+        if pending is None:
+            if end_stream or not data or len(data) >= threshold:
+                self._prepare_for_sending(frames)
+            else:
+                self._pending_data[stream_id] = bytearray(data)
+            return
+
+        pending += data
+        self.coalesced_data_frames += 1
+        if end_stream or len(pending) >= threshold:
+            del self._pending_data[stream_id]
+            f = DataFrame(stream_id, data=bytes(pending))
+            if end_stream:
+                f.flags.add("END_STREAM")
+            self._prepare_for_sending([f])
+
+    def flush_data(self, stream_id: int | None = None) -> None:
+        """
+        Send the data held back by data coalescing on a stream, or on all
+        streams if ``stream_id`` is ``None``. See the
+        ``data_coalescing_threshold`` option of :class:`H2Configuration
+        <h2.config.H2Configuration>`. Data held back on a stream that has
+        been reset by the remote peer is discarded.
+
+        .. versionadded:: 4.3.0
+
+        :param stream_id: (optional) The ID of the stream whose data to send.
+        :type stream_id: ``int`` or ``None``
+        :returns: Nothing
+        """
+        stream_ids = list(self._pending_data) if stream_id is None else [stream_id]
+        frames: list[Frame] = []
+        for pending_stream_id in stream_ids:
+            stream = self.streams.get(pending_stream_id)
+            if stream is None or stream.closed:
+                self._discard_pending_data(pending_stream_id)
+                continue
+
+            pending = self._pending_data.pop(pending_stream_id, None)
+            if pending is not None:
+                frames.extend(self._pending_data_frames(pending_stream_id, pending))
+        self._prepare_for_sending(frames)
+
+    def _pending_data_frames(self, stream_id: int, pending: bytearray) -> list[DataFrame]:
+        """
+        Build the DATA frames that send data held back on a stream. The remote
+        peer may have lowered its maximum frame size since the data was held
+        back, so it is split into frames of at most that size.
+        """
+        max_size = self.max_outbound_frame_size
+        return [
+            DataFrame(stream_id, data=bytes(pending[start:start + max_size]))
+            for start in range(0, len(pending), max_size)
+        ]
+
+    def _discard_pending_data(self, stream_id: int) -> None:
+        """
+        Discard the data held back on a stream that can no longer be sent,
+        giving its share of the connection flow control window back.
+        """
+        pending = self._pending_data.pop(stream_id, None)
+        if pending is not None:
+            self.outbound_flow_control_window += len(pending)
+
+    def _data_frames(self,
+                     stream_id: int,
+                     data: bytes | memoryview,
+                     end_stream: bool = False,
+                     pad_length: Any = None) -> list[Frame]:
+        """
+        Does the work of :meth:`send_data
+        <h2.connection.H2Connection.send_data>`, returning the frames to send
+        rather than adding them to the outbound buffer.
+        """
         frame_size = len(data)
         if pad_length is not None:
             if not isinstance(pad_length, int):
@@ -894,13 +1165,14 @@ class H2Connection:
         if frame_size > self.max_outbound_frame_size:
             msg = f"Cannot send frame size {frame_size}, max frame size is {self.max_outbound_frame_size}"
             raise FrameTooLargeError(msg)
+        if self.config.strict_outbound_buffer and self._send_buffer.full:
+            msg = f"Cannot send data, outbound buffer holds {len(self._send_buffer)} bytes"
+            raise OutboundBufferFullError(msg)
 
+        stream = self.streams[stream_id]
+        self._check_no_buffered_data(stream)
         self.state_machine.process_input(ConnectionInputs.SEND_DATA)
-        frames = self.streams[stream_id].send_data(
-            data, end_stream, pad_length=pad_length,
-        )
-
-        self._prepare_for_sending(frames)
+        frames = stream.send_data(data, end_stream, pad_length=pad_length)
 
         self.outbound_flow_control_window -= frame_size
         self.config.logger.debug(
@@ -908,6 +1180,223 @@ class H2Connection:
             self.outbound_flow_control_window,
         )
         assert self.outbound_flow_control_window >= 0
+        return frames
+
+    def send_data_chunked(self,
+                          stream_id: int,
+                          data: bytes | memoryview,
+                          end_stream: bool = False) -> None:
+        """
+        Send data on a given stream, split across as many DATA frames as
+        needed.
+
+        Unlike :meth:`send_data <h2.connection.H2Connection.send_data>`, the
+        data may be larger than :data:`max_outbound_frame_size
+        <h2.connection.H2Connection.max_outbound_frame_size>`: it is divided
+        into frames of at most that size, which refer to slices of ``data``
+        rather than copies of it. It must still fit in the flow control window
+        returned by :meth:`local_flow_control_window
+        <h2.connection.H2Connection.local_flow_control_window>`, or a
+        :class:`FlowControlError <h2.exceptions.FlowControlError>` is raised.
+        Padding is not supported.
+
+        .. versionadded:: 4.3.0
+
+        :param stream_id: The ID of the stream on which to send the data.
+        :type stream_id: ``int``
+        :param data: The data to send on the stream.
+        :type data: ``bytes`` or ``memoryview``
+        :param end_stream: (optional) Whether this is the last data to be sent
+            on the stream. Defaults to ``False``.
+        :type end_stream: ``bool``
+        :returns: Nothing
+        """
+        self.config.logger.debug(
+            "Send chunked data on stream ID %d with len %d", stream_id, len(data),
+        )
+        self._prepare_for_sending(
+            self._chunked_data_frames(stream_id, data, end_stream),
+        )
+
+    def _chunked_data_frames(self,
+                             stream_id: int,
+                             data: bytes | memoryview,
+                             end_stream: bool) -> list[Frame]:
+        """
+        Does the work of :meth:`send_data_chunked
+        <h2.connection.H2Connection.send_data_chunked>`, returning the frames
+        to send rather than adding them to the outbound buffer.
+        """
+        size = len(data)
+        window = self.local_flow_control_window(stream_id)
+        if size > window:
+            msg = f"Cannot send {size} bytes, flow control window is {window}"
+            raise FlowControlError(msg)
+        if self.config.strict_outbound_buffer and self._send_buffer.full:
+            msg = f"Cannot send data, outbound buffer holds {len(self._send_buffer)} bytes"
+            raise OutboundBufferFullError(msg)
+
+        stream = self.streams[stream_id]
+        self._check_no_buffered_data(stream)
+        self.state_machine.process_input(ConnectionInputs.SEND_DATA)
+        frames = stream.send_data_chunked(
+            data, end_stream, self.max_outbound_frame_size,
+        )
+
+        self.outbound_flow_control_window -= size
+        assert self.outbound_flow_control_window >= 0
+        return frames
+
+    def send_data_buffered(self,
+                           stream_id: int,
+                           data: bytes | memoryview,
+                           end_stream: bool = False) -> None:
+        """
+        Send data on a given stream, buffering whatever the flow control
+        windows do not yet allow to be sent.
+
+        As much of the data as the flow control windows allow is sent
+        immediately, split across as many DATA frames as needed. The rest is
+        held by h2 and sent automatically as the remote peer opens the windows
+        with WINDOW_UPDATE frames or by changing
+        ``SETTINGS_INITIAL_WINDOW_SIZE``: the frames are added to the outbound
+        buffer while the received data is processed, ready for the next call
+        to :meth:`data_to_send <h2.connection.H2Connection.data_to_send>`. If
+        ``end_stream`` is set, the stream is ended once all of its data has
+        been sent.
+
+        Streams waiting for the connection flow control window share it as
+        decided by the connection's :class:`Scheduler
+        <h2.scheduling.Scheduler>`. By default this is a
+        :class:`DeficitRoundRobinScheduler
+        <h2.scheduling.DeficitRoundRobinScheduler>`, which shares it evenly;
+        use :meth:`set_scheduler <h2.connection.H2Connection.set_scheduler>`
+        to change it.
+
+        The amount of data still buffered for a stream is returned by
+        :meth:`buffered_data_length
+        <h2.connection.H2Connection.buffered_data_length>`, which can be used
+        to stop reading from the data source while it is high. Until it has
+        all been sent, no other data, trailers or end of stream may be sent on
+        the stream except through this method: attempting to do so raises a
+        :class:`ProtocolError <h2.exceptions.ProtocolError>`. Resetting the
+        stream discards the buffered data.
+
+        The data is not copied, so it must not be changed until it has been
+        sent.
+
+        .. versionadded:: 4.3.0
+
+        :param stream_id: The ID of the stream on which to send the data.
+        :type stream_id: ``int``
+        :param data: The data to send on the stream.
+        :type data: ``bytes`` or ``memoryview``
+        :param end_stream: (optional) Whether this is the last data to be sent
+            on the stream. Defaults to ``False``.
+        :type end_stream: ``bool``
+        :returns: Nothing
+        """
+        self.config.logger.debug(
+            "Send buffered data on stream ID %d with len %d", stream_id, len(data),
+        )
+        self.state_machine.process_input(ConnectionInputs.SEND_DATA)
+        stream = self._get_stream_by_id(stream_id)
+        stream.buffer_data(data, end_stream)
+        if stream.buffered_data_length:
+            self._scheduler.add_stream(stream)
+            frames = self._buffered_data_frames()
+        else:
+            # Ending the stream needs no flow control window.
+            frames = stream.send_buffered_data(0)
+        self._prepare_for_sending(frames)
+
+    def buffered_data_length(self, stream_id: int) -> int:
+        """
+        Returns the number of bytes of data that :meth:`send_data_buffered
+        <h2.connection.H2Connection.send_data_buffered>` is holding for stream
+        ``stream_id`` until the flow control windows allow it to be sent. This
+        is ``0`` once the stream has been closed.
+
+        .. versionadded:: 4.3.0
+
+        :param stream_id: The ID of the stream whose buffered data is being
+            queried.
+        :type stream_id: ``int``
+        :returns: The number of bytes buffered for the stream.
+        :rtype: ``int``
+        """
+        stream = self._get_stream_by_id(stream_id)
+        if stream.closed:
+            return 0
+        return stream.buffered_data_length
+
+    def _buffered_data_frames(self) -> list[Frame]:
+        """
+        Send as much buffered data as the flow control windows allow, in the
+        order chosen by the scheduler, returning the frames to send.
+        """
+        frames = self._scheduler.next_frames(self.outbound_flow_control_window)
+        if frames:
+            self.state_machine.process_input(ConnectionInputs.SEND_DATA)
+            self.outbound_flow_control_window -= sum(
+                f.flow_controlled_length for f in frames if isinstance(f, DataFrame)
+            )
+            assert self.outbound_flow_control_window >= 0
+        return frames
+
+    def set_scheduler(self, scheduler: Scheduler) -> None:
+        """
+        Use ``scheduler`` to decide the order in which data buffered by
+        :meth:`send_data_buffered
+        <h2.connection.H2Connection.send_data_buffered>` is sent. Streams that
+        already have data buffered are handed over to it.
+
+        .. versionadded:: 4.3.0
+
+        :param scheduler: The scheduler to use.
+        :type scheduler: :class:`Scheduler <h2.scheduling.Scheduler>`
+        :returns: Nothing
+        """
+        for stream in self.streams.values():
+            if stream.buffered_data_length and not stream.closed:
+                scheduler.add_stream(stream)
+        self._scheduler = scheduler
+
+    def set_window_strategy(self,
+                            strategy: WindowStrategy,
+                            stream_id: int | None = None) -> None:
+        """
+        Use ``strategy`` to decide when to update the inbound flow control
+        window of a single stream, or of the connection itself if
+        ``stream_id`` is ``None``, as received data is acknowledged. Streams
+        use the ``window_strategy`` of the :class:`H2Configuration
+        <h2.config.H2Configuration>` until this is called for them.
+
+        .. versionadded:: 4.3.0
+
+        :param strategy: The window strategy to use.
+        :type strategy: :class:`WindowStrategy <h2.windows.WindowStrategy>`
+        :param stream_id: (optional) The ID of the stream whose window the
+            strategy manages.
+        :type stream_id: ``int`` or ``None``
+        :returns: Nothing
+        """
+        if not isinstance(strategy, WindowStrategy):
+            msg = "strategy must be a WindowStrategy"
+            raise ValueError(msg)  # noqa: TRY004
+        if stream_id is None:
+            self._inbound_flow_control_window_manager.strategy = strategy
+        else:
+            self._get_stream_by_id(stream_id).window_strategy = strategy
+
+    def _check_no_buffered_data(self, stream: H2Stream) -> None:
+        """
+        Refuse to send anything else on a stream while it has buffered data
+        waiting to be sent, as that would reorder the stream.
+        """
+        if stream.has_buffered_data:
+            msg = f"Stream {stream.stream_id} has buffered data waiting to be sent"
+            raise ProtocolError(msg)
 
     def end_stream(self, stream_id: int) -> None:
         """
@@ -921,8 +1410,10 @@ class H2Connection:
         :returns: Nothing
         """
         self.config.logger.debug("End stream ID %d", stream_id)
+        stream = self.streams[stream_id]
+        self._check_no_buffered_data(stream)
         self.state_machine.process_input(ConnectionInputs.SEND_DATA)
-        frames = self.streams[stream_id].end_stream()
+        frames = stream.end_stream()
         self._prepare_for_sending(frames)
 
     def increment_flow_control_window(self, increment: int, stream_id: int | None = None) -> None:
@@ -1282,6 +1773,49 @@ class H2Connection:
 
         self._prepare_for_sending([frame_prio])
 
+    def send_priority_update(self,
+                             stream_id: int,
+                             urgency: int = DEFAULT_URGENCY,
+                             incremental: bool = False) -> None:
+        """
+        Change the priority of a stream with an `RFC 9218
+        <https://www.rfc-editor.org/rfc/rfc9218>`_ PRIORITY_UPDATE frame. The
+        initial priority of a stream is set by sending a ``priority`` header
+        field with the request, whose value can be built with
+        :func:`priority_field_value <h2.priority.priority_field_value>`.
+
+        This method may be called before the stream has been opened. Only
+        clients may send PRIORITY_UPDATE frames.
+
+        .. versionadded:: 4.3.0
+
+        :param stream_id: The ID of the stream to prioritize.
+        :type stream_id: ``int``
+        :param urgency: (optional) The urgency of the stream, from ``0`` (the
+            most urgent) to ``7``. Defaults to ``3``.
+        :type urgency: ``int``
+        :param incremental: (optional) Whether the response can be used
+            incrementally, as it arrives. Defaults to ``False``.
+        :type incremental: ``bool``
+        :returns: Nothing
+        """
+        if not self.config.client_side:
+            msg = "Servers cannot send PRIORITY_UPDATE frames."
+            raise ProtocolError(msg)
+        if stream_id < 1:
+            msg = f"Cannot prioritize stream ID {stream_id}"
+            raise ValueError(msg)
+
+        field_value = priority_field_value(urgency, incremental)
+        self.state_machine.process_input(ConnectionInputs.SEND_PRIORITY)
+
+        frame = ExtensionFrame(
+            PRIORITY_UPDATE_FRAME_TYPE, 0,
+            body=stream_id.to_bytes(4, "big") + field_value,
+        )
+        frame.body_len = len(frame.body)
+        self._prepare_for_sending([frame])
+
     def local_flow_control_window(self, stream_id: int) -> int:
         """
         Returns the maximum amount of data that can be sent on stream
@@ -1365,29 +1899,73 @@ class H2Connection:
             msg = "Cannot acknowledge negative data"
             raise ValueError(msg)
 
-        frames: list[Frame] = []
+        frames = self._acknowledge_connection_data(acknowledged_size)
+        frames.extend(self._acknowledge_stream_data(acknowledged_size, stream_id))
+        self._prepare_for_sending(frames)
+
+    def acknowledge_received_data_many(self, acknowledged_sizes: dict[int, int]) -> None:
+        """
+        Inform the :class:`H2Connection <h2.connection.H2Connection>` that
+        flow-controlled bytes have been processed on several streams at once.
+        This behaves like calling :meth:`acknowledge_received_data
+        <h2.connection.H2Connection.acknowledge_received_data>` for each
+        stream, except that at most one WINDOW_UPDATE frame is emitted for the
+        connection, and at most one for each stream.
 
+        .. versionadded:: 4.3.0
+
+        :param acknowledged_sizes: The total *flow-controlled size* of the
+            data that has been processed on each stream, including padding,
+            keyed by stream ID.
+        :type acknowledged_sizes: ``dict`` of ``int`` to ``int``
+        :returns: Nothing
+        :rtype: ``None``
+        """
+        self.config.logger.debug(
+            "Ack received data on %d streams", len(acknowledged_sizes),
+        )
+        for stream_id, acknowledged_size in acknowledged_sizes.items():
+            if stream_id <= 0:
+                msg = f"Stream ID {stream_id} is not valid for acknowledge_received_data"
+                raise ValueError(msg)
+            if acknowledged_size < 0:
+                msg = "Cannot acknowledge negative data"
+                raise ValueError(msg)
+
+        frames = self._acknowledge_connection_data(sum(acknowledged_sizes.values()))
+        for stream_id, acknowledged_size in acknowledged_sizes.items():
+            frames.extend(self._acknowledge_stream_data(acknowledged_size, stream_id))
+        self._prepare_for_sending(frames)
+
+    def _acknowledge_connection_data(self, acknowledged_size: int) -> list[Frame]:
+        """
+        Pass processed bytes to the connection window manager, returning the
+        WINDOW_UPDATE frame to send for the connection, if any.
+        """
         conn_manager = self._inbound_flow_control_window_manager
         conn_increment = conn_manager.process_bytes(acknowledged_size)
         if conn_increment:
             f = WindowUpdateFrame(0)
             f.window_increment = conn_increment
-            frames.append(f)
+            return [f]
+        return []
 
+    def _acknowledge_stream_data(self, acknowledged_size: int, stream_id: int) -> list[Frame]:
+        """
+        Pass processed bytes to the window manager of a stream, returning the
+        WINDOW_UPDATE frame to send for the stream, if any.
+        """
         try:
             stream = self._get_stream_by_id(stream_id)
         except StreamClosedError:
             # The stream is already gone. We're not worried about incrementing
             # the window in this case.
-            pass
-        else:
-            # No point incrementing the windows of closed streams.
-            if stream.open:
-                frames.extend(
-                    stream.acknowledge_received_data(acknowledged_size),
-                )
+            return []
 
-        self._prepare_for_sending(frames)
+        # No point incrementing the windows of closed streams.
+        if not stream.open:
+            return []
+        return stream.acknowledge_received_data(acknowledged_size)
 
     def data_to_send(self, amount: int | None = None) -> bytes:
         """
@@ -1398,19 +1976,91 @@ class H2Connection:
         or less if that much data is not available. It does not perform any
         I/O, and so uses a different name.
 
+        SETTINGS, PING, WINDOW_UPDATE, RST_STREAM and GOAWAY frames are
+        returned ahead of other frames that are waiting to be sent, unless
+        that would reorder them with frames they must follow, such as the
+        earlier frames on the same stream.
+
+        .. versionchanged:: 4.3.0
+           Control frames are returned ahead of other waiting frames.
+
         :param amount: (optional) The maximum amount of data to return. If not
             set, or set to ``None``, will return as much data as possible.
         :type amount: ``int``
         :returns: A bytestring containing the data to send on the wire.
         :rtype: ``bytes``
         """
-        if amount is None:
-            data = bytes(self._data_to_send)
-            self._data_to_send = bytearray()
-            return data
-        data = bytes(self._data_to_send[:amount])
-        self._data_to_send = self._data_to_send[amount:]
-        return data
+        return self._send_buffer.read(amount)
+
+    def buffers_to_send(self) -> list[bytes | bytearray | memoryview]:
+        """
+        Returns all the data in the internal data buffer, as a list of
+        buffers, and empties the buffer.
+
+        Unlike :meth:`data_to_send <h2.connection.H2Connection.data_to_send>`,
+        this does not join the data into a single bytestring. Large DATA frame
+        payloads that were passed to :meth:`send_data
+        <h2.connection.H2Connection.send_data>` as ``bytes`` (or a
+        ``memoryview`` over ``bytes``) are returned as they were given, between
+        the buffers holding the frame headers and other frames, so that they
+        reach the network without being copied. The list is suitable for
+        ``socket.sendmsg`` or ``asyncio.WriteTransport.writelines``.
+
+        .. versionadded:: 4.3.0
+
+        :returns: The data to send on the wire, in order.
+        :rtype: ``list`` of bytes-like objects
+        """
+        return self._send_buffer.read_buffers()
+
+    def cork(self) -> None:
+        """
+        Hold back the frames produced by this connection, rather than adding
+        each to the outbound data buffer as it is produced, until
+        :meth:`uncork <h2.connection.H2Connection.uncork>` is called. This
+        makes sending many small things in a row cheaper.
+
+        Calls may be nested: the frames are only added to the buffer when
+        every call to this method has been matched by a call to
+        :meth:`uncork <h2.connection.H2Connection.uncork>`. Until then, they
+        are not returned by :meth:`data_to_send
+        <h2.connection.H2Connection.data_to_send>` and do not count towards
+        the :attr:`outbound_buffer_size
+        <h2.connection.H2Connection.outbound_buffer_size>`. Data passed to
+        this connection must not be changed until then either.
+
+        .. versionadded:: 4.3.0
+
+        :returns: Nothing
+        """
+        self._cork_depth += 1
+
+    def uncork(self) -> None:
+        """
+        Undo a call to :meth:`cork <h2.connection.H2Connection.cork>`. If it
+        was the last one outstanding, the frames that were held back are added
+        to the outbound data buffer in one go. On the way, WINDOW_UPDATE
+        frames for the same stream are merged into the first of them, up to
+        the largest increment a frame can carry, empty DATA frames that do not end their stream are dropped, and an empty
+        DATA frame that ends its stream is dropped in favour of setting the
+        END_STREAM flag on the stream's previous frame, if that is a DATA
+        frame.
+
+        Does nothing if the connection is not corked.
+
+        .. versionadded:: 4.3.0
+
+        :returns: Nothing
+        """
+        if not self._cork_depth:
+            return
+        self._cork_depth -= 1
+        if not self._cork_depth:
+            frames = _coalesce_frames(self._corked_frames)
+            self._corked_frames = []
+            # The held back frames are already in order, and data held back
+            # by coalescing was flushed ahead of them as they were produced.
+            self._write_frames(frames)
 
     def clear_outbound_data_buffer(self) -> None:
         """
@@ -1421,8 +2071,40 @@ class H2Connection:
 
         This method should not normally be used, but is made available to avoid
         exposing implementation details.
+
+        .. versionchanged:: 4.3.0
+           Also discards the frames held back while the connection is corked,
+           and the data held back by data coalescing.
+        """
+        self._send_buffer.clear()
+        self._corked_frames = []
+        self._pending_data = {}
+
+    @property
+    def outbound_buffer_size(self) -> int:
+        """
+        The number of bytes in the outbound data buffer, waiting to be
+        returned by :meth:`data_to_send
+        <h2.connection.H2Connection.data_to_send>`.
+
+        .. versionadded:: 4.3.0
+        """
+        return len(self._send_buffer)
+
+    @property
+    def outbound_buffer_full(self) -> bool:
+        """
+        Whether the outbound data buffer is full: it has reached the
+        ``outbound_buffer_high_watermark`` set on the :class:`H2Configuration
+        <h2.config.H2Configuration>`, and has not yet been drained down to the
+        ``outbound_buffer_low_watermark``. While this is ``True``,
+        applications should stop producing data for the connection until more
+        has been sent to the network. Always ``False`` if no high watermark is
+        set.
+
+        .. versionadded:: 4.3.0
         """
-        self._data_to_send = bytearray()
+        return self._send_buffer.full
 
     def _acknowledge_settings(self) -> list[Frame]:
         """
@@ -1459,7 +2141,7 @@ class H2Connection:
 
         f = SettingsFrame(0)
         f.flags.add("ACK")
-        return [f]
+        return [f, *self._buffered_data_frames()]
 
     def _flow_control_change_from_settings(self, old_value: int | None, new_value: int) -> None:
         """
@@ -1492,12 +2174,44 @@ class H2Connection:
         for stream in self.streams.values():
             stream._inbound_flow_control_change_from_settings(delta)
 
-    def receive_data(self, data: bytes) -> list[Event]:
+    def receive_data(self,
+                     data: bytes,
+                     max_frames: int | None = None,
+                     max_bytes: int | None = None) -> list[Event]:
         """
         Pass some received HTTP/2 data to the connection for handling.
 
+        By default every complete frame in the receive buffer is processed
+        before this returns. The amount of work done in one call can be
+        bounded with ``max_frames`` and ``max_bytes``, or with the matching
+        :class:`H2Configuration <h2.config.H2Configuration>` options: any
+        frames left over stay buffered, and can be processed later with
+        :meth:`process_pending <h2.connection.H2Connection.process_pending>`
+        while :data:`has_pending_frames
+        <h2.connection.H2Connection.has_pending_frames>` is ``True``.
+
+        WINDOW_UPDATE frames produced while the frames are processed, whether
+        by :meth:`acknowledge_received_data
+        <h2.connection.H2Connection.acknowledge_received_data>` calls from an
+        event handler or by automatic acknowledgement, are held back until
+        the end of the call, and then sent as at most one frame per stream,
+        after any other frames produced by the call. Increments for streams
+        that closed during the call are dropped.
+
+        .. versionchanged:: 4.3.0
+           Added the ``max_frames`` and ``max_bytes`` parameters, and started
+           holding back WINDOW_UPDATE frames until the end of the call.
+
         :param data: The data received from the remote peer on the network.
         :type data: ``bytes``
+        :param max_frames: (optional) The most frames to process in this call.
+            Defaults to the ``max_frames_per_receive`` configuration option.
+        :type max_frames: ``int`` or ``None``
+        :param max_bytes: (optional) Stop processing frames once frames
+            totalling at least this many bytes have been processed in this
+            call. Defaults to the ``max_bytes_per_receive`` configuration
+            option.
+        :type max_bytes: ``int`` or ``None``
         :returns: A list of events that the remote peer triggered by sending
             this data.
         """
@@ -1505,28 +2219,362 @@ class H2Connection:
             "Process received data on connection. Received data: %r", data,
         )
 
-        events: list[Event] = []
+        budget = self._receive_budget(max_frames, max_bytes)
         self.incoming_buffer.add_data(data)
-        self.incoming_buffer.max_frame_size = self.max_inbound_frame_size
+        return self._receive_buffered_frames(*budget)
+
+    def iter_events(self,
+                    data: bytes,
+                    max_frames: int | None = None,
+                    max_bytes: int | None = None) -> Iterator[Event]:
+        """
+        Pass some received HTTP/2 data to the connection for handling, and
+        return an iterator over the events it triggers.
+
+        This behaves like :meth:`receive_data
+        <h2.connection.H2Connection.receive_data>`, except that frames are
+        processed lazily: each frame is only processed once the events from
+        the frames before it have been consumed. This allows the application
+        to start acting on the first events in a large read before the rest of
+        it has been processed. Any frames sent in response, such as SETTINGS
+        ACKs, are added to the outbound buffer as their frames are processed,
+        in the same order as with :meth:`receive_data
+        <h2.connection.H2Connection.receive_data>`. WINDOW_UPDATE frames are
+        held back, just as :meth:`receive_data
+        <h2.connection.H2Connection.receive_data>` holds them back to the end
+        of the call, until the iterator is exhausted or closed.
+
+        If the iterator is abandoned before it is exhausted, the unprocessed
+        frames stay in the receive buffer, and can be processed with
+        :meth:`process_pending <h2.connection.H2Connection.process_pending>`.
+
+        .. versionadded:: 4.3.0
 
-        try:
-            for frame in self.incoming_buffer:
-                events.extend(self._receive_frame(frame))
-        except InvalidPaddingError as e:
-            self._terminate_connection(ErrorCodes.PROTOCOL_ERROR)
-            msg = "Received frame with invalid padding."
-            raise ProtocolError(msg) from e
-        except ProtocolError as e:
-            # For whatever reason, receiving the frame caused a protocol error.
-            # We should prepare to emit a GoAway frame before throwing the
-            # exception up further. No need for an event: the exception will
-            # do fine.
-            self._terminate_connection(e.error_code)
-            raise
+        :param data: The data received from the remote peer on the network.
+        :type data: ``bytes``
+        :param max_frames: (optional) The most frames to process. Defaults to
+            the ``max_frames_per_receive`` configuration option.
+        :type max_frames: ``int`` or ``None``
+        :param max_bytes: (optional) Stop processing frames once frames
+            totalling at least this many bytes have been processed. Defaults
+            to the ``max_bytes_per_receive`` configuration option.
+        :type max_bytes: ``int`` or ``None``
+        :returns: An iterator of the events that the remote peer triggered by
+            sending this data.
+        """
+        self.config.logger.trace(
+            "Process received data on connection. Received data: %r", data,
+        )
+
+        budget = self._receive_budget(max_frames, max_bytes)
+        self.incoming_buffer.add_data(data)
+        return self._iter_buffered_events(*budget)
+
+    def get_receive_buffer(self, sizehint: int = -1) -> memoryview:
+        """
+        Lend out a writable view into the connection's receive buffer, so that
+        data read from the network can be written directly into it without
+        first being copied into a ``bytes`` object. This pairs naturally with
+        ``socket.recv_into`` or the ``get_buffer`` method of an
+        :class:`asyncio.BufferedProtocol`.
+
+        Once data has been written into the view, call :meth:`receive_into
+        <h2.connection.H2Connection.receive_into>` with the number of bytes
+        written. The view is only valid until the next call to a receiving
+        method on this connection: do not hold onto it.
+
+        .. versionadded:: 4.3.0
+
+        :param sizehint: (optional) The minimum number of bytes the caller
+            would like to be able to write. If not set, or zero or negative, a
+            reasonable default size is used.
+        :type sizehint: ``int``
+        :returns: A writable ``memoryview`` of at least ``sizehint`` bytes.
+        :rtype: ``memoryview``
+        """
+        return self.incoming_buffer.get_buffer(sizehint)
+
+    def receive_into(self,
+                     nbytes: int,
+                     max_frames: int | None = None,
+                     max_bytes: int | None = None) -> list[Event]:
+        """
+        Process ``nbytes`` bytes of HTTP/2 data that have been written into the
+        view returned by the last call to :meth:`get_receive_buffer
+        <h2.connection.H2Connection.get_receive_buffer>`.
+
+        Apart from where the data comes from, this behaves exactly like
+        :meth:`receive_data <h2.connection.H2Connection.receive_data>`.
+
+        .. versionadded:: 4.3.0
+
+        :param nbytes: The number of bytes written into the receive buffer.
+        :type nbytes: ``int``
+        :param max_frames: (optional) The most frames to process in this call.
+            Defaults to the ``max_frames_per_receive`` configuration option.
+        :type max_frames: ``int`` or ``None``
+        :param max_bytes: (optional) Stop processing frames once frames
+            totalling at least this many bytes have been processed in this
+            call. Defaults to the ``max_bytes_per_receive`` configuration
+            option.
+        :type max_bytes: ``int`` or ``None``
+        :returns: A list of events that the remote peer triggered by sending
+            this data.
+        """
+        self.config.logger.trace(
+            "Process %d bytes received into connection buffer", nbytes,
+        )
+
+        budget = self._receive_budget(max_frames, max_bytes)
+        self.incoming_buffer.buffer_updated(nbytes)
+        return self._receive_buffered_frames(*budget)
+
+    def process_pending(self,
+                        max_frames: int | None = None,
+                        max_bytes: int | None = None) -> list[Event]:
+        """
+        Process complete frames that were left in the receive buffer by an
+        earlier call to :meth:`receive_data
+        <h2.connection.H2Connection.receive_data>` or :meth:`receive_into
+        <h2.connection.H2Connection.receive_into>` because it ran out of
+        budget. This is subject to the same limits as those methods.
+
+        .. versionadded:: 4.3.0
+
+        :param max_frames: (optional) The most frames to process in this call.
+            Defaults to the ``max_frames_per_receive`` configuration option.
+        :type max_frames: ``int`` or ``None``
+        :param max_bytes: (optional) Stop processing frames once frames
+            totalling at least this many bytes have been processed in this
+            call. Defaults to the ``max_bytes_per_receive`` configuration
+            option.
+        :type max_bytes: ``int`` or ``None``
+        :returns: A list of events that the remote peer triggered with the
+            processed frames.
+        """
+        self.config.logger.trace("Process pending frames on connection")
+        return self._receive_buffered_frames(
+            *self._receive_budget(max_frames, max_bytes),
+        )
+
+    def set_event_handler(self, handler: EventHandler | None) -> None:
+        """
+        Report received events by calling methods on ``handler``, instead of
+        returning lists of :class:`Event <h2.events.Event>` objects.
+
+        While a handler is set, :meth:`receive_data
+        <h2.connection.H2Connection.receive_data>` and the other receive
+        methods return no events. Each event is passed to the handler as soon
+        as the frame that triggered it has been processed.
+
+        This is mainly a convenience: only DATA frames on streams in the usual
+        state skip building event objects. Every other frame still builds its
+        events internally, which are then passed to :meth:`handle_event
+        <h2.handlers.EventHandler.handle_event>`, so workloads that are not
+        dominated by DATA frames run at about the same speed as with event
+        lists.
+
+        Exceptions raised by the handler are propagated out of the receive
+        method unchanged, with the remaining frames left in the receive
+        buffer. They are not treated as errors in the received data, so they
+        never cause a RST_STREAM or GOAWAY frame to be sent.
 
+        .. versionadded:: 4.3.0
+
+        :param handler: The handler to call, or ``None`` to go back to
+            returning events.
+        :type handler: :class:`EventHandler <h2.handlers.EventHandler>` or
+            ``None``
+        :returns: Nothing
+        """
+        self._event_handler = handler
+
+    @property
+    def has_pending_frames(self) -> bool:
+        """
+        Whether the receive buffer holds complete frames that have not been
+        processed yet, because a receive call ran out of budget. If so, call
+        :meth:`process_pending <h2.connection.H2Connection.process_pending>`
+        to process them.
+
+        .. versionadded:: 4.3.0
+        """
+        return self.incoming_buffer.has_complete_frame()
+
+    def _receive_budget(self,
+                        max_frames: int | None,
+                        max_bytes: int | None) -> tuple[int | None, int | None]:
+        """
+        Works out the frame and byte budgets for a receive call, falling back
+        to the configured limits.
+        """
+        if max_frames is None:
+            max_frames = self.config.max_frames_per_receive
+        elif max_frames < 1:
+            msg = f"max_frames must be at least 1, not {max_frames}"
+            raise ValueError(msg)
+
+        if max_bytes is None:
+            max_bytes = self.config.max_bytes_per_receive
+        elif max_bytes < 1:
+            msg = f"max_bytes must be at least 1, not {max_bytes}"
+            raise ValueError(msg)
+
+        return max_frames, max_bytes
+
+    def _receive_buffered_frames(self,
+                                 max_frames: int | None,
+                                 max_bytes: int | None) -> list[Event]:
+        """
+        Process the complete frames in the receive buffer, stopping early if
+        the frame or byte budget runs out, and return all the events.
+        """
+        events: list[Event] = []
+        self._deferred_window_updates = {}
+        try:
+            for frame_events in self._process_buffered_frames(max_frames, max_bytes):
+                events.extend(frame_events)
+        finally:
+            self._send_deferred_window_updates()
         return events
 
-    def _receive_frame(self, frame: Frame) -> list[Event]:
+    def _send_deferred_window_updates(self) -> None:
+        """
+        Send the WINDOW_UPDATE increments deferred while processing received
+        frames, one frame for each stream. Increments for streams that have
+        closed in the meantime are dropped, as are all of them if the
+        connection has closed.
+        """
+        deferred = self._deferred_window_updates
+        self._deferred_window_updates = None
+        if not deferred or self.state_machine.state == ConnectionState.CLOSED:
+            return
+
+        frames: list[Frame] = []
+        for stream_id, increment in deferred.items():
+            if stream_id:
+                stream = self.streams.get(stream_id)
+                if stream is None or stream.closed:
+                    continue
+            # The summed increment may be too large for one frame.
+            for start in range(0, increment, self.MAX_WINDOW_INCREMENT):
+                f = WindowUpdateFrame(stream_id)
+                f.window_increment = min(increment - start, self.MAX_WINDOW_INCREMENT)
+                frames.append(f)
+        self._prepare_for_sending(frames)
+
+    def _iter_buffered_events(self,
+                              max_frames: int | None,
+                              max_bytes: int | None) -> Iterator[Event]:
+        """
+        Process the complete frames in the receive buffer, stopping early if
+        the frame or byte budget runs out, and yield the events one by one.
+
+        WINDOW_UPDATE frames produced while frames are processed are held
+        back until the iterator is exhausted or closed, as they are until the
+        end of a call to :meth:`receive_data
+        <h2.connection.H2Connection.receive_data>`. Those produced by the
+        application while it holds an event are sent as usual.
+        """
+        deferred: dict[int, int] = {}
+        frames = self._process_buffered_frames(max_frames, max_bytes)
+        try:
+            while True:
+                self._deferred_window_updates = deferred
+                try:
+                    frame_events = next(frames, None)
+                finally:
+                    self._deferred_window_updates = None
+                if frame_events is None:
+                    break
+                yield from frame_events
+        finally:
+            self._deferred_window_updates = deferred
+            self._send_deferred_window_updates()
+
+    def _process_buffered_frames(self,
+                                 max_frames: int | None,
+                                 max_bytes: int | None) -> Iterator[list[Event]]:
+        """
+        Process the complete frames in the receive buffer one at a time,
+        yielding the events each one produces. Stops early if the frame or
+        byte budget runs out.
+        """
+        buffer = self.incoming_buffer
+        buffer.max_frame_size = self.max_inbound_frame_size
+        buffer.max_header_block_frames = self.config.max_header_block_frames
+        buffer.max_header_block_size = self.config.max_header_block_size
+        if buffer.max_header_block_size is None:
+            buffer.max_header_block_size = (
+                self.decoder.max_header_list_size * self.HEADER_BLOCK_SIZE_FACTOR
+            )
+        remaining_frames = max_frames
+        start_length = len(buffer)
+        handler = self._event_handler
+
+        while True:
+            try:
+                frame = next(buffer, None)
+                if frame is None:
+                    break
+                events = self._receive_frame(frame)
+            except InvalidPaddingError as e:
+                self._terminate_connection(ErrorCodes.PROTOCOL_ERROR)
+                msg = "Received frame with invalid padding."
+                raise ProtocolError(msg) from e
+            except ProtocolError as e:
+                # For whatever reason, receiving the frame caused a protocol
+                # error. We should prepare to emit a GoAway frame before
+                # throwing the exception up further. No need for an event: the
+                # exception will do fine.
+                self._terminate_connection(e.error_code)
+                raise
+
+            if handler is None:
+                yield events
+            else:
+                self._call_event_handler(handler, events)
+
+            if remaining_frames is not None:
+                remaining_frames -= 1
+                if not remaining_frames:
+                    break
+            if max_bytes is not None and start_length - len(buffer) >= max_bytes:
+                break
+
+    def _call_event_handler(self, handler: EventHandler, events: list[Event]) -> None:
+        """
+        Report the events for the frame that was just processed to the event
+        handler, along with its data if it was received without building
+        events for it.
+
+        The handler is application code: whatever it raises is passed on to
+        the caller as it is, and is not a protocol error.
+        """
+        received_data = self._handler_data
+        if received_data is not None:
+            self._handler_data = None
+            handler.on_data(*received_data)
+        for event in events:
+            handler.handle_event(event)
+
+    def _skip_window_update_frame(self, stream_id: int, body: memoryview) -> bool:
+        """
+        Decides whether a received WINDOW_UPDATE frame can be dropped without
+        being parsed, because handling it would have no effect.
+
+        This is the case for valid WINDOW_UPDATE frames on streams that were
+        reset: peers commonly send these while the RST_STREAM is in flight, and
+        they would be ignored anyway.
+        """
+        return (
+            len(body) == 4 and
+            (int.from_bytes(body, "big") & 0x7FFFFFFF) != 0 and
+            self.state_machine.state != ConnectionState.CLOSED and
+            self._stream_is_closed_by_reset(stream_id)
+        )
+
+    def _receive_frame(self, frame: Frame | ReceivedDataFrame) -> list[Event]:
         """
         Handle a frame received on the connection.
 
@@ -1534,7 +2582,7 @@ class H2Connection:
            Removed from the public API.
         """
         events: list[Event]
-        self.config.logger.trace("Received frame: %s", repr(frame))
+        self.config.logger.trace("Received frame: %r", frame)
         try:
             # I don't love using __class__ here, maybe reconsider it.
             frames, events = self._frame_dispatch_table[frame.__class__](frame)
@@ -1616,6 +2664,9 @@ class H2Connection:
             self.config.header_encoding,
         )
 
+        if isinstance(stream_events[0], RequestReceived):
+            self._receive_request_priority(stream, stream_events[0].headers)
+
         if "PRIORITY" in frame.flags:
             p_frames, p_events = self._receive_priority_frame(frame)
             expected_frame_types = (RequestReceived, ResponseReceived, TrailersReceived, InformationalResponseReceived)
@@ -1696,7 +2747,7 @@ class H2Connection:
     def _handle_data_on_closed_stream(self,
                                       events: list[Event],
                                       exc: StreamClosedError,
-                                      frame: DataFrame) -> tuple[list[Frame], list[Event]]:
+                                      frame: DataFrame | ReceivedDataFrame) -> tuple[list[Frame], list[Event]]:
         # This stream is already closed - and yet we received a DATA frame.
         # The received DATA frame counts towards the connection flow window.
         # We need to manually to acknowledge the DATA frame to update the flow
@@ -1727,9 +2778,12 @@ class H2Connection:
         )
         return frames, events + exc._events
 
-    def _receive_data_frame(self, frame: DataFrame) -> tuple[list[Frame], list[Event]]:
+    def _receive_data_frame(self, frame: DataFrame | ReceivedDataFrame) -> tuple[list[Frame], list[Event]]:
         """
         Receive a data frame on the connection.
+
+        The frame is usually one decoded directly from the receive buffer, but
+        hyperframe ``DataFrame`` objects are handled the same way.
         """
         flow_controlled_length = frame.flow_controlled_length
 
@@ -1739,12 +2793,28 @@ class H2Connection:
         self._inbound_flow_control_window_manager.window_consumed(
             flow_controlled_length,
         )
+        if self._bdp_estimator is not None and self._bdp_estimator.data_received(
+            flow_controlled_length,
+        ):
+            f = PingFrame(0)
+            f.opaque_data = _BDP_PING_DATA
+            self._prepare_for_sending([f])
 
         try:
             stream = self._get_stream_by_id(frame.stream_id)
+            end_stream = "END_STREAM" in frame.flags
+            if self._event_handler is not None and stream.receive_data_without_events(
+                frame.data, end_stream, flow_controlled_length,
+            ):
+                # The handler is called once the frame has been processed.
+                self._handler_data = (
+                    frame.stream_id, frame.data, flow_controlled_length, end_stream,
+                )
+                return self._auto_acknowledge(stream, flow_controlled_length), events
+
             frames, stream_events = stream.receive_data(
                 frame.data,
-                "END_STREAM" in frame.flags,
+                end_stream,
                 flow_controlled_length,
             )
         except StreamClosedError as e:
@@ -1752,8 +2822,31 @@ class H2Connection:
             # internal state.
             return self._handle_data_on_closed_stream(events, e, frame)
 
+        frames.extend(self._auto_acknowledge(stream, flow_controlled_length))
         return frames, events + stream_events
 
+    def _auto_acknowledge(self, stream: H2Stream, flow_controlled_length: int) -> list[Frame]:
+        """
+        Acknowledge data received on a stream on the application's behalf, as
+        far as the stream's budget allows, if the connection is configured to.
+        Returns the WINDOW_UPDATE frames to send.
+        """
+        if not self.config.auto_acknowledge_received_data or not flow_controlled_length:
+            return []
+
+        size = flow_controlled_length
+        remaining = stream.auto_acknowledge_remaining
+        if remaining is not None:
+            size = min(size, remaining)
+            if not size:
+                return []
+            stream.auto_acknowledge_remaining = remaining - size
+
+        frames = self._acknowledge_connection_data(size)
+        if stream.open:
+            frames.extend(stream.acknowledge_received_data(size))
+        return frames
+
     def _receive_settings_frame(self, frame: SettingsFrame) -> tuple[list[Frame], list[Event]]:
         """
         Receive a SETTINGS frame on the connection.
@@ -1812,6 +2905,7 @@ class H2Connection:
             stream_events = [window_updated_event]
             frames = []
 
+        frames.extend(self._buffered_data_frames())
         return frames, events + stream_events
 
     def _receive_ping_frame(self, frame: PingFrame) -> tuple[list[Frame], list[Event]]:
@@ -1825,6 +2919,18 @@ class H2Connection:
 
         evt: PingReceived | PingAckReceived
         if "ACK" in frame.flags:
+            estimator = self._bdp_estimator
+            if estimator is not None and estimator.probing and frame.opaque_data == _BDP_PING_DATA:
+                # This acknowledges our own probe, which the user never sees.
+                # The application may have resized the connection window
+                # itself, so the probe is judged against the window as it is
+                # now.
+                estimator.window_size = self._inbound_flow_control_window_manager.max_window_size
+                window_size = estimator.probe_acknowledged()
+                if window_size is not None:
+                    self._grow_inbound_windows(window_size)
+                return frames, events
+
             evt = PingAckReceived(ping_data=frame.opaque_data)
         else:
             evt = PingReceived(ping_data=frame.opaque_data)
@@ -1839,6 +2945,25 @@ class H2Connection:
 
         return frames, events
 
+    def _grow_inbound_windows(self, window_size: int) -> None:
+        """
+        Grow the inbound flow control windows of the connection and of its
+        streams to ``window_size``, as automatic tuning has decided.
+        """
+        self.config.logger.debug(
+            "Grow inbound flow control windows to %d", window_size,
+        )
+        # The window manager's maximum is the size the window has been
+        # advertised at, including any increments made by the application.
+        # Data that has been received but not yet handed back keeps its
+        # current size below that, so the increment is taken from the
+        # maximum, and the manager told to hand data back up to the new size.
+        manager = self._inbound_flow_control_window_manager
+        self.increment_flow_control_window(window_size - manager.max_window_size)
+        manager.max_window_size = max(manager.max_window_size, window_size)
+        if window_size > self.local_settings.initial_window_size:
+            self.update_settings({SettingCodes.INITIAL_WINDOW_SIZE: window_size})
+
     def _receive_rst_stream_frame(self, frame: RstStreamFrame) -> tuple[list[Frame], list[Event]]:
         """
         Receive a RST_STREAM frame on the connection.
@@ -1880,6 +3005,11 @@ class H2Connection:
             raise ProtocolError(msg)
         events.append(event)
 
+        if frame.stream_id not in self._closed_streams:
+            self._scheduler.prioritize(
+                event.stream_id, event.weight, event.depends_on, event.exclusive,
+            )
+
         return [], events
 
     def _receive_goaway_frame(self, frame: GoAwayFrame) -> tuple[list[Frame], list[Event]]:
@@ -1969,6 +3099,9 @@ class H2Connection:
         RFC 7540 § 5.5 says that we MUST ignore unknown frame types: so we
         do. We do notify the user that we received one, however.
         """
+        if frame.type == PRIORITY_UPDATE_FRAME_TYPE:
+            return self._receive_priority_update_frame(frame)
+
         # All we do here is log.
         self.config.logger.debug(
             "Received unknown extension frame (ID %d)", frame.stream_id,
@@ -1976,6 +3109,73 @@ class H2Connection:
         event = UnknownFrameReceived(frame=frame)
         return [], [event]
 
+    def _receive_priority_update_frame(self, frame: ExtensionFrame) -> tuple[list[Frame], list[Event]]:
+        """
+        Receive an RFC 9218 PRIORITY_UPDATE frame on the connection.
+        """
+        if self.config.client_side:
+            msg = "Clients cannot receive PRIORITY_UPDATE frames."
+            raise ProtocolError(msg)
+        if frame.stream_id:
+            msg = f"PRIORITY_UPDATE frame received on stream {frame.stream_id}"
+            raise ProtocolError(msg)
+        if len(frame.body) < 4:
+            msg = "PRIORITY_UPDATE frame is too short"
+            raise FrameDataMissingError(msg)
+
+        stream_id = int.from_bytes(frame.body[:4], "big") & 0x7FFFFFFF
+        if not stream_id:
+            msg = "PRIORITY_UPDATE frame received for stream 0"
+            raise ProtocolError(msg)
+
+        field_value = frame.body[4:]
+        urgency, incremental = parse_priority_field(field_value)
+        self.config.logger.debug(
+            "Received PRIORITY_UPDATE for stream ID %d: %r", stream_id, field_value,
+        )
+
+        stream = self.streams.get(stream_id)
+        if stream is not None:
+            self._set_stream_priority(stream, urgency, incremental)
+        elif stream_id % 2 and stream_id > self.highest_inbound_stream_id:
+            # The request has not arrived yet: this priority replaces any it
+            # carries.
+            self._pending_priority_updates[stream_id] = (urgency, incremental)
+
+        event = PriorityUpdateReceived(
+            stream_id=stream_id,
+            urgency=urgency,
+            incremental=incremental,
+            field_value=field_value,
+        )
+        return [], [event]
+
+    def _receive_request_priority(self, stream: H2Stream, headers: list[Header]) -> None:
+        """
+        Set the priority of a new inbound stream, from a PRIORITY_UPDATE frame
+        that arrived before it or from its ``priority`` header fields.
+        """
+        priority = self._pending_priority_updates.pop(stream.stream_id, None)
+        if priority is None:
+            values = [
+                value if isinstance(value, bytes) else value.encode("utf-8")
+                for name, value in headers
+                if name in (b"priority", "priority")
+            ]
+            if not values:
+                return
+            priority = parse_priority_field(b", ".join(values))
+
+        self._set_stream_priority(stream, *priority)
+
+    def _set_stream_priority(self, stream: H2Stream, urgency: int, incremental: bool) -> None:
+        """
+        Record the RFC 9218 priority of a stream, and tell the scheduler.
+        """
+        stream.urgency = urgency
+        stream.incremental = incremental
+        self._scheduler.update_stream(stream)
+
     def _local_settings_acked(self) -> dict[SettingCodes | int, ChangedSetting]:
         """
         Handle the local settings being ACKed, update internal state.
@@ -2086,6 +3286,51 @@ def _add_frame_priority(frame: PriorityFrame | HeadersFrame,
     return frame
 
 
+def _coalesce_frames(frames: list[Frame]) -> list[Frame]:
+    """
+    Merge WINDOW_UPDATE frames for the same stream into the first of them, as
+    far as the largest allowed increment permits, and drop the empty DATA
+    frames that can be done without. An empty DATA frame that ends its stream
+    is only dropped if the stream's previous frame is a DATA frame, which then
+    ends the stream instead.
+    """
+    coalesced: list[Frame] = []
+    window_updates: dict[int, WindowUpdateFrame] = {}
+
+    # The DATA frame that is the last frame so far for each stream.
+    last_data_frames: dict[int, DataFrame] = {}
+
+    for f in frames:
+        if isinstance(f, WindowUpdateFrame):
+            first = window_updates.get(f.stream_id)
+            if first is not None:
+                # A frame can only carry so large an increment: fill the
+                # first frame, and carry the rest in this one.
+                room = H2Connection.MAX_WINDOW_INCREMENT - first.window_increment
+                if f.window_increment <= room:
+                    first.window_increment += f.window_increment
+                    continue
+                first.window_increment += room
+                f.window_increment -= room
+            window_updates[f.stream_id] = f
+        elif isinstance(f, DataFrame):
+            if not f.data and "PADDED" not in f.flags:
+                if "END_STREAM" not in f.flags:
+                    continue
+                previous = last_data_frames.get(f.stream_id)
+                if previous is not None:
+                    previous.flags.add("END_STREAM")
+                    continue
+            last_data_frames[f.stream_id] = f
+            coalesced.append(f)
+            continue
+
+        last_data_frames.pop(f.stream_id, None)
+        coalesced.append(f)
+
+    return coalesced
+
+
 def _decode_headers(decoder: Decoder, encoded_header_block: bytes) -> Iterable[Header]:
     """
     Decode a HPACK-encoded header block, translating HPACK exceptions into
@@ -642,6 +642,46 @@ class AlternativeServiceAvailable(Event):
         )
 
 
+@dataclass(**kw_only)
+class PriorityUpdateReceived(Event):
+    """
+    The PriorityUpdateReceived event is fired when the remote peer changes the
+    priority of a stream with an `RFC 9218
+    <https://www.rfc-editor.org/rfc/rfc9218>`_ PRIORITY_UPDATE frame. h2
+    records the new priority on the stream, where it is used by an
+    :class:`UrgencyScheduler <h2.scheduling.UrgencyScheduler>`.
+
+    The priority may be for a stream that has not been opened yet, in which
+    case it is applied to the stream when its request is received, instead of
+    any ``priority`` header field in the request.
+
+    This event can only be fired on the server end of a connection.
+
+    .. versionadded:: 4.3.0
+    """
+
+    stream_id: int
+    """The ID of the stream whose priority has changed."""
+
+    urgency: int
+    """The new urgency, from ``0`` (the most urgent) to ``7``."""
+
+    incremental: bool
+    """Whether the response can now be used incrementally."""
+
+    field_value: bytes
+    """
+    The priority field value, exactly as sent. Parameters other than the
+    urgency and incremental parameters may be parsed from this.
+    """
+
+    def __repr__(self) -> str:
+        return (
+            f"<PriorityUpdateReceived stream_id:{self.stream_id}, urgency:{self.urgency}, "
+            f"incremental:{self.incremental}>"
+        )
+
+
 @dataclass(**kw_only)
 class UnknownFrameReceived(Event):
     """
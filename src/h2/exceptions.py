@@ -192,3 +192,13 @@ class DenialOfServiceError(ProtocolError):
     #: The error code corresponds to this kind of
     #: :class:`ProtocolError <h2.exceptions.ProtocolError>`
     error_code = ErrorCodes.ENHANCE_YOUR_CALM
+
+
+class OutboundBufferFullError(H2Error):
+    """
+    An attempt was made to send data while the outbound data buffer is full,
+    on a connection configured with ``strict_outbound_buffer``. Send the
+    buffered data to the network and try again.
+
+    .. versionadded:: 4.3.0
+    """
@@ -7,21 +7,97 @@ frames.
 """
 from __future__ import annotations
 
+import struct
+from typing import Callable
+
 from hyperframe.exceptions import InvalidDataError, InvalidFrameError
-from hyperframe.frame import ContinuationFrame, Frame, HeadersFrame, PushPromiseFrame
+from hyperframe.frame import (
+    FRAMES,
+    ContinuationFrame,
+    DataFrame,
+    ExtensionFrame,
+    Frame,
+    HeadersFrame,
+    PushPromiseFrame,
+)
 
-from .exceptions import FrameDataMissingError, FrameTooLargeError, ProtocolError
+from .exceptions import DenialOfServiceError, FrameDataMissingError, FrameTooLargeError, ProtocolError
 
 # To avoid a DOS attack based on sending loads of continuation frames, we limit
-# the maximum number we're perpared to receive. In this case, we'll set the
-# limit to 64, which means the largest encoded header block we can receive by
-# default is 262144 bytes long, and the largest possible *at all* is 1073741760
-# bytes long.
-#
-# This value seems reasonable for now, but in future we may want to evaluate
-# making it configurable.
+# the maximum number we're perpared to receive. By default, we'll set the
+# limit to 64 frames, including the leading HEADERS or PUSH_PROMISE frame. The
+# limit can be changed with the max_header_block_frames configuration option.
+# The size of the assembled header block is limited separately, in bytes.
 CONTINUATION_BACKLOG = 64
 
+# The consumed prefix of the receive buffer is only discarded once it makes up
+# at least this fraction of the buffer. Until then, frames are parsed in place
+# by advancing a read offset, so a large read containing many frames is only
+# moved in memory a bounded number of times rather than once per frame.
+COMPACTION_RATIO = 2
+
+# The amount of space lent out by get_buffer when the caller has no opinion on
+# how much data it is about to write.
+DEFAULT_BUFFER_SIZE = 2**16
+
+# The layout of the 9-byte frame header: a 24-bit length (split into 16 and 8
+# bits), the type, the flags and the stream ID.
+_FRAME_HEADER = struct.Struct(">HBBBL")
+
+# The header fields of a complete frame: the frame type, flags, stream ID, the
+# offset of the frame body in the receive buffer and the length of the body.
+_FrameHeader = tuple[int, int, int, int, int]
+
+# The DATA frame type and the flags it defines.
+_DATA_TYPE = DataFrame.type
+_END_STREAM = 0x01
+_PADDED = 0x08
+
+# The CONTINUATION frame type and the one flag it defines.
+_CONTINUATION_TYPE = ContinuationFrame.type
+_END_HEADERS = 0x04
+_DATA_FLAGS = {
+    0: frozenset(),
+    _END_STREAM: frozenset({"END_STREAM"}),
+    _PADDED: frozenset({"PADDED"}),
+    _END_STREAM | _PADDED: frozenset({"END_STREAM", "PADDED"}),
+}
+
+
+class ReceivedDataFrame:
+    """
+    A DATA frame decoded directly from the receive buffer, without building a
+    hyperframe ``DataFrame``.
+
+    This carries exactly the fields that are needed to process received data,
+    under the same names as on ``DataFrame``.
+    """
+
+    __slots__ = ("data", "flags", "flow_controlled_length", "stream_id")
+
+    def __init__(self,
+                 stream_id: int,
+                 flags: frozenset[str],
+                 data: bytes,
+                 flow_controlled_length: int) -> None:
+        #: The stream ID the frame was received on.
+        self.stream_id = stream_id
+
+        #: The names of the flags set on the frame.
+        self.flags = flags
+
+        #: The frame payload, without any padding.
+        self.data = data
+
+        #: The length of the frame body, padding included.
+        self.flow_controlled_length = flow_controlled_length
+
+    def __repr__(self) -> str:
+        return (
+            f"{type(self).__name__}(stream_id={self.stream_id}, "
+            f"flags={sorted(self.flags)!r}): <{len(self.data)} bytes>"
+        )
+
 
 class FrameBuffer:
     """
@@ -30,11 +106,44 @@ class FrameBuffer:
     """
 
     def __init__(self, server: bool = False) -> None:
-        self.data = b""
+        # The received data lives in a growable bytearray. Everything before
+        # _offset has already been turned into frames, and everything from
+        # _end onwards is spare space that may be lent out by get_buffer.
+        self._data = bytearray()
+        self._offset = 0
+        self._end = 0
+        self._lent: memoryview | None = None
         self.max_frame_size = 0
+
+        #: Callables, keyed by frame type, that are given the stream ID and
+        #: body of each complete frame of that type before it is parsed. If
+        #: one returns ``True``, the frame is dropped without building a frame
+        #: object for it. Frames are never skipped in the middle of a header
+        #: block.
+        self.skip_filters: dict[int, Callable[[int, memoryview], bool]] = {}
+
+        #: If set, well-formed DATA frames are returned as
+        #: :class:`ReceivedDataFrame` objects rather than hyperframe
+        #: ``DataFrame`` objects.
+        self.decode_data_frames = False
+
+        # The header block currently being received, if any: the HEADERS or
+        # PUSH_PROMISE frame that started it, the header block fragments that
+        # have arrived so far and the number of frames they arrived in.
+        self._header_block_frame: HeadersFrame | PushPromiseFrame | None = None
+        self._header_block = bytearray()
+        self._header_block_frames = 0
+
+        #: The most frames a header block may be split across, counting the
+        #: HEADERS or PUSH_PROMISE frame as well as the CONTINUATION frames.
+        self.max_header_block_frames = CONTINUATION_BACKLOG
+
+        #: The largest header block, in bytes, that may be assembled from
+        #: CONTINUATION frames, or ``None`` for no limit.
+        self.max_header_block_size: int | None = None
+
         self._preamble = b"PRI * HTTP/2.0\r\n\r\nSM\r\n\r\n" if server else b""
         self._preamble_len = len(self._preamble)
-        self._headers_buffer: list[HeadersFrame | ContinuationFrame | PushPromiseFrame] = []
 
     def add_data(self, data: bytes) -> None:
         """
@@ -43,18 +152,118 @@ class FrameBuffer:
         :param data: A bytestring containing the byte buffer.
         """
         if self._preamble_len:
-            data_len = len(data)
-            of_which_preamble = min(self._preamble_len, data_len)
+            data = data[self._check_preamble(data):]
+
+        self._release_buffer()
+        self._compact()
+        try:
+            self._data[self._end:] = data
+        except BufferError:
+            # Somebody still holds a view onto the old buffer (for example a
+            # traceback from a previous parse error): we can't resize it in
+            # place, so take a fresh one.
+            self._data = self._data[:self._end] + data
+        self._end = len(self._data)
+
+    def get_buffer(self, sizehint: int = -1) -> memoryview:
+        """
+        Lend out a writable view onto the free space at the end of the frame
+        buffer, so that data can be received directly into it (for example with
+        ``socket.recv_into``). Once data has been written, call
+        :meth:`buffer_updated` with the number of bytes written.
+
+        The view is only valid until the next call to any method of this
+        object, after which it is released.
+
+        :param sizehint: The minimum number of bytes the caller would like to
+            be able to write. If zero or negative, a reasonable default is
+            used.
+        :returns: A writable ``memoryview`` of at least ``sizehint`` bytes.
+        """
+        self._release_buffer()
+        self._compact()
+
+        size = sizehint if sizehint > 0 else DEFAULT_BUFFER_SIZE
+        spare = len(self._data) - self._end
+        if spare < size:
+            try:
+                self._data += bytes(size - spare)
+            except BufferError:
+                self._data = self._data + bytes(size - spare)
+
+        self._lent = memoryview(self._data)[self._end:self._end+size]
+        return self._lent
+
+    def buffer_updated(self, nbytes: int) -> None:
+        """
+        Notify the frame buffer that ``nbytes`` bytes of data have been written
+        into the view returned by the last call to :meth:`get_buffer`.
+
+        :param nbytes: The number of bytes written.
+        """
+        if self._lent is None:
+            msg = "buffer_updated called without a matching get_buffer"
+            raise RuntimeError(msg)
+        if not 0 <= nbytes <= len(self._lent):
+            msg = f"nbytes must be between 0 and {len(self._lent)}, not {nbytes}"
+            raise ValueError(msg)
+
+        self._release_buffer()
+        start = self._end
+        self._end += nbytes
+
+        if self._preamble_len:
+            # Nothing can have been buffered ahead of the preamble, so we can
+            # skip over it by moving the read offset.
+            self._offset += self._check_preamble(
+                self._data[start:min(self._end, start + self._preamble_len)],
+            )
+
+    def __len__(self) -> int:
+        """
+        The number of received bytes that have not yet been parsed into
+        frames.
+        """
+        return self._end - self._offset
+
+    def _check_preamble(self, data: bytes | bytearray) -> int:
+        """
+        Validate as much of the connection preamble as is present at the start
+        of ``data``, returning the number of bytes of preamble found.
+        """
+        of_which_preamble = min(self._preamble_len, len(data))
 
-            if self._preamble[:of_which_preamble] != data[:of_which_preamble]:
-                msg = "Invalid HTTP/2 preamble."
-                raise ProtocolError(msg)
+        if self._preamble[:of_which_preamble] != data[:of_which_preamble]:
+            msg = "Invalid HTTP/2 preamble."
+            raise ProtocolError(msg)
 
-            data = data[of_which_preamble:]
-            self._preamble_len -= of_which_preamble
-            self._preamble = self._preamble[of_which_preamble:]
+        self._preamble_len -= of_which_preamble
+        self._preamble = self._preamble[of_which_preamble:]
+        return of_which_preamble
 
-        self.data += data
+    def _release_buffer(self) -> None:
+        """
+        Take back any view lent out by :meth:`get_buffer`, so that the buffer
+        can be resized again.
+        """
+        if self._lent is not None:
+            self._lent.release()
+            self._lent = None
+
+    def _compact(self) -> None:
+        """
+        Throw away the bytes that have already been parsed, if there are enough
+        of them to make that worthwhile.
+        """
+        if not self._offset or self._offset * COMPACTION_RATIO < self._end:
+            return
+
+        try:
+            del self._data[:self._offset]
+        except BufferError:
+            self._data = self._data[self._offset:]
+        self._end -= self._offset
+        self._offset = 0
 
     def _validate_frame_length(self, length: int) -> None:
         """
@@ -64,81 +273,192 @@ class FrameBuffer:
             msg = f"Received overlong frame: length {length}, max {self.max_frame_size}"
             raise FrameTooLargeError(msg)
 
-    def _update_header_buffer(self, f: Frame | None) -> Frame | None:
+    def _update_header_buffer(self, f: Frame) -> Frame | None:
         """
         Updates the internal header buffer. Returns a frame that should replace
         the current one. May throw exceptions if this frame is invalid.
         """
         # Check if we're in the middle of a headers block. If we are, this
         # frame *must* be a CONTINUATION frame with the same stream ID as the
-        # leading HEADERS or PUSH_PROMISE frame. Anything else is a
-        # ProtocolError. If the frame *is* valid, append it to the header
-        # buffer.
-        if self._headers_buffer:
-            stream_id = self._headers_buffer[0].stream_id
-            valid_frame = (
-                f is not None and
-                isinstance(f, ContinuationFrame) and
-                f.stream_id == stream_id
-            )
-            if not valid_frame:
-                msg = "Invalid frame during header block."
-                raise ProtocolError(msg)
-            assert isinstance(f, ContinuationFrame)
-
-            # Append the frame to the buffer.
-            self._headers_buffer.append(f)
-            if len(self._headers_buffer) > CONTINUATION_BACKLOG:
-                msg = "Too many continuation frames received."
-                raise ProtocolError(msg)
-
-            # If this is the end of the header block, then we want to build a
-            # mutant HEADERS frame that's massive. Use the original one we got,
-            # then set END_HEADERS and set its data appopriately. If it's not
-            # the end of the block, lose the current frame: we can't yield it.
-            if "END_HEADERS" in f.flags:
-                f = self._headers_buffer[0]
-                f.flags.add("END_HEADERS")
-                f.data = b"".join(x.data for x in self._headers_buffer)
-                self._headers_buffer = []
-            else:
-                f = None
-        elif (isinstance(f, (HeadersFrame, PushPromiseFrame)) and
+        # leading HEADERS or PUSH_PROMISE frame: those are added to the block
+        # before they get here. Anything else is a ProtocolError.
+        if self._header_block_frame is not None:
+            msg = "Invalid frame during header block."
+            raise ProtocolError(msg)
+
+        if (isinstance(f, (HeadersFrame, PushPromiseFrame)) and
                 "END_HEADERS" not in f.flags):
             # This is the start of a headers block! Save the frame off and then
             # act like we didn't receive one.
-            self._headers_buffer.append(f)
-            f = None
+            self._header_block_frame = f
+            self._header_block_frames = 0
+            self._add_header_block_fragment(f.data)
+            return None
+
+        return f
+
+    def _add_header_block_fragment(self, fragment: bytes | memoryview) -> None:
+        """
+        Append a header block fragment to the header block being assembled,
+        enforcing the limits on the number of frames and bytes in the block.
+        """
+        self._header_block_frames += 1
+        if self._header_block_frames > self.max_header_block_frames:
+            msg = "Too many continuation frames received."
+            raise ProtocolError(msg)
+
+        # Check the size before appending, so that an oversized fragment is
+        # never copied into the block.
+        if (self.max_header_block_size is not None and
+                len(self._header_block) + len(fragment) > self.max_header_block_size):
+            msg = (
+                f"Header block is larger than {self.max_header_block_size} "
+                "bytes."
+            )
+            raise DenialOfServiceError(msg)
+        self._header_block += fragment
+
+    def _receive_continuation(self, flags: int, offset: int, length: int) -> Frame | None:
+        """
+        Add the body of a CONTINUATION frame for the header block in progress
+        straight to the block, without building a frame object. If this ends
+        the header block, returns the leading frame carrying the whole block.
+        """
+        self._validate_frame_length(length)
+        self._add_header_block_fragment(
+            memoryview(self._data)[offset:offset+length],
+        )
+        if not flags & _END_HEADERS:
+            return None
 
+        # This is the end of the header block: hand back the original frame,
+        # carrying the whole block. The assembled bytearray goes with it, so
+        # the fragments are never joined or copied again: the HPACK decoder
+        # only needs a bytes-like object.
+        f = self._header_block_frame
+        assert f is not None
+        f.flags.add("END_HEADERS")
+        f.data = self._header_block  # type: ignore[assignment]
+        self._header_block_frame = None
+        self._header_block = bytearray()
         return f
 
     # The methods below support the iterator protocol.
     def __iter__(self) -> FrameBuffer:
         return self
 
-    def __next__(self) -> Frame:
-        # First, check that we have enough data to successfully parse the
-        # next frame header. If not, bail. Otherwise, parse it.
-        if len(self.data) < 9:
-            raise StopIteration
+    def _check_partial_frame_header(self) -> None:
+        """
+        Frame headers are validated as soon as they arrive, even if the rest of
+        the frame has not yet been received.
+        """
+        offset = self._offset
+        if self._end - offset >= 9:
+            try:
+                Frame.parse_frame_header(memoryview(self._data)[offset:offset+9])
+            except (InvalidDataError, InvalidFrameError) as err:  # pragma: no cover
+                msg = f"Received frame with invalid header: {err!s}"
+                raise ProtocolError(msg) from err
 
+    def _complete_frame_header(self) -> _FrameHeader | None:
+        """
+        Decode the header of the next frame straight from the receive buffer,
+        returning ``None`` unless the whole frame has arrived.
+        """
+        offset = self._offset
+        if self._end - offset < 9:
+            return None
+        length_high, length_low, frame_type, flags, stream_id = _FRAME_HEADER.unpack_from(
+            self._data, offset,
+        )
+        length = (length_high << 8) + length_low
+        if offset + 9 + length > self._end:
+            return None
+        return frame_type, flags, stream_id & 0x7FFFFFFF, offset + 9, length
+
+    def _next_frame_header(self) -> _FrameHeader:
+        """
+        Returns the header fields of the next complete frame, without moving
+        past it. Frames that a skip filter claims are dropped along the way,
+        without being parsed, unless they are part of a header block.
+
+        If there is no complete frame, any partial frame is left in the buffer
+        for next time and ``StopIteration`` is raised.
+        """
+        while True:
+            header = self._complete_frame_header()
+            if header is None:
+                self._check_partial_frame_header()
+                raise StopIteration
+
+            frame_type, _, stream_id, offset, length = header
+            end = offset + length
+            skip = self.skip_filters.get(frame_type)
+            if (skip is None or self._header_block_frame is not None or
+                    not skip(stream_id, memoryview(self._data)[offset:end])):
+                return header
+
+            # Skipped frames are still subject to the frame size limit.
+            self._validate_frame_length(length)
+            self._offset = end
+
+    def _decode_data_frame(self,
+                           flags: int,
+                           stream_id: int,
+                           offset: int,
+                           length: int) -> ReceivedDataFrame | None:
+        """
+        Decode the DATA frame with the given header fields directly from the
+        receive buffer. Returns ``None`` if the padding is malformed, leaving
+        hyperframe to report the error exactly as it always has.
+        """
+        self._validate_frame_length(length)
+
+        start = offset
+        stop = offset + length
+        if flags & _PADDED:
+            if not length:
+                return None
+            pad_length = self._data[offset]
+            if pad_length >= length:
+                return None
+            start += 1
+            stop -= pad_length
+
+        return ReceivedDataFrame(
+            stream_id,
+            _DATA_FLAGS[flags & (_END_STREAM | _PADDED)],
+            memoryview(self._data)[start:stop].tobytes(),
+            length,
+        )
+
+    def _parse_frame(self,
+                     frame_type: int,
+                     flags: int,
+                     stream_id: int,
+                     offset: int,
+                     length: int) -> Frame:
+        """
+        Build a hyperframe frame from the given header fields and the frame
+        body in the receive buffer.
+        """
         try:
-            f, length = Frame.parse_frame_header(memoryview(self.data[:9]))
-        except (InvalidDataError, InvalidFrameError) as err:  # pragma: no cover
+            f = FRAMES[frame_type](stream_id)
+        except KeyError:
+            f = ExtensionFrame(type=frame_type, stream_id=stream_id)
+        except InvalidDataError as err:  # pragma: no cover
             msg = f"Received frame with invalid header: {err!s}"
             raise ProtocolError(msg) from err
-
-        # Next, check that we have enough length to parse the frame body. If
-        # not, bail, leaving the frame header data in the buffer for next time.
-        if len(self.data) < length + 9:
-            raise StopIteration
+        f.parse_flags(flags)
 
         # Confirm the frame has an appropriate length.
         self._validate_frame_length(length)
 
-        # Try to parse the frame body
+        # Try to parse the frame body. The body is handed to hyperframe as a
+        # view onto the receive buffer: nothing is copied until hyperframe
+        # extracts the fields it keeps.
         try:
-            f.parse_body(memoryview(self.data[9:9+length]))
+            f.parse_body(memoryview(self._data)[offset:offset+length])
         except InvalidDataError as err:
             msg = "Received frame with non-compliant data"
             raise ProtocolError(msg) from err
@@ -146,16 +466,51 @@ class FrameBuffer:
             msg = "Frame data missing or invalid"
             raise FrameDataMissingError(msg) from err
 
-        # At this point, as we know we'll use or discard the entire frame, we
-        # can update the data.
-        self.data = self.data[9+length:]
+        return f
+
+    def has_complete_frame(self) -> bool:
+        """
+        Returns ``True`` if the buffer holds at least one complete frame that
+        has not been consumed yet.
+        """
+        return self._complete_frame_header() is not None
+
+    def __next__(self) -> Frame | ReceivedDataFrame:
+        # Frames that are held back in the header buffer don't produce a frame
+        # of their own, so keep going until a frame can be returned or the
+        # buffer runs out.
+        while True:
+            frame_type, flags, stream_id, offset, length = self._next_frame_header()
+            end = offset + length
+
+            header_block_frame = self._header_block_frame
+            if header_block_frame is None:
+                # DATA frames make up most received data, so they can skip
+                # hyperframe entirely. Anything unusual, such as a DATA frame
+                # on stream 0, takes the slow path so that it fails in the
+                # usual way.
+                if frame_type == _DATA_TYPE and stream_id and self.decode_data_frames:
+                    data_frame = self._decode_data_frame(flags, stream_id, offset, length)
+                    if data_frame is not None:
+                        self._offset = end
+                        return data_frame
+            elif frame_type == _CONTINUATION_TYPE and stream_id == header_block_frame.stream_id:
+                # CONTINUATION frames for the header block in progress are
+                # added to it directly. Any other frame in the middle of a
+                # header block is an error, raised once it has been parsed.
+                f = self._receive_continuation(flags, offset, length)
+                self._offset = end
+                if f is not None:
+                    return f
+                continue
+
+            f = self._parse_frame(frame_type, flags, stream_id, offset, length)
 
-        # Pass the frame through the header buffer.
-        new_frame = self._update_header_buffer(f)
+            # At this point, as we know we'll use or discard the entire frame,
+            # we can move past it.
+            self._offset = end
 
-        # If we got a frame we didn't understand or shouldn't yield, rather
-        # than return None it'd be better if we just tried to get the next
-        # frame in the sequence instead. Recurse back into ourselves to do
-        # that. This is safe because the amount of work we have to do here is
-        # strictly bounded by the length of the buffer.
-        return new_frame if new_frame is not None else self.__next__()
+            # Pass the frame through the header buffer.
+            new_frame = self._update_header_buffer(f)
+            if new_frame is not None:
+                return new_frame
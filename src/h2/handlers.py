@@ -0,0 +1,136 @@
+"""
+h2/handlers
+~~~~~~~~~~~
+
+Defines the EventHandler interface, for receiving events as method calls.
+"""
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, Callable
+
+from .events import (
+    DataReceived,
+    Event,
+    InformationalResponseReceived,
+    RequestReceived,
+    ResponseReceived,
+    StreamEnded,
+    StreamReset,
+    TrailersReceived,
+    WindowUpdated,
+)
+
+if TYPE_CHECKING:  # pragma: no cover
+    from hpack.struct import Header
+
+    from .errors import ErrorCodes
+
+
+class EventHandler:
+    """
+    Base class for objects that receive events as method calls, rather than as
+    lists of :class:`Event <h2.events.Event>` objects. Install one with
+    :meth:`H2Connection.set_event_handler
+    <h2.connection.H2Connection.set_event_handler>`.
+
+    Subclasses override the methods for the events they are interested in; the
+    default implementations do nothing. Events that have no dedicated method
+    are passed to :meth:`on_event <h2.handlers.EventHandler.on_event>`.
+
+    END_STREAM flags are reported through the ``end_stream`` arguments of
+    :meth:`on_request`, :meth:`on_response`, :meth:`on_trailers` and
+    :meth:`on_data`, so there is no separate call for
+    :class:`StreamEnded <h2.events.StreamEnded>` events.
+
+    .. versionadded:: 4.3.0
+    """
+
+    def on_request(self, stream_id: int, headers: list[Header], end_stream: bool) -> None:
+        """
+        Called when all of a request's headers have been received. See
+        :class:`RequestReceived <h2.events.RequestReceived>`.
+        """
+
+    def on_response(self, stream_id: int, headers: list[Header], end_stream: bool) -> None:
+        """
+        Called when all of a response's headers have been received. See
+        :class:`ResponseReceived <h2.events.ResponseReceived>`.
+        """
+
+    def on_trailers(self, stream_id: int, headers: list[Header], end_stream: bool) -> None:
+        """
+        Called when trailers have been received. See
+        :class:`TrailersReceived <h2.events.TrailersReceived>`.
+        """
+
+    def on_informational_response(self, stream_id: int, headers: list[Header]) -> None:
+        """
+        Called when an informational response has been received. See
+        :class:`InformationalResponseReceived
+        <h2.events.InformationalResponseReceived>`.
+        """
+
+    def on_data(self,
+                stream_id: int,
+                data: bytes,
+                flow_controlled_length: int,
+                end_stream: bool) -> None:
+        """
+        Called when data has been received on a stream. See
+        :class:`DataReceived <h2.events.DataReceived>`.
+        """
+
+    def on_window_updated(self, stream_id: int, delta: int) -> None:
+        """
+        Called when a flow control window has been opened. See
+        :class:`WindowUpdated <h2.events.WindowUpdated>`.
+        """
+
+    def on_stream_reset(self, stream_id: int, error_code: ErrorCodes | int, remote_reset: bool) -> None:
+        """
+        Called when a stream has been reset. See
+        :class:`StreamReset <h2.events.StreamReset>`.
+        """
+
+    def on_event(self, event: Event) -> None:
+        """
+        Called for all other events.
+        """
+
+    def handle_event(self, event: Event) -> None:
+        """
+        Pass an event object to the method that handles it.
+        """
+        try:
+            dispatch = _EVENT_HANDLER_DISPATCH[event.__class__]
+        except KeyError:
+            self.on_event(event)
+            return
+
+        if dispatch is not None:
+            dispatch(self, event)
+
+
+# Stream ends are reported along with the headers or data that carried them.
+_EVENT_HANDLER_DISPATCH: dict[type[Event], Callable[[EventHandler, Any], None] | None] = {
+    RequestReceived: lambda h, e: h.on_request(
+        e.stream_id, e.headers, e.stream_ended is not None,
+    ),
+    ResponseReceived: lambda h, e: h.on_response(
+        e.stream_id, e.headers, e.stream_ended is not None,
+    ),
+    TrailersReceived: lambda h, e: h.on_trailers(
+        e.stream_id, e.headers, e.stream_ended is not None,
+    ),
+    InformationalResponseReceived: lambda h, e: h.on_informational_response(
+        e.stream_id, e.headers,
+    ),
+    DataReceived: lambda h, e: h.on_data(
+        e.stream_id, e.data, e.flow_controlled_length, e.stream_ended is not None,
+    ),
+    WindowUpdated: lambda h, e: h.on_window_updated(e.stream_id, e.delta),
+    StreamReset: lambda h, e: h.on_stream_reset(
+        e.stream_id, e.error_code, e.remote_reset,
+    ),
+    StreamEnded: None,
+}
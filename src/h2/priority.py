@@ -0,0 +1,97 @@
+"""
+h2/priority
+~~~~~~~~~~~
+
+Helpers for the Extensible Prioritization Scheme of RFC 9218: the ``priority``
+header field and the PRIORITY_UPDATE frame.
+"""
+from __future__ import annotations
+
+import re
+
+#: The type of the PRIORITY_UPDATE frame.
+PRIORITY_UPDATE_FRAME_TYPE = 0x10
+
+#: The urgency of a stream that has not said otherwise, on a scale from ``0``
+#: (the most urgent) to ``7``.
+DEFAULT_URGENCY = 3
+
+#: The least urgent urgency.
+LOWEST_URGENCY = 7
+
+_KEY = re.compile(rb"[a-z*][a-z0-9_\-.*]*\Z")
+_INTEGER = re.compile(rb"-?[0-9]{1,15}\Z")
+
+
+def parse_priority_field(value: bytes | str) -> tuple[int, bool]:
+    """
+    Parse a priority field value, from a ``priority`` header field or a
+    PRIORITY_UPDATE frame, into an urgency and whether the response is
+    incremental.
+
+    Parameters that are missing, out of range or of the wrong type take their
+    default values, an urgency of ``3`` and non-incremental, as do all of them
+    if the value is not a valid Structured Field dictionary. Unknown parameters
+    are ignored.
+
+    .. versionadded:: 4.3.0
+
+    :param value: The field value.
+    :type value: ``bytes`` or ``str``
+    :returns: The urgency, from ``0`` to ``7``, and whether the response is
+        incremental.
+    :rtype: ``tuple`` of ``int`` and ``bool``
+    """
+    if isinstance(value, str):
+        try:
+            value = value.encode("ascii")
+        except UnicodeEncodeError:
+            return DEFAULT_URGENCY, False
+
+    members: dict[bytes, bytes | None] = {}
+    for member in value.split(b","):
+        # Parameters on the members are not used by RFC 9218.
+        key, equals, item = member.split(b";", 1)[0].strip(b" \t").partition(b"=")
+        if not _KEY.match(key):
+            return DEFAULT_URGENCY, False
+        members[key] = item if equals else None
+
+    urgency = DEFAULT_URGENCY
+    u = members.get(b"u")
+    if u is not None and _INTEGER.match(u) and 0 <= int(u) <= LOWEST_URGENCY:
+        urgency = int(u)
+
+    # A key with no value is the boolean true.
+    incremental = b"i" in members and members[b"i"] in (None, b"?1")
+    return urgency, incremental
+
+
+def priority_field_value(urgency: int = DEFAULT_URGENCY, incremental: bool = False) -> bytes:
+    """
+    Serialize an urgency and whether the response is incremental into a
+    priority field value, for a ``priority`` header field or
+    :meth:`send_priority_update
+    <h2.connection.H2Connection.send_priority_update>`. Default values are
+    left out.
+
+    .. versionadded:: 4.3.0
+
+    :param urgency: (optional) The urgency, from ``0`` (the most urgent) to
+        ``7``. Defaults to ``3``.
+    :type urgency: ``int``
+    :param incremental: (optional) Whether the response can be used
+        incrementally, as it arrives. Defaults to ``False``.
+    :type incremental: ``bool``
+    :returns: The field value.
+    :rtype: ``bytes``
+    """
+    if not 0 <= urgency <= LOWEST_URGENCY:
+        msg = f"urgency must be between 0 and {LOWEST_URGENCY}, not {urgency}"
+        raise ValueError(msg)
+
+    members = []
+    if urgency != DEFAULT_URGENCY:
+        members.append(b"u=%d" % urgency)
+    if incremental:
+        members.append(b"i")
+    return b", ".join(members)
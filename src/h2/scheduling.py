@@ -0,0 +1,752 @@
+"""
+h2/scheduling
+~~~~~~~~~~~~~
+
+Defines the schedulers that decide the order in which buffered data is sent on
+the streams of a connection.
+"""
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from bisect import bisect_left, insort
+from collections import deque
+from heapq import heapify, heappop, heappush, heapreplace
+from itertools import count
+from typing import TYPE_CHECKING
+
+from .priority import LOWEST_URGENCY
+
+if TYPE_CHECKING:  # pragma: no cover
+    from hyperframe.frame import Frame
+
+    from .stream import H2Stream
+
+
+#: The number of bytes a stream may send per turn by default: one frame of the
+#: default maximum frame size.
+DEFAULT_QUANTUM = 16384
+
+#: The weight of a stream that has not been given an RFC 7540 priority.
+DEFAULT_WEIGHT = 16
+
+#: The number of streams that a :class:`PriorityTree
+#: <h2.scheduling.PriorityTree>` keeps priority information for by default.
+DEFAULT_MAX_TREE_STREAMS = 1000
+
+# A stream's turn moves it back in its parent's queue by this divided by its
+# weight, so that it gets turns in proportion to its weight.
+_STRIDE = 2**16
+
+
+class Scheduler(ABC):
+    """
+    Base class for the objects that decide which streams' buffered data is
+    sent next, when the connection flow control window does not allow all of
+    it to be. Install one with :meth:`H2Connection.set_scheduler
+    <h2.connection.H2Connection.set_scheduler>`.
+
+    The connection calls :meth:`add_stream` whenever data is buffered on a
+    stream with :meth:`send_data_buffered
+    <h2.connection.H2Connection.send_data_buffered>`, and :meth:`next_frames`
+    whenever there may be more data that can be sent. Subclasses must
+    implement both, or cannot be instantiated. Subclasses that take stream
+    priorities into account may also implement :meth:`update_stream` and
+    :meth:`prioritize`, and those that keep state for streams without
+    buffered data :meth:`remove_stream`.
+
+    .. versionadded:: 4.3.0
+    """
+
+    @abstractmethod
+    def add_stream(self, stream: H2Stream) -> None:
+        """
+        Called when data is buffered on a stream. The stream may already have
+        been added, and not yet have had all of its data sent.
+
+        :param stream: The stream.
+        :type stream: :class:`H2Stream <h2.stream.H2Stream>`
+        :returns: Nothing
+        """
+
+    def update_stream(self, stream: H2Stream) -> None:  # noqa: B027
+        """
+        Called when the priority of a stream changes. The stream may not have
+        been added, or may have had all of its data sent. Does nothing by
+        default.
+
+        :param stream: The stream.
+        :type stream: :class:`H2Stream <h2.stream.H2Stream>`
+        :returns: Nothing
+        """
+
+    def prioritize(self, stream_id: int, weight: int, depends_on: int, exclusive: bool) -> None:  # noqa: B027
+        """
+        Called when the remote peer sends RFC 7540 priority information for a
+        stream, in a PRIORITY frame or a HEADERS frame. The stream may not
+        have been opened yet. Does nothing by default.
+
+        :param stream_id: The ID of the stream.
+        :type stream_id: ``int``
+        :param weight: The weight of the stream, between ``1`` and ``256``.
+        :type weight: ``int``
+        :param depends_on: The ID of the stream on which the stream depends,
+            or ``0``.
+        :type depends_on: ``int``
+        :param exclusive: Whether the stream becomes the only dependency of
+            ``depends_on``.
+        :type exclusive: ``bool``
+        :returns: Nothing
+        """
+
+    def remove_stream(self, stream: H2Stream) -> None:  # noqa: B027
+        """
+        Called when the connection forgets a closed stream. Any of its
+        buffered data should be forgotten too. Does nothing by default.
+
+        :param stream: The stream.
+        :type stream: :class:`H2Stream <h2.stream.H2Stream>`
+        :returns: Nothing
+        """
+
+    @abstractmethod
+    def next_frames(self, budget_bytes: int) -> list[Frame]:
+        """
+        Send up to ``budget_bytes`` of buffered data, by calling
+        :meth:`H2Stream.send_buffered_data
+        <h2.stream.H2Stream.send_buffered_data>` on the streams chosen to send
+        it, and return the frames to send.
+
+        Streams may not send more than their own flow control windows allow.
+        Streams that have been closed should have their buffered data
+        discarded, with :meth:`H2Stream.clear_buffered_data
+        <h2.stream.H2Stream.clear_buffered_data>`, and be forgotten, as
+        should streams once all of their data has been sent.
+
+        :param budget_bytes: The most data that may be sent, which is never
+            more than the connection flow control window.
+        :type budget_bytes: ``int``
+        :returns: The frames to send.
+        :rtype: ``list`` of frames
+        """
+
+
+class DeficitRoundRobinScheduler(Scheduler):
+    """
+    A :class:`Scheduler <h2.scheduling.Scheduler>` that shares the connection
+    flow control window evenly between streams, whatever the sizes of the
+    writes made on them. This is the default.
+
+    Streams take turns, in the order in which they had data buffered. On each
+    turn a stream may send up to ``quantum`` bytes. A stream whose turn is cut
+    short by the budget continues it on the next call, and one whose turn is
+    cut short by its own flow control window continues it once the window
+    opens.
+
+    .. versionadded:: 4.3.0
+
+    :param quantum: (optional) The number of bytes a stream may send per turn.
+    :type quantum: ``int``
+    """
+
+    def __init__(self, quantum: int = DEFAULT_QUANTUM) -> None:
+        if quantum < 1:
+            msg = f"quantum must be at least 1, not {quantum}"
+            raise ValueError(msg)
+
+        self.quantum = quantum
+
+        # The streams with buffered data, in turn order, and the number of
+        # bytes that each stream may still send on its current turn.
+        self._streams: deque[H2Stream] = deque()
+        self._deficits: dict[int, int] = {}
+
+    def add_stream(self, stream: H2Stream) -> None:
+        if stream.stream_id not in self._deficits:
+            self._streams.append(stream)
+            self._deficits[stream.stream_id] = 0
+
+    def remove_stream(self, stream: H2Stream) -> None:
+        """
+        Forget a stream, if it has been added, without sending the rest of its
+        data.
+
+        :param stream: The stream.
+        :type stream: :class:`H2Stream <h2.stream.H2Stream>`
+        :returns: Nothing
+        """
+        if self._deficits.pop(stream.stream_id, None) is not None:
+            self._streams.remove(stream)
+
+    def __contains__(self, stream: H2Stream) -> bool:
+        return stream.stream_id in self._deficits
+
+    def next_frames(self, budget_bytes: int) -> list[Frame]:
+        frames: list[Frame] = []
+        _take_turns(self._streams, self._deficits, self.quantum, budget_bytes, frames)
+        return frames
+
+
+class UrgencyScheduler(Scheduler):
+    """
+    A :class:`Scheduler <h2.scheduling.Scheduler>` that follows the priorities
+    signalled by the remote peer with RFC 9218 ``priority`` header fields and
+    PRIORITY_UPDATE frames, as recorded on each stream's ``urgency`` and
+    ``incremental`` attributes.
+
+    Streams of one urgency are only sent data once the more urgent streams
+    have sent all the data that they can. Within an urgency, streams that are
+    not incremental are sent one at a time, in stream ID order, and then
+    incremental streams share what is left, taking turns of up to ``quantum``
+    bytes as with a :class:`DeficitRoundRobinScheduler
+    <h2.scheduling.DeficitRoundRobinScheduler>`.
+
+    .. versionadded:: 4.3.0
+
+    :param quantum: (optional) The number of bytes an incremental stream may
+        send per turn.
+    :type quantum: ``int``
+    """
+
+    def __init__(self, quantum: int = DEFAULT_QUANTUM) -> None:
+        # For each urgency, the streams that are not incremental, sorted by
+        # stream ID, and those that are.
+        self._sequential: list[list[tuple[int, H2Stream]]] = [
+            [] for _ in range(LOWEST_URGENCY + 1)
+        ]
+        self._incremental = [
+            DeficitRoundRobinScheduler(quantum) for _ in range(LOWEST_URGENCY + 1)
+        ]
+
+    def add_stream(self, stream: H2Stream) -> None:
+        # Streams are always kept under their current priority, as the
+        # connection tells us whenever it changes.
+        urgency = stream.urgency
+        sequential = self._sequential[urgency]
+        index = bisect_left(sequential, (stream.stream_id,))
+        if index < len(sequential) and sequential[index][1] is stream:
+            return
+        if stream not in self._incremental[urgency]:
+            self._insert(stream)
+
+    def update_stream(self, stream: H2Stream) -> None:
+        if self._remove(stream):
+            self._insert(stream)
+
+    def remove_stream(self, stream: H2Stream) -> None:
+        self._remove(stream)
+
+    def _insert(self, stream: H2Stream) -> None:
+        if stream.incremental:
+            self._incremental[stream.urgency].add_stream(stream)
+        else:
+            insort(self._sequential[stream.urgency], (stream.stream_id, stream))
+
+    def _remove(self, stream: H2Stream) -> bool:
+        """
+        Remove a stream from whichever urgency it is in, returning whether it
+        was found.
+        """
+        for sequential, incremental in zip(self._sequential, self._incremental):
+            index = bisect_left(sequential, (stream.stream_id,))
+            if index < len(sequential) and sequential[index][1] is stream:
+                del sequential[index]
+                return True
+            if stream in incremental:
+                incremental.remove_stream(stream)
+                return True
+        return False
+
+    def next_frames(self, budget_bytes: int) -> list[Frame]:
+        frames: list[Frame] = []
+        for sequential, incremental in zip(self._sequential, self._incremental):
+            index = 0
+            while budget_bytes and index < len(sequential):
+                stream = sequential[index][1]
+                if stream.closed:
+                    stream.clear_buffered_data()
+                    del sequential[index]
+                    continue
+
+                length = stream.buffered_data_length
+                frames.extend(stream.send_buffered_data(
+                    min(budget_bytes, stream.outbound_flow_control_window),
+                ))
+                budget_bytes -= length - stream.buffered_data_length
+                if stream.has_buffered_data:
+                    # Blocked by its own flow control window.
+                    index += 1
+                else:
+                    del sequential[index]
+
+            budget_bytes = _take_turns(
+                incremental._streams, incremental._deficits, incremental.quantum,
+                budget_bytes, frames,
+            )
+            if not budget_bytes:
+                break
+
+        return frames
+
+
+class PriorityTree:
+    """
+    The RFC 7540 priority tree of the streams of a connection, which decides
+    the order in which streams get turns to send data.
+
+    Streams are added with :meth:`prioritize`, or with the default priority
+    by :meth:`unblock`. A stream that has data to send, and has been
+    unblocked, gets turns ahead of the streams that depend on it. Streams that
+    depend on the same stream share its turns in proportion to their weights.
+    :meth:`next_stream` returns the stream that gets the next turn.
+
+    Changing the priority of a stream or whether it is blocked takes time in
+    proportion to its depth in the tree, plus the number of children moved
+    when a stream is made an exclusive dependency or is removed.
+
+    .. versionadded:: 4.3.0
+
+    :param max_streams: (optional) The number of streams that priority
+        information is kept for. Priority information for more streams is
+        ignored, until some are removed.
+    :type max_streams: ``int``
+    """
+
+    def __init__(self, max_streams: int = DEFAULT_MAX_TREE_STREAMS) -> None:
+        self.max_streams = max_streams
+        self._root = _Node(0, DEFAULT_WEIGHT)
+        self._nodes: dict[int, _Node] = {}
+
+        # The source of the sequence numbers that order and identify the
+        # entries in each stream's queue of children.
+        self._sequence = count(1)
+
+    def __contains__(self, stream_id: int) -> bool:
+        return stream_id in self._nodes
+
+    def __len__(self) -> int:
+        return len(self._nodes)
+
+    def priority(self, stream_id: int) -> tuple[int, int]:
+        """
+        Returns the weight of a stream, and the ID of the stream it depends on.
+
+        :param stream_id: The ID of the stream.
+        :type stream_id: ``int``
+        :returns: The weight and the stream ID, which is ``0`` if the stream
+            does not depend on another.
+        :rtype: ``tuple`` of ``int`` and ``int``
+        :raises KeyError: If the stream is not in the tree.
+        """
+        node = self._nodes[stream_id]
+        assert node.parent is not None
+        return node.weight, node.parent.stream_id
+
+    def prioritize(self,
+                   stream_id: int,
+                   weight: int = DEFAULT_WEIGHT,
+                   depends_on: int = 0,
+                   exclusive: bool = False) -> None:
+        """
+        Set the priority of a stream, adding it to the tree if needed, as
+        described by `RFC 7540 Section 5.3
+        <https://tools.ietf.org/html/rfc7540#section-5.3>`_. A stream that
+        ``depends_on`` is not in the tree is added with the default priority,
+        or if the tree is full, the stream is given the default priority. A
+        stream that is made to depend on one of its own dependencies first has
+        that dependency moved to take its place.
+
+        :param stream_id: The ID of the stream.
+        :type stream_id: ``int``
+        :param weight: (optional) The weight of the stream, between ``1`` and
+            ``256``. Defaults to ``16``.
+        :type weight: ``int``
+        :param depends_on: (optional) The ID of the stream on which the stream
+            depends, or ``0``. Defaults to ``0``.
+        :type depends_on: ``int``
+        :param exclusive: (optional) Whether the stream becomes the only
+            dependency of ``depends_on``, taking on its other dependencies.
+            Defaults to ``False``.
+        :type exclusive: ``bool``
+        :returns: Nothing
+        """
+        if not 1 <= weight <= 256:
+            msg = f"Weight must be between 1 and 256, not {weight}"
+            raise ValueError(msg)
+        if depends_on == stream_id:
+            msg = f"Stream {stream_id} may not depend on itself"
+            raise ValueError(msg)
+
+        root = self._root
+        node = self._nodes.get(stream_id)
+        if node is None:
+            if len(self._nodes) >= self.max_streams:
+                return
+            node = self._nodes[stream_id] = _Node(stream_id, weight)
+            self._attach(node, root)
+
+        parent = self._nodes.get(depends_on, root)
+        if parent is root and depends_on:
+            if len(self._nodes) < self.max_streams:
+                parent = self._nodes[depends_on] = _Node(depends_on, DEFAULT_WEIGHT)
+                self._attach(parent, root)
+            else:
+                weight, exclusive = DEFAULT_WEIGHT, False
+        else:
+            ancestor = parent
+            while ancestor is not root and ancestor is not node:
+                ancestor = ancestor.parent  # type: ignore[assignment]
+            if ancestor is node:
+                grandparent = node.parent
+                assert grandparent is not None
+                self._detach(parent)
+                self._attach(parent, grandparent)
+
+        self._detach(node)
+
+        node.weight = weight
+        if exclusive:
+            self._adopt_children(node, parent)
+        self._attach(node, parent)
+
+    def remove_stream(self, stream_id: int) -> None:
+        """
+        Remove a stream from the tree, if it is in it. The streams that
+        depended on it come to depend on the stream it depended on, sharing
+        its weight in proportion to their own.
+
+        :param stream_id: The ID of the stream.
+        :type stream_id: ``int``
+        :returns: Nothing
+        """
+        node = self._nodes.pop(stream_id, None)
+        if node is None:
+            return
+
+        parent = node.parent
+        assert parent is not None
+        self._detach(node)
+        total = sum(child.weight for child in node.children.values())
+        for child in node.children.values():
+            child.weight = max(1, node.weight * child.weight // total)
+            self._attach(child, parent)
+
+    def block(self, stream_id: int) -> None:
+        """
+        Mark a stream as having no data that can be sent, so that it gets no
+        turns and the streams that depend on it get them instead.
+
+        :param stream_id: The ID of the stream.
+        :type stream_id: ``int``
+        :returns: Nothing
+        """
+        node = self._nodes.get(stream_id)
+        if node is not None and node.ready:
+            node.ready = False
+            if not node.active_children:
+                self._deactivate(node)
+
+    def unblock(self, stream_id: int) -> None:
+        """
+        Mark a stream as having data that can be sent, adding it to the tree
+        with the default priority if needed. All streams start blocked.
+
+        :param stream_id: The ID of the stream.
+        :type stream_id: ``int``
+        :returns: Nothing
+        """
+        node = self._nodes.get(stream_id)
+        if node is None:
+            node = self._nodes[stream_id] = _Node(stream_id, DEFAULT_WEIGHT)
+            self._attach(node, self._root)
+        if not node.ready:
+            node.ready = True
+            if not node.active_children:
+                self._activate(node)
+
+    def next_stream(self) -> int | None:
+        """
+        Returns the ID of the stream that gets the next turn, or ``None`` if
+        no streams are unblocked.
+
+        :rtype: ``int`` or ``None``
+        """
+        node = self._root
+        if not node.active_children:
+            return None
+
+        while not node.ready:
+            queue = node.queue
+            while queue[0][2].entry != queue[0][1]:
+                heappop(queue)
+            pass_value, _, child = queue[0]
+
+            # The child's turn moves it back in the queue by an amount that
+            # is smaller the larger its weight.
+            node.virtual_time = pass_value
+            child.pass_value = pass_value + _STRIDE // child.weight
+            child.entry = next(self._sequence)
+            heapreplace(queue, (child.pass_value, child.entry, child))
+            node = child
+
+        return node.stream_id
+
+    def _attach(self, node: _Node, parent: _Node) -> None:
+        """
+        Make ``node``, which is not in the tree, a child of ``parent``.
+        """
+        node.parent = parent
+        parent.children[node.stream_id] = node
+        if node.ready or node.active_children:
+            self._activate(node)
+
+    def _detach(self, node: _Node) -> None:
+        """
+        Take ``node`` and its descendants out of the tree.
+        """
+        if node.ready or node.active_children:
+            self._deactivate(node)
+        assert node.parent is not None
+        del node.parent.children[node.stream_id]
+        node.parent = None
+
+    def _adopt_children(self, node: _Node, parent: _Node) -> None:
+        """
+        Make all the children of ``parent`` children of ``node``, which is not
+        in the tree.
+        """
+        was_active = parent.ready or parent.active_children
+        for child in parent.children.values():
+            child.parent = node
+            node.children[child.stream_id] = child
+            if child.ready or child.active_children:
+                self._enqueue(child)
+                node.active_children += 1
+
+        parent.children = {}
+        parent.queue = []
+        parent.active_children = 0
+        if was_active and not parent.ready:
+            self._deactivate(parent)
+
+    def _enqueue(self, node: _Node) -> None:
+        """
+        Add ``node`` to its parent's queue of children with data to send.
+        """
+        parent = node.parent
+        assert parent is not None
+
+        # Drop the entries of children that have left the queue once they
+        # outnumber the others.
+        queue = parent.queue
+        if len(queue) > 2 * parent.active_children + 8:
+            queue[:] = [entry for entry in queue if entry[2].entry == entry[1]]
+            heapify(queue)
+
+        # A child that has had no data does not get turns to make up for it.
+        node.pass_value = max(node.pass_value, parent.virtual_time)
+        node.entry = next(self._sequence)
+        heappush(queue, (node.pass_value, node.entry, node))
+
+    def _activate(self, node: _Node) -> None:
+        """
+        Queue ``node``, whose descendants or itself now have data to send, on
+        its ancestors that had none.
+        """
+        root = self._root
+        while node is not root:
+            parent = node.parent
+            assert parent is not None
+            self._enqueue(node)
+            parent.active_children += 1
+            if parent.ready or parent.active_children > 1:
+                break
+            node = parent
+
+    def _deactivate(self, node: _Node) -> None:
+        """
+        Take ``node``, whose descendants and itself no longer have data to
+        send, out of the queues of its ancestors that now have none.
+        """
+        root = self._root
+        while node is not root:
+            parent = node.parent
+            assert parent is not None
+            node.entry = 0
+            parent.active_children -= 1
+            if parent.ready or parent.active_children:
+                break
+            node = parent
+
+
+class _Node:
+    """
+    A stream in a :class:`PriorityTree <h2.scheduling.PriorityTree>`.
+    """
+
+    __slots__ = (
+        "active_children", "children", "entry", "parent", "pass_value", "queue",
+        "ready", "stream_id", "virtual_time", "weight",
+    )
+
+    def __init__(self, stream_id: int, weight: int) -> None:
+        self.stream_id = stream_id
+        self.weight = weight
+        self.parent: _Node | None = None
+        self.children: dict[int, _Node] = {}
+
+        # Whether the stream itself has data to send.
+        self.ready = False
+
+        # The number of children that have data to send, or have descendants
+        # that do, and a heap of them as (pass value, entry, child). Entries
+        # for children whose entry has since changed are left in the heap
+        # until they reach the top.
+        self.active_children = 0
+        self.queue: list[tuple[int, int, _Node]] = []
+
+        # The pass value of the child that had the last turn.
+        self.virtual_time = 0
+
+        # The position of the stream in its parent's queue, and the sequence
+        # number of its entry there, or 0 if it is not queued.
+        self.pass_value = 0
+        self.entry = 0
+
+
+class DependencyTreeScheduler(Scheduler):
+    """
+    A :class:`Scheduler <h2.scheduling.Scheduler>` that follows the RFC 7540
+    priorities signalled by the remote peer with PRIORITY frames and the
+    priority information in HEADERS frames, which it keeps in a
+    :class:`PriorityTree <h2.scheduling.PriorityTree>` as its ``tree``
+    attribute.
+
+    A stream is only sent data when the streams it depends on have none that
+    they can send. Streams that depend on the same stream take turns of up to
+    ``quantum`` bytes, getting turns in proportion to their weights.
+
+    .. versionadded:: 4.3.0
+
+    :param quantum: (optional) The number of bytes a stream may send per turn.
+    :type quantum: ``int``
+    :param max_streams: (optional) The number of streams that priority
+        information is kept for.
+    :type max_streams: ``int``
+    """
+
+    def __init__(self,
+                 quantum: int = DEFAULT_QUANTUM,
+                 max_streams: int = DEFAULT_MAX_TREE_STREAMS) -> None:
+        if quantum < 1:
+            msg = f"quantum must be at least 1, not {quantum}"
+            raise ValueError(msg)
+
+        self.quantum = quantum
+        self.tree = PriorityTree(max_streams)
+
+        # The streams with buffered data.
+        self._streams: dict[int, H2Stream] = {}
+
+    def add_stream(self, stream: H2Stream) -> None:
+        if stream.stream_id not in self._streams:
+            self._streams[stream.stream_id] = stream
+            self.tree.unblock(stream.stream_id)
+
+    def prioritize(self, stream_id: int, weight: int, depends_on: int, exclusive: bool) -> None:
+        self.tree.prioritize(stream_id, weight, depends_on, exclusive)
+
+    def remove_stream(self, stream: H2Stream) -> None:
+        self._streams.pop(stream.stream_id, None)
+        self.tree.remove_stream(stream.stream_id)
+
+    def next_frames(self, budget_bytes: int) -> list[Frame]:
+        tree = self.tree
+        frames: list[Frame] = []
+
+        # The streams blocked by their own flow control windows, which are
+        # given turns again on the next call.
+        blocked: list[int] = []
+        while budget_bytes:
+            stream_id = tree.next_stream()
+            if stream_id is None:
+                break
+
+            stream = self._streams[stream_id]
+            if stream.closed:
+                stream.clear_buffered_data()
+                self.remove_stream(stream)
+                continue
+
+            window = min(budget_bytes, stream.outbound_flow_control_window, self.quantum)
+            if not window:
+                tree.block(stream_id)
+                blocked.append(stream_id)
+                continue
+
+            length = stream.buffered_data_length
+            frames.extend(stream.send_buffered_data(window))
+            budget_bytes -= length - stream.buffered_data_length
+            if not stream.has_buffered_data:
+                del self._streams[stream_id]
+                tree.block(stream_id)
+
+        for stream_id in blocked:
+            tree.unblock(stream_id)
+
+        return frames
+
+
+def _take_turns(streams: deque[H2Stream],
+                deficits: dict[int, int],
+                quantum: int,
+                budget_bytes: int,
+                frames: list[Frame]) -> int:
+    """
+    Send up to ``budget_bytes`` of data from ``streams``, which take turns of
+    up to ``quantum`` bytes, adding the frames to ``frames``. Returns the part
+    of the budget that is left.
+
+    ``deficits`` holds the number of bytes each stream may still send on its
+    current turn. Streams are removed from both once they have sent all their
+    data or have been closed.
+    """
+    # The number of streams in a row that have been unable to send.
+    blocked = 0
+    while budget_bytes and blocked < len(streams):
+        stream = streams[0]
+        stream_id = stream.stream_id
+        if stream.closed:
+            stream.clear_buffered_data()
+            streams.popleft()
+            del deficits[stream_id]
+            continue
+
+        window = min(budget_bytes, stream.outbound_flow_control_window)
+        if not window:
+            streams.rotate(-1)
+            blocked += 1
+            continue
+
+        # A stream with no others to take turns with has as long a turn as
+        # it needs, so that its data is not split at turn boundaries.
+        deficit = deficits[stream_id] or quantum
+        if len(streams) == 1:
+            deficit = window
+        length = stream.buffered_data_length
+        frames.extend(stream.send_buffered_data(min(deficit, window)))
+        sent = length - stream.buffered_data_length
+        budget_bytes -= sent
+        deficit -= sent
+        blocked = 0
+
+        if not stream.has_buffered_data:
+            streams.popleft()
+            del deficits[stream_id]
+        else:
+            # Unless the budget ran out part way through the turn, the
+            # turn is over or the stream is blocked by its own window.
+            deficits[stream_id] = deficit
+            if budget_bytes or not deficit:
+                streams.rotate(-1)
+
+    return budget_bytes
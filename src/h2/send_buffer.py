@@ -0,0 +1,357 @@
+"""
+h2/send_buffer
+~~~~~~~~~~~~~~
+
+A data structure that holds the data waiting to be sent on the network, as
+queues of chunks rather than one contiguous buffer.
+"""
+from __future__ import annotations
+
+import struct
+from collections import deque
+from typing import TYPE_CHECKING, Union
+
+from hyperframe.frame import (
+    DataFrame,
+    GoAwayFrame,
+    PingFrame,
+    RstStreamFrame,
+    SettingsFrame,
+    WindowUpdateFrame,
+)
+
+if TYPE_CHECKING:  # pragma: no cover
+    from collections.abc import Iterable
+
+    from hyperframe.frame import Frame
+
+# DATA frame payloads at least this large are queued as the objects they were
+# given as, rather than being copied into the buffer. Smaller payloads are
+# copied, so that runs of small frames stay contiguous.
+COPY_THRESHOLD = 1024
+
+# The layout of the 9-byte frame header: a 24-bit length (split into 16 and 8
+# bits), the type, the flags and the stream ID.
+_FRAME_HEADER = struct.Struct(">HBBBL")
+
+_DATA_TYPE = DataFrame.type
+_END_STREAM = 0x01
+
+# The frames that are sent ahead of everything else in the buffer, as far as
+# the ordering rules allow.
+_CONTROL_FRAMES = frozenset((
+    GoAwayFrame, PingFrame, RstStreamFrame, SettingsFrame, WindowUpdateFrame,
+))
+
+#: A chunk of data waiting to be sent.
+SendChunk = Union[bytes, bytearray, memoryview]
+
+
+def _is_immutable(data: bytes | memoryview) -> bool:
+    """
+    Whether a payload can safely be queued without copying it: it must not be
+    possible for the caller to change it before it is sent.
+    """
+    if data.__class__ is bytes:
+        return True
+    return isinstance(data, memoryview) and isinstance(data.obj, bytes)
+
+
+class _ChunkQueue:
+    """
+    A queue of data waiting to be sent.
+
+    Small writes are copied onto a ``bytearray`` at the end of the queue.
+    Chunks that cannot change are queued as they are, so that they can be
+    handed to the network without having been copied.
+    """
+
+    def __init__(self) -> None:
+        self._chunks: deque[SendChunk] = deque()
+
+        # The bytearray at the end of the queue that writes are copied onto,
+        # if there is one.
+        self._tail: bytearray | None = None
+
+        # How much of the chunk at the front of the queue has been read. Our
+        # own bytearrays drop data as it is read instead.
+        self._offset = 0
+        self._size = 0
+
+    def write(self, data: bytes | bytearray) -> None:
+        """
+        Copy some data onto the end of the queue.
+        """
+        if not data:
+            return
+        if self._tail is None:
+            self._tail = bytearray()
+            self._chunks.append(self._tail)
+        self._tail += data
+        self._size += len(data)
+
+    def append(self, chunk: bytes | memoryview) -> None:
+        """
+        Queue a chunk that cannot change without copying it.
+        """
+        self._chunks.append(chunk)
+        self._tail = None
+        self._size += len(chunk)
+
+    def read(self, amount: int | None = None) -> bytes:
+        """
+        Remove up to ``amount`` bytes from the front of the queue and return
+        them. If ``amount`` is ``None``, return everything.
+
+        Only the chunks that are read from are touched, so reading a small
+        amount from a large queue is cheap.
+        """
+        chunks = self._chunks
+        if amount is None or amount >= self._size:
+            if self._offset:
+                chunks[0] = memoryview(chunks[0])[self._offset:]
+            data = b"".join(chunks)
+            self.clear()
+            return data
+
+        pieces: list[SendChunk] = []
+        remaining = amount
+        while remaining:
+            chunk = chunks[0]
+            start = self._offset
+            end = start + remaining
+            if end < len(chunk):
+                # Our own bytearrays can cheaply drop data from the front;
+                # anything else is read past with the offset.
+                if chunk.__class__ is bytearray:
+                    pieces.append(chunk[:remaining])
+                    del chunk[:remaining]
+                else:
+                    pieces.append(memoryview(chunk)[start:end])
+                    self._offset = end
+                break
+
+            # The tail is always the last chunk, so it is never consumed in
+            # full here: that is only done by reading everything.
+            pieces.append(memoryview(chunk)[start:] if start else chunk)
+            remaining -= len(chunk) - start
+            chunks.popleft()
+            self._offset = 0
+
+        self._size -= amount
+        return b"".join(pieces)
+
+    def read_buffers(self) -> list[SendChunk]:
+        """
+        Remove everything from the queue and return it as a list of chunks,
+        without copying them.
+        """
+        buffers: list[SendChunk] = [
+            memoryview(chunk) if chunk.__class__ is bytearray else chunk
+            for chunk in self._chunks
+        ]
+        if self._offset:
+            buffers[0] = memoryview(buffers[0])[self._offset:]
+        self.clear()
+        return buffers
+
+    def clear(self) -> None:
+        """
+        Discard everything in the queue.
+        """
+        self._chunks = deque()
+        self._tail = None
+        self._offset = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+
+class SendBuffer:
+    """
+    A buffer of data waiting to be sent.
+
+    The buffer has two lanes. SETTINGS, PING, WINDOW_UPDATE, RST_STREAM and
+    GOAWAY frames go in the control lane, which is always read first, so that
+    they are not held up behind a backlog of DATA frames. Everything else goes
+    in the data lane, in order. A control frame goes in the data lane instead
+    when sending it ahead would break the ordering rules: a frame for a stream
+    that has frames in the data lane, or a SETTINGS ACK while anything is in
+    the data lane, since the frames there were built under the settings it
+    acknowledges. A frame that has been partly read is always finished before
+    anything else is read.
+
+    Large DATA frame payloads that cannot change, ``bytes`` and ``memoryview``
+    objects over ``bytes``, are queued as they are, so that they can be handed
+    to the network without having been copied.
+
+    The buffer becomes :attr:`full` once it holds at least
+    ``high_watermark`` bytes, and stays full until it has been drained down
+    to ``low_watermark`` bytes.
+    """
+
+    def __init__(self) -> None:
+        self._control = _ChunkQueue()
+        self._data = _ChunkQueue()
+
+        # Positions in the data lane are counted from the start of the
+        # connection. The number of bytes read from the data lane, the end of
+        # each frame in it that has not been read in full, and the end of the
+        # last frame that has.
+        self._data_read = 0
+        self._frame_ends: deque[int] = deque()
+        self._frame_end_read = 0
+
+        # The end of the last frame in the data lane for each stream.
+        self._stream_ends: dict[int, int] = {}
+
+        # The number of streams in _stream_ends at which the entries that
+        # have been read are next dropped.
+        self._prune_at = 64
+
+        #: The size at which the buffer becomes full, or ``None`` if it never
+        #: does.
+        self.high_watermark: int | None = None
+
+        #: The size that a full buffer must be drained down to before it is no
+        #: longer full.
+        self.low_watermark = 0
+
+        #: Whether the buffer has reached the high watermark, and not yet been
+        #: drained down to the low watermark.
+        self.full = False
+
+    def write(self, data: bytes | bytearray, control: bool = False) -> None:
+        """
+        Copy some data onto the end of the data lane, or of the control lane
+        if ``control`` is set.
+        """
+        if not data:
+            return
+        if control:
+            self._control.write(data)
+        else:
+            self._data.write(data)
+            self._frame_ends.append(self._data_read + len(self._data))
+        self._check_full()
+
+    def write_frames(self, frames: Iterable[Frame]) -> None:
+        """
+        Serialize some frames onto the end of the buffer.
+        """
+        data = self._data
+        for f in frames:
+            cls = f.__class__
+            stream_id = f.stream_id
+            if cls in _CONTROL_FRAMES and not (
+                (stream_id and self._stream_ends.get(stream_id, 0) > self._data_read) or
+                (cls is SettingsFrame and "ACK" in f.flags and len(data))
+            ):
+                self._control.write(f.serialize())
+                continue
+
+            if isinstance(f, DataFrame) and "PADDED" not in f.flags:
+                payload = f.data
+                length = len(payload)
+                if length >= COPY_THRESHOLD and _is_immutable(payload):
+                    flags = _END_STREAM if "END_STREAM" in f.flags else 0
+                    data.write(_FRAME_HEADER.pack(
+                        length >> 8, length & 0xFF, _DATA_TYPE, flags, stream_id,
+                    ))
+                    f.body_len = length
+                    data.append(payload)
+                else:
+                    data.write(f.serialize())
+            else:
+                data.write(f.serialize())
+
+            end = self._data_read + len(data)
+            self._frame_ends.append(end)
+            if stream_id:
+                self._stream_ends[stream_id] = end
+
+        self._check_full()
+
+    def read(self, amount: int | None = None) -> bytes:
+        """
+        Remove up to ``amount`` bytes from the front of the buffer and return
+        them. If ``amount`` is ``None``, return everything.
+
+        Only the chunks that are read from are touched, so reading a small
+        amount from a large buffer is cheap.
+        """
+        if amount is None or amount >= len(self):
+            return b"".join(self.read_buffers())
+
+        pieces = []
+        remaining = amount
+        if self._data_read != self._frame_end_read:
+            # Finish the frame that was partly read from the data lane.
+            length = min(remaining, self._frame_ends[0] - self._data_read)
+            pieces.append(self._read_data(length))
+            remaining -= length
+        if remaining and self._control:
+            length = min(remaining, len(self._control))
+            pieces.append(self._control.read(length))
+            remaining -= length
+        if remaining:
+            pieces.append(self._read_data(remaining))
+
+        if self.full and len(self) <= self.low_watermark:
+            self.full = False
+        return b"".join(pieces)
+
+    def read_buffers(self) -> list[SendChunk]:
+        """
+        Remove everything from the buffer and return it as a list of chunks,
+        without copying them.
+        """
+        buffers: list[SendChunk] = []
+        if self._data_read != self._frame_end_read:
+            buffers.append(self._read_data(self._frame_ends[0] - self._data_read))
+        buffers.extend(self._control.read_buffers())
+        self._data_read += len(self._data)
+        buffers.extend(self._data.read_buffers())
+        self.clear()
+        return buffers
+
+    def clear(self) -> None:
+        """
+        Discard everything in the buffer.
+        """
+        self._control.clear()
+        self._data_read += len(self._data)
+        self._data.clear()
+        self._frame_ends.clear()
+        self._frame_end_read = self._data_read
+        self._stream_ends.clear()
+        self.full = False
+
+    def _read_data(self, amount: int) -> bytes:
+        """
+        Read ``amount`` bytes from the data lane, keeping track of the frames
+        that have been read in full.
+        """
+        data = self._data.read(amount)
+        self._data_read += amount
+
+        frame_ends = self._frame_ends
+        while frame_ends and frame_ends[0] <= self._data_read:
+            self._frame_end_read = frame_ends.popleft()
+
+        if len(self._stream_ends) >= self._prune_at:
+            self._stream_ends = {
+                stream_id: end
+                for stream_id, end in self._stream_ends.items()
+                if end > self._data_read
+            }
+            self._prune_at = max(64, 2 * len(self._stream_ends))
+        return data
+
+    def _check_full(self) -> None:
+        if self.high_watermark is not None and len(self) >= self.high_watermark:
+            self.full = True
+
+    def __len__(self) -> int:
+        return len(self._control) + len(self._data)
@@ -56,6 +56,13 @@ class SettingCodes(enum.IntEnum):
     #: client set this to 1.
     ENABLE_CONNECT_PROTOCOL = SettingsFrame.ENABLE_CONNECT_PROTOCOL
 
+    #: This setting can be used to tell the remote peer that RFC 7540 stream
+    #: priorities are not used, as defined by RFC 9218. To do so, set this to
+    #: 1.
+    #:
+    #: .. versionadded:: 4.3.0
+    NO_RFC7540_PRIORITIES = 0x9
+
 
 def _setting_code_from_int(code: int) -> SettingCodes | int:
     """
@@ -260,6 +267,21 @@ class Settings(MutableMapping[Union[SettingCodes, int], int]):
     def enable_connect_protocol(self, value: int) -> None:
         self[SettingCodes.ENABLE_CONNECT_PROTOCOL] = value
 
+    @property
+    def no_rfc7540_priorities(self) -> int:
+        """
+        The current value of the :data:`NO_RFC7540_PRIORITIES
+        <h2.settings.SettingCodes.NO_RFC7540_PRIORITIES>` setting. If not set,
+        returns ``0``.
+
+        .. versionadded:: 4.3.0
+        """
+        return self.get(SettingCodes.NO_RFC7540_PRIORITIES, 0)
+
+    @no_rfc7540_priorities.setter
+    def no_rfc7540_priorities(self, value: int) -> None:
+        self[SettingCodes.NO_RFC7540_PRIORITIES] = value
+
     # Implement the MutableMapping API.
     def __getitem__(self, key: SettingCodes | int) -> int:
         val = self._settings[key][0]
@@ -325,7 +347,7 @@ def _validate_setting(setting: SettingCodes | int, value: int) -> ErrorCodes:
     elif setting == SettingCodes.MAX_HEADER_LIST_SIZE:
         if value < 0:
             return ErrorCodes.PROTOCOL_ERROR
-    elif setting == SettingCodes.ENABLE_CONNECT_PROTOCOL and value not in (0, 1):
+    elif setting in (SettingCodes.ENABLE_CONNECT_PROTOCOL, SettingCodes.NO_RFC7540_PRIORITIES) and value not in (0, 1):
         return ErrorCodes.PROTOCOL_ERROR
 
     return ErrorCodes.NO_ERROR
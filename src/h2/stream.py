@@ -6,6 +6,7 @@ An implementation of a HTTP/2 stream.
 """
 from __future__ import annotations
 
+from collections import deque
 from enum import Enum, IntEnum
 from typing import TYPE_CHECKING, Any, Union, cast
 
@@ -31,6 +32,7 @@ from .events import (
     _TrailersSent,
 )
 from .exceptions import FlowControlError, InvalidBodyLengthError, ProtocolError, StreamClosedError
+from .priority import DEFAULT_URGENCY
 from .utilities import (
     HeaderValidationFlags,
     authority_from_headers,
@@ -43,7 +45,7 @@ from .utilities import (
     validate_headers,
     validate_outbound_headers,
 )
-from .windows import WindowManager
+from .windows import WindowManager, WindowStrategy
 
 if TYPE_CHECKING:  # pragma: no cover
     from collections.abc import Callable, Generator, Iterable
@@ -103,6 +105,18 @@ STREAM_OPEN[StreamState.OPEN] = True
 STREAM_OPEN[StreamState.HALF_CLOSED_LOCAL] = True
 STREAM_OPEN[StreamState.HALF_CLOSED_REMOTE] = True
 
+# Similarly, this indicates the states in which receiving DATA leaves the
+# stream state unchanged, so that it can be handled without running the state
+# machine.
+DATA_RECEIVABLE = [False for _ in range(len(StreamState))]
+DATA_RECEIVABLE[StreamState.OPEN] = True
+DATA_RECEIVABLE[StreamState.HALF_CLOSED_LOCAL] = True
+
+# And this indicates the states in which DATA may be sent.
+DATA_SENDABLE = [False for _ in range(len(StreamState))]
+DATA_SENDABLE[StreamState.OPEN] = True
+DATA_SENDABLE[StreamState.HALF_CLOSED_REMOTE] = True
+
 
 class H2StreamStateMachine:
     """
@@ -798,6 +812,29 @@ class H2Stream:
         # The configuration for this stream.
         self.config = config
 
+        # Data waiting for the flow control windows to open, and whether the
+        # stream should be ended once it has all been sent.
+        self._buffered_data: deque[bytes | memoryview] = deque()
+        self._buffered_end_stream = False
+
+        #: The number of bytes of data waiting for the flow control windows to
+        #: open.
+        self.buffered_data_length = 0
+
+        #: The RFC 9218 urgency of the stream, from ``0`` (the most urgent) to
+        #: ``7``, as set by the remote peer's priority signals.
+        self.urgency = DEFAULT_URGENCY
+
+        #: Whether the remote peer can use the response incrementally, as set
+        #: by its RFC 9218 priority signals.
+        self.incremental = False
+
+        #: How many more flow controlled bytes received on the stream are
+        #: acknowledged automatically, or ``None`` if there is no limit. Only
+        #: used when the ``auto_acknowledge_received_data`` option of the
+        #: :class:`H2Configuration <h2.config.H2Configuration>` is set.
+        self.auto_acknowledge_remaining: int | None = None
+
     def __repr__(self) -> str:
         return f"<{type(self).__name__} id:{self.stream_id} state:{self.state_machine.state!r}>"
 
@@ -811,6 +848,18 @@ class H2Stream:
         """
         return self._inbound_window_manager.current_window_size
 
+    @property
+    def window_strategy(self) -> WindowStrategy:
+        """
+        The strategy that decides when the inbound flow control window of the
+        stream is updated.
+        """
+        return self._inbound_window_manager.strategy
+
+    @window_strategy.setter
+    def window_strategy(self, value: WindowStrategy) -> None:
+        self._inbound_window_manager.strategy = value
+
     @property
     def open(self) -> bool:
         """
@@ -982,6 +1031,115 @@ class H2Stream:
 
         return [df]
 
+    def send_data_chunked(self,
+                          data: bytes | memoryview,
+                          end_stream: bool,
+                          max_frame_size: int) -> list[Frame]:
+        """
+        Prepare as many data frames as are needed to carry ``data`` without
+        exceeding ``max_frame_size``. Optionally end the stream on the last of
+        them.
+
+        The frames carry ``memoryview`` slices of ``data`` rather than copies.
+
+        .. warning:: Does not perform flow control checks.
+        """
+        self.config.logger.debug(
+            "Send chunked data on %r with end stream set to %s", self, end_stream,
+        )
+
+        self.state_machine.process_input(StreamInputs.SEND_DATA)
+
+        length = len(data)
+        frames: list[Frame] = []
+        if length <= max_frame_size:
+            df = DataFrame(self.stream_id)
+            df.data = data  # type: ignore[assignment]
+            frames.append(df)
+        else:
+            view = memoryview(data)
+            for offset in range(0, length, max_frame_size):
+                df = DataFrame(self.stream_id)
+                df.data = view[offset:offset + max_frame_size]  # type: ignore[assignment]
+                frames.append(df)
+
+        if end_stream:
+            self.state_machine.process_input(StreamInputs.SEND_END_STREAM)
+            frames[-1].flags.add("END_STREAM")
+
+        self.outbound_flow_control_window -= length
+        assert self.outbound_flow_control_window >= 0
+
+        return frames
+
+    @property
+    def has_buffered_data(self) -> bool:
+        """
+        Whether there is buffered data, or a buffered end of stream, waiting to
+        be sent.
+        """
+        return bool(self._buffered_data) or self._buffered_end_stream
+
+    def buffer_data(self, data: bytes | memoryview, end_stream: bool) -> None:
+        """
+        Queue data to be sent by :meth:`send_buffered_data`, optionally ending
+        the stream once it has all been sent.
+        """
+        self.config.logger.debug(
+            "Buffer data on %r with end stream set to %s", self, end_stream,
+        )
+        state = self.state_machine.state
+        if self._buffered_end_stream or not DATA_SENDABLE[state]:
+            msg = f"Cannot send data on stream {self.stream_id} in state {state}"
+            raise ProtocolError(msg)
+
+        if data:
+            self._buffered_data.append(data)
+            self.buffered_data_length += len(data)
+        self._buffered_end_stream = end_stream
+
+    def send_buffered_data(self, amount: int) -> list[Frame]:
+        """
+        Prepare data frames carrying up to ``amount`` bytes of the buffered
+        data, ending the stream if it has all been sent and that was asked
+        for.
+
+        .. warning:: Does not perform flow control checks, but does update the
+                     stream flow control window.
+        """
+        max_frame_size = self.max_outbound_frame_size
+        assert max_frame_size is not None
+
+        buffered = self._buffered_data
+        frames: list[Frame] = []
+        while buffered and amount:
+            data = buffered[0]
+            if len(data) > amount:
+                view = memoryview(data)
+                data, buffered[0] = view[:amount], view[amount:]
+            else:
+                buffered.popleft()
+
+            amount -= len(data)
+            self.buffered_data_length -= len(data)
+            end_stream = self._buffered_end_stream and not buffered
+            frames.extend(self.send_data_chunked(data, end_stream, max_frame_size))
+
+        if self._buffered_end_stream and not buffered:
+            if not frames:
+                frames.extend(self.end_stream())
+            self._buffered_end_stream = False
+
+        return frames
+
+    def clear_buffered_data(self) -> None:
+        """
+        Discard any buffered data.
+        """
+        self._buffered_data.clear()
+        self._buffered_end_stream = False
+        self.buffered_data_length = 0
+
     def end_stream(self) -> list[Frame]:
         """
         End a stream without sending data.
@@ -1127,6 +1285,30 @@ class H2Stream:
         data_event.flow_controlled_length = flow_control_len
         return [], events
 
+    def receive_data_without_events(self, data: bytes, end_stream: bool, flow_control_len: int) -> bool:
+        """
+        Receive some data without building the events for it, for connections
+        that report events to an event handler.
+
+        Only the common case of data on a stream whose headers have been
+        received is handled here. Returns ``False``, having done nothing, for
+        anything else: the caller must then use :meth:`receive_data`.
+        """
+        state_machine = self.state_machine
+        if not (DATA_RECEIVABLE[state_machine.state] and state_machine.headers_received):
+            return False
+
+        self.config.logger.debug(
+            "Receive data on %r with end stream %s and flow control length "
+            "set to %d", self, end_stream, flow_control_len,
+        )
+        self._inbound_window_manager.window_consumed(flow_control_len)
+        self._track_content_length(len(data), end_stream)
+
+        if end_stream:
+            state_machine.process_input(StreamInputs.RECV_END_STREAM)
+        return True
+
     def receive_window_update(self, increment: int) -> tuple[list[Frame], list[Event]]:
         """
         Handle a WINDOW_UPDATE increment.
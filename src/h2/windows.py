@@ -7,30 +7,151 @@ Defines tools for managing HTTP/2 flow control windows.
 The objects defined in this module are used to automatically manage HTTP/2
 flow control windows. Specifically, they keep track of what the size of the
 window is, how much data has been consumed from that window, and how much data
-the user has already used. It then implements a basic algorithm that attempts
-to manage the flow control window without user input, trying to ensure that it
-does not emit too many WINDOW_UPDATE frames.
+the user has already used. A window strategy then decides when the used data
+is handed back to the remote peer, trying to ensure that the window is managed
+without user input and without emitting too many WINDOW_UPDATE frames.
 """
 from __future__ import annotations
 
+from abc import ABC, abstractmethod
+
 from .exceptions import FlowControlError
 
 # The largest acceptable value for a HTTP/2 flow control window.
 LARGEST_FLOW_CONTROL_WINDOW = 2**31 - 1
 
 
+class WindowStrategy(ABC):
+    """
+    Decides when a :class:`WindowManager` hands the bytes that the
+    application has processed back to the remote peer, by emitting a
+    WINDOW_UPDATE frame.
+
+    Subclasses must implement :meth:`should_update`, or cannot be
+    instantiated. A strategy does not keep any state of its own, so one
+    strategy object can be shared by the connection and all of its streams.
+
+    .. versionadded:: 4.3.0
+    """
+
+    @abstractmethod
+    def should_update(self,
+                      bytes_processed: int,
+                      current_window_size: int,
+                      max_window_size: int) -> bool:
+        """
+        Whether to emit a WINDOW_UPDATE frame now. This is only asked when
+        some bytes have been processed and not yet handed back.
+
+        :param bytes_processed: The number of bytes that the application has
+            processed and that have not yet been handed back.
+        :type bytes_processed: ``int``
+        :param current_window_size: The space currently left in the window.
+        :type current_window_size: ``int``
+        :param max_window_size: The size of the window.
+        :type max_window_size: ``int``
+        :rtype: ``bool``
+        """
+
+
+class HalfWindowStrategy(WindowStrategy):
+    """
+    The default window strategy.
+
+    1. If there is no space in the flow control window, and we have processed
+       at least 1024 bytes (or 1/4 of the window, if the window is smaller),
+       we will emit a window update frame. This is to avoid the risk of
+       blocking a stream altogether.
+    2. If there is space in the flow control window, and we have processed at
+       least 1/2 of the window worth of bytes, we will emit a window update
+       frame. This is to minimise the number of window update frames we have
+       to emit.
+
+    In a healthy system with large flow control windows, this will
+    irregularly emit WINDOW_UPDATE frames. This prevents us starving the
+    connection by emitting eleventy bajillion WINDOW_UPDATE frames, especially
+    in situations where the remote peer is sending a lot of very small DATA
+    frames.
+
+    .. versionadded:: 4.3.0
+    """
+
+    def should_update(self,
+                      bytes_processed: int,
+                      current_window_size: int,
+                      max_window_size: int) -> bool:
+        if current_window_size == 0 and bytes_processed > min(1024, max_window_size // 4):
+            return True
+        return bytes_processed >= max_window_size // 2
+
+
+class EagerWindowStrategy(WindowStrategy):
+    """
+    A window strategy that hands processed bytes back as soon as the
+    application reports them, keeping the window as open as possible at the
+    cost of a WINDOW_UPDATE frame for every acknowledgement.
+
+    .. versionadded:: 4.3.0
+    """
+
+    def should_update(self,
+                      bytes_processed: int,
+                      current_window_size: int,
+                      max_window_size: int) -> bool:
+        return True
+
+
+class RatioWindowStrategy(WindowStrategy):
+    """
+    A window strategy that hands processed bytes back once they make up at
+    least ``ratio`` of the window, or as soon as the window has no space
+    left, so that the remote peer is never left blocked.
+
+    .. versionadded:: 4.3.0
+
+    :param ratio: The fraction of the window to wait for, greater than 0 and
+        at most 1.
+    :type ratio: ``float``
+    """
+
+    def __init__(self, ratio: float) -> None:
+        if not 0 < ratio <= 1:
+            msg = f"ratio must be greater than 0 and at most 1, not {ratio}"
+            raise ValueError(msg)
+        self.ratio = ratio
+
+    def should_update(self,
+                      bytes_processed: int,
+                      current_window_size: int,
+                      max_window_size: int) -> bool:
+        return current_window_size == 0 or bytes_processed >= max_window_size * self.ratio
+
+
+#: The window strategy used when none is configured.
+DEFAULT_WINDOW_STRATEGY = HalfWindowStrategy()
+
+
 class WindowManager:
     """
     A basic HTTP/2 window manager.
 
     :param max_window_size: The maximum size of the flow control window.
     :type max_window_size: ``int``
+    :param strategy: (optional) The strategy that decides when to emit window
+        updates. Defaults to :class:`HalfWindowStrategy`.
+
+        .. versionadded:: 4.3.0
+
+    :type strategy: :class:`WindowStrategy`
     """
 
-    def __init__(self, max_window_size: int) -> None:
+    def __init__(self,
+                 max_window_size: int,
+                 strategy: WindowStrategy | None = None) -> None:
         assert max_window_size <= LARGEST_FLOW_CONTROL_WINDOW
         self.max_window_size = max_window_size
         self.current_window_size = max_window_size
+        self.strategy = strategy or DEFAULT_WINDOW_STRATEGY
         self._bytes_processed = 0
 
     def window_consumed(self, size: int) -> None:
@@ -93,28 +214,11 @@ class WindowManager:
         """
         Run the algorithm.
 
-        Our current algorithm can be described like this.
-
-        1. If no bytes have been processed, we immediately return 0. There is
-           no meaningful way for us to hand space in the window back to the
-           remote peer, so let's not even try.
-        2. If there is no space in the flow control window, and we have
-           processed at least 1024 bytes (or 1/4 of the window, if the window
-           is smaller), we will emit a window update frame. This is to avoid
-           the risk of blocking a stream altogether.
-        3. If there is space in the flow control window, and we have processed
-           at least 1/2 of the window worth of bytes, we will emit a window
-           update frame. This is to minimise the number of window update frames
-           we have to emit.
-
-        In a healthy system with large flow control windows, this will
-        irregularly emit WINDOW_UPDATE frames. This prevents us starving the
-        connection by emitting eleventy bajillion WINDOW_UPDATE frames,
-        especially in situations where the remote peer is sending a lot of very
-        small DATA frames.
+        If no bytes have been processed, we immediately return ``None``. There
+        is no meaningful way for us to hand space in the window back to the
+        remote peer, so let's not even try. Otherwise the strategy decides
+        whether to emit a window update frame now.
         """
-        # TODO: Can the window be smaller than 1024 bytes? If not, we can
-        # streamline this algorithm.
         if not self._bytes_processed:
             return None
 
@@ -124,10 +228,86 @@ class WindowManager:
         # Note that, even though we may increment less than _bytes_processed,
         # we still want to set it to zero whenever we emit an increment. This
         # is because we'll always increment up to the maximum we can.
-        if ((self.current_window_size == 0) and (
-                self._bytes_processed > min(1024, self.max_window_size // 4))) or self._bytes_processed >= (self.max_window_size // 2):
+        if self.strategy.should_update(
+            self._bytes_processed, self.current_window_size, self.max_window_size,
+        ):
             increment = min(self._bytes_processed, max_increment)
             self._bytes_processed = 0
 
         self.current_window_size += increment
         return increment
+
+
+class BDPEstimator:
+    """
+    Estimates the bandwidth-delay product of a connection from the amount of
+    data received during a PING round trip, and decides how large the inbound
+    flow control windows should grow.
+
+    A probe starts when data is received while no probe is outstanding, and
+    ends when the PING sent for it is acknowledged. If the data received in
+    between filled at least 2/3 of the window, the window was limiting the
+    throughput, so it is grown to twice that amount, up to ``ceiling``.
+
+    This works like the BDP estimator in gRPC, except that it has no clock,
+    so it does not check that the bandwidth has grown before growing the
+    window.
+
+    .. versionadded:: 4.3.0
+
+    :param window_size: The current size of the window.
+    :type window_size: ``int``
+    :param ceiling: The largest size that the window is grown to.
+    :type ceiling: ``int``
+    """
+
+    def __init__(self, window_size: int, ceiling: int) -> None:
+        #: The size that the window has been grown to.
+        self.window_size = window_size
+
+        #: The largest size that the window is grown to.
+        self.ceiling = min(ceiling, LARGEST_FLOW_CONTROL_WINDOW)
+
+        #: Whether a probe is outstanding.
+        self.probing = False
+
+        #: The amount of data received during the outstanding probe.
+        self.sample = 0
+
+    def data_received(self, size: int) -> bool:
+        """
+        Some flow controlled data has been received.
+
+        :param size: The number of flow controlled bytes received.
+        :type size: ``int``
+        :returns: Whether a probe should be started by sending a PING.
+        :rtype: ``bool``
+        """
+        if self.probing:
+            self.sample += size
+            return False
+        if not size or self.window_size >= self.ceiling:
+            return False
+        self.probing = True
+        self.sample = size
+        return True
+
+    def probe_acknowledged(self) -> int | None:
+        """
+        The PING for the outstanding probe has been acknowledged.
+
+        :returns: The size to grow the window to, or ``None`` if it should
+            not grow.
+        :rtype: ``int`` or ``None``
+        """
+        sample = self.sample
+        self.probing = False
+        self.sample = 0
+        if sample * 3 < self.window_size * 2:
+            return None
+
+        window_size = min(sample * 2, self.ceiling)
+        if window_size <= self.window_size:
+            return None
+        self.window_size = window_size
+        return window_size
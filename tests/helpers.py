@@ -8,6 +8,7 @@ from hyperframe.frame import (
     AltSvcFrame,
     ContinuationFrame,
     DataFrame,
+    ExtensionFrame,
     GoAwayFrame,
     HeadersFrame,
     PingFrame,
@@ -18,12 +19,31 @@ from hyperframe.frame import (
     WindowUpdateFrame,
 )
 
+from h2.frame_buffer import FrameBuffer
+
 SAMPLE_SETTINGS = {
     SettingsFrame.HEADER_TABLE_SIZE: 4096,
     SettingsFrame.ENABLE_PUSH: 1,
     SettingsFrame.MAX_CONCURRENT_STREAMS: 2,
 }
 
+EXAMPLE_REQUEST_HEADERS = [
+    (b":authority", b"example.com"),
+    (b":path", b"/"),
+    (b":scheme", b"https"),
+    (b":method", b"GET"),
+]
+
+
+def decode_frames(data, max_frame_size=16384):
+    """
+    Parses the frames in data sent by a server connection.
+    """
+    buffer = FrameBuffer(server=False)
+    buffer.max_frame_size = max_frame_size
+    buffer.add_data(data)
+    return list(buffer)
+
 
 class FrameFactory:
     """
@@ -180,6 +200,15 @@ class FrameFactory:
         f.field = field
         return f
 
+    def build_priority_update_frame(self, prioritized_stream_id, field_value):
+        """
+        Builds a single PRIORITY_UPDATE frame.
+        """
+        body = prioritized_stream_id.to_bytes(4, "big") + field_value
+        f = ExtensionFrame(0x10, 0, body=body)
+        f.body_len = len(body)
+        return f
+
     def change_table_size(self, new_size) -> None:
         """
         Causes the encoder to send a dynamic size update in the next header
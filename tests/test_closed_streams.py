@@ -3,6 +3,7 @@ Tests that we handle closed streams correctly.
 """
 from __future__ import annotations
 
+import hyperframe.frame
 import pytest
 
 import h2.config
@@ -559,3 +560,75 @@ class TestStreamsClosedByRstStream:
         events = c.receive_data(f.serialize() * 3)
         assert not events
         assert c.data_to_send() == expected * 3
+
+    def _reset_stream(self, frame_factory) -> h2.connection.H2Connection:
+        c = h2.connection.H2Connection(config=self.server_config)
+        c.receive_data(frame_factory.preamble())
+        c.initiate_connection()
+
+        header_frame = frame_factory.build_headers_frame(
+            self.example_request_headers, flags=["END_STREAM"],
+        )
+        c.receive_data(header_frame.serialize())
+        c.reset_stream(1, h2.errors.ErrorCodes.INTERNAL_ERROR)
+        c.clear_outbound_data_buffer()
+        return c
+
+    def test_window_updates_after_reset_are_skipped(self, frame_factory) -> None:
+        """
+        WINDOW_UPDATE frames for a reset stream are dropped without being
+        dispatched, whether or not the stream has been cleaned up.
+        """
+        c = self._reset_stream(frame_factory)
+
+        def fail(frame):  # pragma: no cover
+            msg = "frame should have been skipped"
+            raise AssertionError(msg)
+        c._frame_dispatch_table[hyperframe.frame.WindowUpdateFrame] = fail
+
+        f = frame_factory.build_window_update_frame(1, 100)
+        ping = frame_factory.build_ping_frame(b"\x00" * 8)
+        events = c.receive_data(f.serialize() * 100 + ping.serialize())
+        assert [type(e) for e in events] == [h2.events.PingReceived]
+        c.clear_outbound_data_buffer()
+
+        c.open_outbound_streams
+        assert 1 not in c.streams
+
+        events = c.receive_data(f.serialize() * 100)
+        assert not events
+        assert not c.data_to_send()
+
+    @pytest.mark.parametrize(
+        "frame",
+        [
+            # A zero increment.
+            b"\x00\x00\x04\x08\x00\x00\x00\x00\x01\x00\x00\x00\x00",
+            # A body of the wrong length.
+            b"\x00\x00\x05\x08\x00\x00\x00\x00\x01\x00\x00\x00\x01\x00",
+        ],
+    )
+    def test_invalid_window_updates_after_reset_still_error(self,
+                                                            frame_factory,
+                                                            frame) -> None:
+        """
+        Invalid WINDOW_UPDATE frames for a reset stream are not skipped: they
+        are still connection errors.
+        """
+        c = self._reset_stream(frame_factory)
+
+        with pytest.raises(h2.exceptions.ProtocolError):
+            c.receive_data(frame)
+
+    def test_window_updates_after_reset_error_on_closed_connection(self,
+                                                                   frame_factory) -> None:
+        """
+        WINDOW_UPDATE frames for a reset stream are not skipped once the
+        connection is closed.
+        """
+        c = self._reset_stream(frame_factory)
+        c.close_connection()
+
+        f = frame_factory.build_window_update_frame(1, 100)
+        with pytest.raises(h2.exceptions.ProtocolError):
+            c.receive_data(f.serialize())
@@ -0,0 +1,294 @@
+"""
+test_coalesce_data
+~~~~~~~~~~~~~~~~~~
+
+Tests for merging small DATA payloads into fewer frames.
+"""
+from __future__ import annotations
+
+import pytest
+
+import h2.config
+import h2.connection
+import h2.errors
+import h2.settings
+
+from . import helpers
+
+
+class TestDataCoalescing:
+    """
+    Tests of the data_coalescing_threshold option.
+    """
+
+    server_config = h2.config.H2Configuration(
+        client_side=False, data_coalescing_threshold=100,
+    )
+
+    def test_small_writes_are_held_back(self, frame_factory) -> None:
+        """
+        Small writes are sent as one frame once they reach the threshold.
+        """
+        c = h2.connection.H2Connection(config=self.server_config)
+        c.receive_data(frame_factory.preamble())
+        f = frame_factory.build_headers_frame(helpers.EXAMPLE_REQUEST_HEADERS)
+        c.receive_data(f.serialize())
+        c.send_headers(1, [(b":status", b"200")])
+        c.clear_outbound_data_buffer()
+        window = c.outbound_flow_control_window
+        for _ in range(4):
+            c.send_data(1, b"x" * 30)
+            if c.coalesced_data_frames < 3:
+                assert c.data_to_send() == b""
+
+        # Held back data is already counted against the flow control windows.
+        assert c.outbound_flow_control_window == window - 120
+        assert c.data_to_send() == frame_factory.build_data_frame(b"x" * 120).serialize()
+        assert c.coalesced_data_frames == 3
+
+    def test_end_stream_sends_held_back_data(self, frame_factory) -> None:
+        """
+        Ending the stream with data sends the held back data in the same frame.
+        """
+        c = h2.connection.H2Connection(config=self.server_config)
+        c.receive_data(frame_factory.preamble())
+        f = frame_factory.build_headers_frame(helpers.EXAMPLE_REQUEST_HEADERS)
+        c.receive_data(f.serialize())
+        c.send_headers(1, [(b":status", b"200")])
+        c.clear_outbound_data_buffer()
+        c.send_data(1, b"hello ")
+        c.send_data(1, b"world", end_stream=True)
+
+        expected = frame_factory.build_data_frame(b"hello world", flags=["END_STREAM"])
+        assert c.data_to_send() == expected.serialize()
+        assert c.coalesced_data_frames == 1
+
+    def test_other_frames_send_held_back_data_first(self, frame_factory) -> None:
+        """
+        Held back data is sent before any later DATA or HEADERS frame on its
+        stream, but not before frames on other streams.
+        """
+        c = h2.connection.H2Connection(config=self.server_config)
+        c.receive_data(frame_factory.preamble())
+        for stream_id in (1, 3):
+            f = frame_factory.build_headers_frame(
+                helpers.EXAMPLE_REQUEST_HEADERS, stream_id=stream_id,
+            )
+            c.receive_data(f.serialize())
+            c.send_headers(stream_id, [(b":status", b"200")])
+        c.clear_outbound_data_buffer()
+        c.send_data(1, b"hello")
+        c.send_data(3, b"world")
+        c.end_stream(1)
+
+        expected = (
+            frame_factory.build_data_frame(b"hello").serialize() +
+            frame_factory.build_data_frame(b"", flags=["END_STREAM"]).serialize()
+        )
+        assert c.data_to_send() == expected
+
+        c.flush_data()
+        expected = frame_factory.build_data_frame(b"world", stream_id=3)
+        assert c.data_to_send() == expected.serialize()
+
+    def test_large_and_padded_writes_are_sent_at_once(self, frame_factory) -> None:
+        """
+        Writes at least as large as the threshold, and padded writes, are not
+        held back.
+        """
+        c = h2.connection.H2Connection(config=self.server_config)
+        c.receive_data(frame_factory.preamble())
+        f = frame_factory.build_headers_frame(helpers.EXAMPLE_REQUEST_HEADERS)
+        c.receive_data(f.serialize())
+        c.send_headers(1, [(b":status", b"200")])
+        c.clear_outbound_data_buffer()
+        c.send_data(1, b"x" * 100)
+        c.send_data(1, b"y", pad_length=3)
+
+        expected = (
+            frame_factory.build_data_frame(b"x" * 100).serialize() +
+            frame_factory.build_data_frame(b"y", padding_len=3).serialize()
+        )
+        assert c.data_to_send() == expected
+        assert c.coalesced_data_frames == 0
+
+    def test_frames_stay_under_max_frame_size(self, frame_factory) -> None:
+        """
+        Held back data is sent first when merging a write into it would make a
+        frame larger than the maximum frame size.
+        """
+        config = h2.config.H2Configuration(
+            client_side=False, data_coalescing_threshold=100000,
+        )
+        c = h2.connection.H2Connection(config=config)
+        c.receive_data(frame_factory.preamble())
+        f = frame_factory.build_headers_frame(helpers.EXAMPLE_REQUEST_HEADERS)
+        c.receive_data(f.serialize())
+        c.send_headers(1, [(b":status", b"200")])
+        c.clear_outbound_data_buffer()
+        c.send_data(1, b"x" * 10000)
+        c.send_data(1, b"y" * 10000)
+        c.flush_data(1)
+
+        expected = (
+            frame_factory.build_data_frame(b"x" * 10000).serialize() +
+            frame_factory.build_data_frame(b"y" * 10000).serialize()
+        )
+        assert c.data_to_send() == expected
+
+    @pytest.mark.parametrize("end_stream", [False, True])
+    def test_held_back_data_split_when_max_frame_size_shrinks(self, frame_factory, end_stream) -> None:
+        """
+        Held back data is split into several frames when it is sent, if the
+        remote peer has lowered its maximum frame size in the meantime.
+        """
+        config = h2.config.H2Configuration(
+            client_side=False, data_coalescing_threshold=100000,
+        )
+        c = h2.connection.H2Connection(config=config)
+        c.receive_data(frame_factory.preamble())
+        f = frame_factory.build_settings_frame(
+            {h2.settings.SettingCodes.MAX_FRAME_SIZE: 20000},
+        )
+        c.receive_data(f.serialize())
+        f = frame_factory.build_headers_frame(helpers.EXAMPLE_REQUEST_HEADERS)
+        c.receive_data(f.serialize())
+        c.send_headers(1, [(b":status", b"200")])
+        c.clear_outbound_data_buffer()
+        c.send_data(1, b"x" * 10000)
+        c.send_data(1, b"x" * 10000)
+        f = frame_factory.build_settings_frame(
+            {h2.settings.SettingCodes.MAX_FRAME_SIZE: 16384},
+        )
+        c.receive_data(f.serialize())
+
+        if end_stream:
+            c.end_stream(1)
+        else:
+            c.flush_data(1)
+
+        expected = (
+            frame_factory.build_settings_frame({}, ack=True).serialize() +
+            frame_factory.build_data_frame(b"x" * 16384).serialize() +
+            frame_factory.build_data_frame(b"x" * 3616).serialize()
+        )
+        if end_stream:
+            expected += frame_factory.build_data_frame(b"", flags=["END_STREAM"]).serialize()
+        assert c.data_to_send() == expected
+
+    def test_reset_stream_discards_held_back_data(self, frame_factory) -> None:
+        """
+        Data held back on a stream the remote peer has reset is discarded, and
+        its share of the connection window is given back.
+        """
+        c = h2.connection.H2Connection(config=self.server_config)
+        c.receive_data(frame_factory.preamble())
+        f = frame_factory.build_headers_frame(helpers.EXAMPLE_REQUEST_HEADERS)
+        c.receive_data(f.serialize())
+        c.send_headers(1, [(b":status", b"200")])
+        c.clear_outbound_data_buffer()
+        window = c.outbound_flow_control_window
+        c.send_data(1, b"hello")
+        c.receive_data(
+            frame_factory.build_rst_stream_frame(
+                stream_id=1, error_code=h2.errors.ErrorCodes.CANCEL,
+            ).serialize(),
+        )
+        c.flush_data()
+
+        assert c.data_to_send() == b""
+        assert c.outbound_flow_control_window == window
+
+    def test_local_reset_discards_held_back_data(self, frame_factory) -> None:
+        """
+        Data held back on a stream that is reset locally is discarded rather
+        than sent ahead of the RST_STREAM frame.
+        """
+        c = h2.connection.H2Connection(config=self.server_config)
+        c.receive_data(frame_factory.preamble())
+        f = frame_factory.build_headers_frame(helpers.EXAMPLE_REQUEST_HEADERS)
+        c.receive_data(f.serialize())
+        c.send_headers(1, [(b":status", b"200")])
+        c.clear_outbound_data_buffer()
+        window = c.outbound_flow_control_window
+        c.send_data(1, b"hello")
+        c.reset_stream(1)
+
+        assert c.data_to_send() == frame_factory.build_rst_stream_frame(1).serialize()
+        assert c.outbound_flow_control_window == window
+
+    def test_window_updates_leave_data_held_back(self, frame_factory) -> None:
+        """
+        A WINDOW_UPDATE frame on a stream does not send the data held back on
+        it.
+        """
+        c = h2.connection.H2Connection(config=self.server_config)
+        c.receive_data(frame_factory.preamble())
+        f = frame_factory.build_headers_frame(helpers.EXAMPLE_REQUEST_HEADERS)
+        c.receive_data(f.serialize())
+        c.send_headers(1, [(b":status", b"200")])
+        c.clear_outbound_data_buffer()
+        c.send_data(1, b"hello")
+        c.increment_flow_control_window(100, stream_id=1)
+
+        expected = frame_factory.build_window_update_frame(1, 100)
+        assert c.data_to_send() == expected.serialize()
+
+        c.flush_data()
+        assert c.data_to_send() == frame_factory.build_data_frame(b"hello").serialize()
+
+    def test_cork_keeps_frame_order(self, frame_factory) -> None:
+        """
+        Data held back while the connection is corked is not sent ahead of the
+        frames that were corked before it on its stream.
+        """
+        c = h2.connection.H2Connection(config=self.server_config)
+        c.receive_data(frame_factory.preamble())
+        f = frame_factory.build_headers_frame(helpers.EXAMPLE_REQUEST_HEADERS)
+        c.receive_data(f.serialize())
+        c.clear_outbound_data_buffer()
+        c.cork()
+        c.send_headers(1, [(b":status", b"200")])
+        c.send_data(1, b"hello")
+        c.uncork()
+
+        frame_factory.refresh_encoder()
+        expected = frame_factory.build_headers_frame([(b":status", b"200")])
+        assert c.data_to_send() == expected.serialize()
+
+        c.cork()
+        c.send_data(1, b" world")
+        c.send_headers(1, [(b"x-trailer", b"1")], end_stream=True)
+        c.uncork()
+
+        expected = (
+            frame_factory.build_data_frame(b"hello world").serialize() +
+            frame_factory.build_headers_frame(
+                [(b"x-trailer", b"1")], flags=["END_STREAM"],
+            ).serialize()
+        )
+        assert c.data_to_send() == expected
+
+    def test_clear_discards_held_back_data(self, frame_factory) -> None:
+        """
+        Clearing the outbound buffer discards the held back data.
+        """
+        c = h2.connection.H2Connection(config=self.server_config)
+        c.receive_data(frame_factory.preamble())
+        f = frame_factory.build_headers_frame(helpers.EXAMPLE_REQUEST_HEADERS)
+        c.receive_data(f.serialize())
+        c.send_headers(1, [(b":status", b"200")])
+        c.clear_outbound_data_buffer()
+        c.send_data(1, b"hello")
+        c.clear_outbound_data_buffer()
+        c.flush_data()
+
+        assert c.data_to_send() == b""
+
+    @pytest.mark.parametrize("threshold", [0, -1])
+    def test_threshold_must_be_positive(self, threshold) -> None:
+        """
+        The threshold must be at least one byte.
+        """
+        with pytest.raises(ValueError, match="data_coalescing_threshold"):
+            h2.config.H2Configuration(data_coalescing_threshold=threshold)
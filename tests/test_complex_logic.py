@@ -12,6 +12,10 @@ import pytest
 import h2
 import h2.config
 import h2.connection
+import h2.errors
+import h2.events
+import h2.exceptions
+import h2.settings
 
 
 class TestComplexClient:
@@ -365,6 +369,98 @@ class TestContinuationFrames:
             assert isinstance(second_event, h2.events.StreamEnded)
             assert second_event.stream_id == stream_id
 
+    @pytest.mark.parametrize("max_frames", [2, 5])
+    def test_continuation_frame_count_is_limited(self,
+                                                 frame_factory,
+                                                 max_frames) -> None:
+        """
+        Header blocks split across more frames than the configured limit are
+        a connection error. Blocks at the limit are fine.
+        """
+        config = h2.config.H2Configuration(
+            client_side=False, max_header_block_frames=max_frames,
+        )
+        c = h2.connection.H2Connection(config=config)
+        c.initiate_connection()
+        c.receive_data(frame_factory.preamble())
+
+        frames = self._build_continuation_sequence(
+            headers=self.example_request_headers,
+            block_size=2,
+            frame_factory=frame_factory,
+        )
+        data = b"".join(f.serialize() for f in frames[:max_frames])
+        c.receive_data(data)
+        c.clear_outbound_data_buffer()
+
+        with pytest.raises(h2.exceptions.ProtocolError) as e:
+            c.receive_data(frames[max_frames].serialize())
+        assert "too many continuation" in str(e.value).lower()
+
+        expected_frame = frame_factory.build_goaway_frame(
+            last_stream_id=0,
+            error_code=h2.errors.ErrorCodes.PROTOCOL_ERROR,
+        )
+        assert c.data_to_send() == expected_frame.serialize()
+
+    def test_header_block_size_is_limited(self, frame_factory) -> None:
+        """
+        Header blocks larger than the configured byte limit are rejected as a
+        denial of service attempt as soon as they grow past it.
+        """
+        frames = self._build_continuation_sequence(
+            headers=self.example_request_headers,
+            block_size=5,
+            frame_factory=frame_factory,
+        )
+        block_size = sum(len(f.data) for f in frames)
+
+        # A block of exactly the limit is fine.
+        config = h2.config.H2Configuration(
+            client_side=False, max_header_block_size=block_size,
+        )
+        c = h2.connection.H2Connection(config=config)
+        c.initiate_connection()
+        c.receive_data(frame_factory.preamble())
+        events = c.receive_data(b"".join(f.serialize() for f in frames))
+        assert isinstance(events[0], h2.events.RequestReceived)
+
+        # One byte less is not, even before the block is complete.
+        config.max_header_block_size = block_size - 1
+        for f in frames:
+            f.stream_id = 3
+        c.receive_data(b"".join(f.serialize() for f in frames[:-1]))
+        c.clear_outbound_data_buffer()
+
+        with pytest.raises(h2.exceptions.DenialOfServiceError):
+            c.receive_data(frames[-1].serialize())
+
+        expected_frame = frame_factory.build_goaway_frame(
+            last_stream_id=1,
+            error_code=h2.errors.ErrorCodes.ENHANCE_YOUR_CALM,
+        )
+        assert c.data_to_send() == expected_frame.serialize()
+
+    def test_header_block_size_follows_max_header_list_size(self,
+                                                            frame_factory) -> None:
+        """
+        By default, the header block size limit is derived from the local
+        SETTINGS_MAX_HEADER_LIST_SIZE.
+        """
+        c = h2.connection.H2Connection(config=self.server_config)
+        c.initiate_connection()
+        c.receive_data(frame_factory.preamble())
+        c.update_settings({h2.settings.SettingCodes.MAX_HEADER_LIST_SIZE: 2})
+        c.receive_data(frame_factory.build_settings_frame({}, ack=True).serialize())
+
+        frames = self._build_continuation_sequence(
+            headers=self.example_request_headers,
+            block_size=5,
+            frame_factory=frame_factory,
+        )
+        with pytest.raises(h2.exceptions.DenialOfServiceError):
+            c.receive_data(b"".join(f.serialize() for f in frames))
+
 
 class TestContinuationFramesPushPromise:
     """
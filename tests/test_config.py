@@ -22,6 +22,8 @@ class TestH2Config:
         config = h2.config.H2Configuration()
         assert config.client_side
         assert config.header_encoding is None
+        assert config.max_frames_per_receive is None
+        assert config.max_bytes_per_receive is None
         assert isinstance(config.logger, h2.config.DummyLogger)
 
     boolean_config_options = [
@@ -30,6 +32,8 @@ class TestH2Config:
         "normalize_outbound_headers",
         "validate_inbound_headers",
         "normalize_inbound_headers",
+        "strict_outbound_buffer",
+        "auto_acknowledge_received_data",
     ]
 
     @pytest.mark.parametrize("option_name", boolean_config_options)
@@ -120,6 +124,107 @@ class TestH2Config:
         config.header_encoding = header_encoding
         assert config.header_encoding == header_encoding
 
+    optional_integer_config_options = [
+        "max_frames_per_receive",
+        "max_bytes_per_receive",
+        "max_header_block_size",
+        "outbound_buffer_high_watermark",
+        "data_coalescing_threshold",
+        "window_autotuning_ceiling",
+    ]
+
+    @pytest.mark.parametrize("option_name", optional_integer_config_options)
+    @pytest.mark.parametrize("value", [0, -1, True, 1.5, "1"])
+    def test_optional_integer_config_options_reject_bad_values(
+        self, option_name, value,
+    ) -> None:
+        """
+        The optional integer config options raise an error if you try to set
+        a value that isn't None or a positive integer, via the initializer or
+        the attribute setter.
+        """
+        with pytest.raises(ValueError):
+            h2.config.H2Configuration(**{option_name: value})
+
+        config = h2.config.H2Configuration()
+        with pytest.raises(ValueError):
+            setattr(config, option_name, value)
+
+    @pytest.mark.parametrize("option_name", optional_integer_config_options)
+    @pytest.mark.parametrize("value", [None, 1, 2**20])
+    def test_optional_integer_config_option_is_reflected(
+        self, option_name, value,
+    ) -> None:
+        """
+        The value of the optional integer config options, when set, is
+        reflected in the value via the initializer and the attribute setter.
+        """
+        config = h2.config.H2Configuration(**{option_name: value})
+        assert getattr(config, option_name) == value
+
+        config = h2.config.H2Configuration()
+        setattr(config, option_name, value)
+        assert getattr(config, option_name) == value
+
+    @pytest.mark.parametrize("value", [None, 0, True, 1.5, "1"])
+    def test_max_header_block_frames_rejects_bad_values(self, value) -> None:
+        """
+        ``max_header_block_frames`` must be a positive integer, via the
+        initializer or the attribute setter.
+        """
+        with pytest.raises(ValueError):
+            h2.config.H2Configuration(max_header_block_frames=value)
+
+        config = h2.config.H2Configuration()
+        with pytest.raises(ValueError):
+            config.max_header_block_frames = value
+
+    def test_max_header_block_frames_is_reflected(self) -> None:
+        """
+        The value of ``max_header_block_frames``, when set, is reflected in
+        the value via the initializer and the attribute setter.
+        """
+        assert h2.config.H2Configuration().max_header_block_frames == 64
+
+        config = h2.config.H2Configuration(max_header_block_frames=8)
+        assert config.max_header_block_frames == 8
+        config.max_header_block_frames = 128
+        assert config.max_header_block_frames == 128
+
+    @pytest.mark.parametrize("value", [-1, True, 1.5, "1"])
+    def test_outbound_buffer_low_watermark_rejects_bad_values(self, value) -> None:
+        """
+        ``outbound_buffer_low_watermark`` must be None or a non-negative
+        integer.
+        """
+        with pytest.raises(ValueError):
+            h2.config.H2Configuration(outbound_buffer_low_watermark=value)
+
+    def test_outbound_buffer_low_watermark_may_be_zero(self) -> None:
+        """
+        ``outbound_buffer_low_watermark`` may be zero, meaning the buffer must
+        be drained completely.
+        """
+        config = h2.config.H2Configuration(outbound_buffer_low_watermark=0)
+        assert config.outbound_buffer_low_watermark == 0
+
+    @pytest.mark.parametrize("value", [-1, True, 1.5, "1"])
+    def test_auto_acknowledge_stream_budget_rejects_bad_values(self, value) -> None:
+        """
+        ``auto_acknowledge_stream_budget`` must be None or a non-negative
+        integer.
+        """
+        with pytest.raises(ValueError, match="auto_acknowledge_stream_budget"):
+            h2.config.H2Configuration(auto_acknowledge_stream_budget=value)
+
+    def test_auto_acknowledge_stream_budget_may_be_zero(self) -> None:
+        """
+        ``auto_acknowledge_stream_budget`` may be zero, meaning no data is
+        acknowledged automatically.
+        """
+        config = h2.config.H2Configuration(auto_acknowledge_stream_budget=0)
+        assert config.auto_acknowledge_stream_budget == 0
+
     def test_logger_instance_is_reflected(self) -> None:
         """
         The value of ``logger``, when set, is reflected in the value.
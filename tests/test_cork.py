@@ -0,0 +1,200 @@
+"""
+test_cork
+~~~~~~~~~
+
+Tests for holding back outbound frames while a connection is corked.
+"""
+from __future__ import annotations
+
+import h2.config
+import h2.connection
+
+from . import helpers
+
+
+class TestCork:
+    """
+    Tests of H2Connection.cork and H2Connection.uncork.
+    """
+
+    server_config = h2.config.H2Configuration(client_side=False)
+
+    def test_frames_are_held_back(self, frame_factory) -> None:
+        """
+        While corked, nothing is added to the outbound buffer. Uncorking adds
+        the frames, with control frames ahead of the others as usual.
+        """
+        c = h2.connection.H2Connection(config=self.server_config)
+        c.receive_data(frame_factory.preamble())
+        f = frame_factory.build_headers_frame(helpers.EXAMPLE_REQUEST_HEADERS)
+        c.receive_data(f.serialize())
+        c.clear_outbound_data_buffer()
+        c.cork()
+        c.send_headers(1, [(b":status", b"200")])
+        c.send_data(1, b"hello")
+        c.ping(b"12345678")
+        c.send_data(1, b"world", end_stream=True)
+        assert c.data_to_send() == b""
+        assert c.outbound_buffer_size == 0
+
+        frame_factory.refresh_encoder()
+        expected = (
+            frame_factory.build_ping_frame(b"12345678").serialize() +
+            frame_factory.build_headers_frame([(b":status", b"200")]).serialize() +
+            frame_factory.build_data_frame(b"hello").serialize() +
+            frame_factory.build_data_frame(b"world", flags=["END_STREAM"]).serialize()
+        )
+        c.uncork()
+        assert c.data_to_send() == expected
+
+    def test_nested_corks(self, frame_factory) -> None:
+        """
+        Frames are only added once every cork has been matched by an uncork,
+        and extra uncorks do nothing.
+        """
+        c = h2.connection.H2Connection(config=self.server_config)
+        c.receive_data(frame_factory.preamble())
+        f = frame_factory.build_headers_frame(helpers.EXAMPLE_REQUEST_HEADERS)
+        c.receive_data(f.serialize())
+        c.clear_outbound_data_buffer()
+        c.uncork()
+        c.cork()
+        c.cork()
+        c.send_headers(1, [(b":status", b"200")])
+        c.uncork()
+        assert c.data_to_send() == b""
+        c.uncork()
+        frame_factory.refresh_encoder()
+        expected = frame_factory.build_headers_frame([(b":status", b"200")])
+        assert c.data_to_send() == expected.serialize()
+
+        c.uncork()
+        c.send_data(1, b"x")
+        assert c.data_to_send()
+
+    def test_window_updates_are_merged(self, frame_factory) -> None:
+        """
+        WINDOW_UPDATE frames for the same stream are merged.
+        """
+        c = h2.connection.H2Connection(config=self.server_config)
+        c.receive_data(frame_factory.preamble())
+        for stream_id in (1, 3):
+            f = frame_factory.build_headers_frame(
+                helpers.EXAMPLE_REQUEST_HEADERS, stream_id=stream_id,
+            )
+            c.receive_data(f.serialize())
+        c.clear_outbound_data_buffer()
+        c.cork()
+        c.increment_flow_control_window(100, stream_id=1)
+        c.increment_flow_control_window(10)
+        c.increment_flow_control_window(200, stream_id=3)
+        c.increment_flow_control_window(300, stream_id=1)
+        c.increment_flow_control_window(20)
+        c.uncork()
+
+        expected = (
+            frame_factory.build_window_update_frame(1, 400).serialize() +
+            frame_factory.build_window_update_frame(0, 30).serialize() +
+            frame_factory.build_window_update_frame(3, 200).serialize()
+        )
+        assert c.data_to_send() == expected
+
+    def test_merged_window_updates_are_capped(self, frame_factory) -> None:
+        """
+        WINDOW_UPDATE frames are only merged up to the largest allowed
+        increment, and the rest is sent in another frame.
+        """
+        c = h2.connection.H2Connection(config=self.server_config)
+        c.receive_data(frame_factory.preamble())
+        for stream_id in (1, 3):
+            f = frame_factory.build_headers_frame(
+                helpers.EXAMPLE_REQUEST_HEADERS, stream_id=stream_id,
+            )
+            c.receive_data(f.serialize())
+        c.clear_outbound_data_buffer()
+        c.cork()
+        c.increment_flow_control_window(c.MAX_WINDOW_INCREMENT - 65535)
+        c.receive_data(
+            frame_factory.build_data_frame(b"x" * 16384, stream_id=1).serialize() * 3 +
+            frame_factory.build_data_frame(b"x" * 16384, stream_id=3).serialize() * 2,
+        )
+        c.increment_flow_control_window(5 * 16384)
+        c.uncork()
+
+        expected = (
+            frame_factory.build_window_update_frame(0, c.MAX_WINDOW_INCREMENT).serialize() +
+            frame_factory.build_window_update_frame(0, 5 * 16384 - 65535).serialize()
+        )
+        assert c.data_to_send() == expected
+
+    def test_empty_data_frames_are_dropped(self, frame_factory) -> None:
+        """
+        Empty DATA frames that do not end their stream are dropped, as are
+        empty DATA frames that end their stream straight after another DATA
+        frame, which ends it instead.
+        """
+        c = h2.connection.H2Connection(config=self.server_config)
+        c.receive_data(frame_factory.preamble())
+        for stream_id in (1, 3):
+            f = frame_factory.build_headers_frame(
+                helpers.EXAMPLE_REQUEST_HEADERS, stream_id=stream_id,
+            )
+            c.receive_data(f.serialize())
+        c.clear_outbound_data_buffer()
+        c.send_headers(1, [(b":status", b"200")])
+        c.send_headers(3, [(b":status", b"200")])
+        c.data_to_send()
+
+        c.cork()
+        c.send_data(1, b"")
+        c.send_data(1, b"hello")
+        c.send_data(3, b"")
+        c.send_data(1, b"")
+        c.end_stream(1)
+        c.end_stream(3)
+        c.uncork()
+
+        expected = (
+            frame_factory.build_data_frame(b"hello", flags=["END_STREAM"]).serialize() +
+            frame_factory.build_data_frame(b"", flags=["END_STREAM"], stream_id=3).serialize()
+        )
+        assert c.data_to_send() == expected
+
+    def test_end_stream_after_headers_is_kept(self, frame_factory) -> None:
+        """
+        An empty DATA frame ending a stream is kept when the stream's previous
+        frame is not a DATA frame.
+        """
+        c = h2.connection.H2Connection(config=self.server_config)
+        c.receive_data(frame_factory.preamble())
+        f = frame_factory.build_headers_frame(helpers.EXAMPLE_REQUEST_HEADERS)
+        c.receive_data(f.serialize())
+        c.clear_outbound_data_buffer()
+        c.cork()
+        c.send_headers(1, [(b":status", b"200")])
+        c.end_stream(1)
+        c.uncork()
+
+        frame_factory.refresh_encoder()
+        expected = (
+            frame_factory.build_headers_frame([(b":status", b"200")]).serialize() +
+            frame_factory.build_data_frame(b"", flags=["END_STREAM"]).serialize()
+        )
+        assert c.data_to_send() == expected
+
+    def test_clear_discards_corked_frames(self, frame_factory) -> None:
+        """
+        Clearing the outbound buffer discards the frames held back by the
+        cork.
+        """
+        c = h2.connection.H2Connection(config=self.server_config)
+        c.receive_data(frame_factory.preamble())
+        f = frame_factory.build_headers_frame(helpers.EXAMPLE_REQUEST_HEADERS)
+        c.receive_data(f.serialize())
+        c.clear_outbound_data_buffer()
+        c.cork()
+        c.send_headers(1, [(b":status", b"200")])
+        c.clear_outbound_data_buffer()
+        c.uncork()
+
+        assert c.data_to_send() == b""
@@ -0,0 +1,390 @@
+"""
+test_event_handler
+~~~~~~~~~~~~~~~~~~
+
+Tests for reporting events to an event handler instead of returning them.
+"""
+from __future__ import annotations
+
+import pytest
+
+import h2.config
+import h2.connection
+import h2.errors
+import h2.events
+import h2.exceptions
+import h2.handlers
+import h2.stream
+
+from . import helpers
+
+
+class RecordingHandler(h2.handlers.EventHandler):
+    """
+    An event handler that records every call made to it.
+    """
+
+    def __init__(self) -> None:
+        self.calls = []
+
+    def on_request(self, stream_id, headers, end_stream) -> None:
+        self.calls.append(("request", stream_id, headers, end_stream))
+
+    def on_response(self, stream_id, headers, end_stream) -> None:
+        self.calls.append(("response", stream_id, headers, end_stream))
+
+    def on_trailers(self, stream_id, headers, end_stream) -> None:
+        self.calls.append(("trailers", stream_id, headers, end_stream))
+
+    def on_informational_response(self, stream_id, headers) -> None:
+        self.calls.append(("informational", stream_id, headers))
+
+    def on_data(self, stream_id, data, flow_controlled_length, end_stream) -> None:
+        self.calls.append(("data", stream_id, data, flow_controlled_length, end_stream))
+
+    def on_window_updated(self, stream_id, delta) -> None:
+        self.calls.append(("window_updated", stream_id, delta))
+
+    def on_stream_reset(self, stream_id, error_code, remote_reset) -> None:
+        self.calls.append(("reset", stream_id, error_code, remote_reset))
+
+    def on_event(self, event) -> None:
+        self.calls.append(("event", type(event)))
+
+
+class TestEventHandler:
+    """
+    Tests of the event handler mode of H2Connection.
+    """
+
+    example_response_headers = [
+        (b":status", b"200"),
+    ]
+    server_config = h2.config.H2Configuration(client_side=False)
+
+    def test_request_and_data(self, frame_factory) -> None:
+        """
+        Requests and data are passed to the handler, and no events are
+        returned.
+        """
+        c = h2.connection.H2Connection(config=self.server_config)
+        c.receive_data(frame_factory.preamble())
+        handler = RecordingHandler()
+        c.set_event_handler(handler)
+        data = (
+            frame_factory.build_headers_frame(helpers.EXAMPLE_REQUEST_HEADERS).serialize() +
+            frame_factory.build_data_frame(b"hello", padding_len=3).serialize() +
+            frame_factory.build_data_frame(b"world", flags=["END_STREAM"]).serialize()
+        )
+
+        assert c.receive_data(data) == []
+        assert handler.calls == [
+            ("request", 1, helpers.EXAMPLE_REQUEST_HEADERS, False),
+            ("data", 1, b"hello", 9, False),
+            ("data", 1, b"world", 5, True),
+        ]
+        assert c.streams[1].state_machine.state == h2.stream.StreamState.HALF_CLOSED_REMOTE
+
+    def test_request_ending_stream(self, frame_factory) -> None:
+        """
+        A request that ends the stream is reported with end_stream set, and
+        no separate call is made for the end of the stream.
+        """
+        c = h2.connection.H2Connection(config=self.server_config)
+        c.receive_data(frame_factory.preamble())
+        handler = RecordingHandler()
+        c.set_event_handler(handler)
+        f = frame_factory.build_headers_frame(
+            helpers.EXAMPLE_REQUEST_HEADERS, flags=["END_STREAM"],
+        )
+
+        assert c.receive_data(f.serialize()) == []
+        assert handler.calls == [
+            ("request", 1, helpers.EXAMPLE_REQUEST_HEADERS, True),
+        ]
+
+    def test_matches_events(self, frame_factory) -> None:
+        """
+        Data received on a connection without a handler produces the same
+        events as are reported to a handler.
+        """
+        c = h2.connection.H2Connection(config=self.server_config)
+        c.receive_data(frame_factory.preamble())
+        handler = RecordingHandler()
+        c.set_event_handler(handler)
+        c.set_event_handler(None)
+        f = frame_factory.build_headers_frame(helpers.EXAMPLE_REQUEST_HEADERS)
+        events = c.receive_data(f.serialize())
+
+        assert [type(e) for e in events] == [h2.events.RequestReceived]
+        assert not handler.calls
+
+    def test_response_trailers_and_informational(self, frame_factory) -> None:
+        """
+        Responses, informational responses and trailers are passed to the
+        handler on the client side, and the stream is closed by the final
+        DATA frame.
+        """
+        c = h2.connection.H2Connection()
+        c.initiate_connection()
+        c.send_headers(1, helpers.EXAMPLE_REQUEST_HEADERS, end_stream=True)
+        c.clear_outbound_data_buffer()
+        handler = RecordingHandler()
+        c.set_event_handler(handler)
+        data = (
+            frame_factory.build_headers_frame([(b":status", b"100")]).serialize() +
+            frame_factory.build_headers_frame(self.example_response_headers).serialize() +
+            frame_factory.build_data_frame(b"hello", flags=["END_STREAM"]).serialize()
+        )
+
+        assert c.receive_data(data) == []
+        assert handler.calls == [
+            ("informational", 1, [(b":status", b"100")]),
+            ("response", 1, self.example_response_headers, False),
+            ("data", 1, b"hello", 5, True),
+        ]
+        assert c.streams[1].closed
+        assert (
+            c.streams[1].state_machine.stream_closed_by ==
+            h2.stream.StreamClosedBy.RECV_END_STREAM
+        )
+
+        c = h2.connection.H2Connection()
+        c.initiate_connection()
+        c.send_headers(1, helpers.EXAMPLE_REQUEST_HEADERS, end_stream=True)
+        c.clear_outbound_data_buffer()
+        handler = RecordingHandler()
+        c.set_event_handler(handler)
+        frame_factory.refresh_encoder()
+        data = (
+            frame_factory.build_headers_frame(self.example_response_headers).serialize() +
+            frame_factory.build_headers_frame(
+                [(b"x-trailer", b"1")], flags=["END_STREAM"],
+            ).serialize()
+        )
+        c.receive_data(data)
+        assert handler.calls == [
+            ("response", 1, self.example_response_headers, False),
+            ("trailers", 1, [(b"x-trailer", b"1")], True),
+        ]
+
+    def test_control_frames(self, frame_factory) -> None:
+        """
+        Events without a dedicated handler method are passed to on_event.
+        """
+        c = h2.connection.H2Connection(config=self.server_config)
+        c.receive_data(frame_factory.preamble())
+        handler = RecordingHandler()
+        c.set_event_handler(handler)
+        data = (
+            frame_factory.build_settings_frame({}).serialize() +
+            frame_factory.build_ping_frame(b"\x01" * 8).serialize() +
+            frame_factory.build_headers_frame(helpers.EXAMPLE_REQUEST_HEADERS).serialize() +
+            frame_factory.build_window_update_frame(1, 100).serialize() +
+            frame_factory.build_rst_stream_frame(1, 8).serialize()
+        )
+
+        assert c.receive_data(data) == []
+        assert handler.calls == [
+            ("event", h2.events.RemoteSettingsChanged),
+            ("event", h2.events.PingReceived),
+            ("request", 1, helpers.EXAMPLE_REQUEST_HEADERS, False),
+            ("window_updated", 1, 100),
+            ("reset", 1, h2.errors.ErrorCodes.CANCEL, True),
+        ]
+
+    def test_data_without_decoding(self, frame_factory) -> None:
+        """
+        DATA frames parsed by hyperframe are passed to the handler in the same
+        way.
+        """
+        c = h2.connection.H2Connection(config=self.server_config)
+        c.receive_data(frame_factory.preamble())
+        handler = RecordingHandler()
+        c.set_event_handler(handler)
+        c.incoming_buffer.decode_data_frames = False
+        data = (
+            frame_factory.build_headers_frame(helpers.EXAMPLE_REQUEST_HEADERS).serialize() +
+            frame_factory.build_data_frame(b"hello").serialize()
+        )
+
+        c.receive_data(data)
+        assert handler.calls[-1] == ("data", 1, b"hello", 5, False)
+
+    def test_invalid_data_raises(self, frame_factory) -> None:
+        """
+        DATA frames that would be an error without a handler are still errors.
+        """
+        c = h2.connection.H2Connection(config=self.server_config)
+        c.receive_data(frame_factory.preamble())
+        handler = RecordingHandler()
+        c.set_event_handler(handler)
+        f = frame_factory.build_data_frame(b"hello", stream_id=3)
+
+        with pytest.raises(h2.exceptions.ProtocolError):
+            c.receive_data(f.serialize())
+        assert not handler.calls
+
+    def test_data_after_end_stream(self, frame_factory) -> None:
+        """
+        DATA frames on a stream that the remote peer has ended are handled as
+        they are without a handler, by resetting the stream.
+        """
+        c = h2.connection.H2Connection(config=self.server_config)
+        c.receive_data(frame_factory.preamble())
+        handler = RecordingHandler()
+        c.set_event_handler(handler)
+        f = frame_factory.build_headers_frame(
+            helpers.EXAMPLE_REQUEST_HEADERS, flags=["END_STREAM"],
+        )
+        c.receive_data(f.serialize())
+        c.clear_outbound_data_buffer()
+        f = frame_factory.build_data_frame(b"hello")
+
+        assert c.receive_data(f.serialize()) == []
+        assert handler.calls == [
+            ("request", 1, helpers.EXAMPLE_REQUEST_HEADERS, True),
+            ("reset", 1, h2.errors.ErrorCodes.STREAM_CLOSED, False),
+        ]
+        expected = frame_factory.build_rst_stream_frame(
+            1, h2.errors.ErrorCodes.STREAM_CLOSED,
+        )
+        assert c.data_to_send() == expected.serialize()
+
+    def test_content_length_checked(self, frame_factory) -> None:
+        """
+        Content-length is enforced for data passed to the handler, and the
+        stream is not ended by the offending frame.
+        """
+        c = h2.connection.H2Connection(config=self.server_config)
+        c.receive_data(frame_factory.preamble())
+        handler = RecordingHandler()
+        c.set_event_handler(handler)
+        f = frame_factory.build_headers_frame(
+            [*helpers.EXAMPLE_REQUEST_HEADERS, (b"content-length", b"3")],
+        )
+        c.receive_data(f.serialize())
+        f = frame_factory.build_data_frame(b"hello", flags=["END_STREAM"])
+
+        with pytest.raises(h2.exceptions.InvalidBodyLengthError):
+            c.receive_data(f.serialize())
+        assert handler.calls[-1][0] == "request"
+
+    def test_handler_exceptions_propagate(self, frame_factory) -> None:
+        """
+        Exceptions raised by the handler propagate out of receive_data, with
+        the remaining frames left pending.
+        """
+        class FailingHandler(RecordingHandler):
+            def on_data(self, *args) -> None:
+                super().on_data(*args)
+                msg = "handler failed"
+                raise RuntimeError(msg)
+
+        c = h2.connection.H2Connection(config=self.server_config)
+        c.receive_data(frame_factory.preamble())
+        handler = FailingHandler()
+        c.set_event_handler(handler)
+        data = (
+            frame_factory.build_headers_frame(helpers.EXAMPLE_REQUEST_HEADERS).serialize() +
+            frame_factory.build_data_frame(b"hello").serialize() +
+            frame_factory.build_data_frame(b"world").serialize()
+        )
+
+        with pytest.raises(RuntimeError):
+            c.receive_data(data)
+        assert handler.calls[-1] == ("data", 1, b"hello", 5, False)
+        assert c.has_pending_frames
+
+    def test_stream_closed_error_from_on_data_propagates(self, frame_factory) -> None:
+        """
+        A StreamClosedError raised by the application in on_data is passed to
+        the caller, not mistaken for DATA received on a closed stream.
+        """
+        class ClosedStreamHandler(RecordingHandler):
+            def on_data(self, *args) -> None:
+                super().on_data(*args)
+                c.send_data(3, b"reply")
+
+        c = h2.connection.H2Connection(config=self.server_config)
+        c.receive_data(frame_factory.preamble())
+        handler = ClosedStreamHandler()
+        c.set_event_handler(handler)
+        c.receive_data(
+            frame_factory.build_headers_frame(helpers.EXAMPLE_REQUEST_HEADERS, stream_id=3).serialize(),
+        )
+        c.reset_stream(3)
+        c.clear_outbound_data_buffer()
+        window = c.inbound_flow_control_window
+
+        data = (
+            frame_factory.build_headers_frame(helpers.EXAMPLE_REQUEST_HEADERS, stream_id=5).serialize() +
+            frame_factory.build_data_frame(b"hello", stream_id=5).serialize()
+        )
+        with pytest.raises(h2.exceptions.StreamClosedError):
+            c.receive_data(data)
+
+        assert handler.calls[-1] == ("data", 5, b"hello", 5, False)
+        assert c.inbound_flow_control_window == window - 5
+        assert not c.data_to_send()
+
+    def test_handler_errors_do_not_terminate_connection(self, frame_factory) -> None:
+        """
+        Protocol errors raised by the application in the handler do not close
+        the connection.
+        """
+        class BadSendHandler(RecordingHandler):
+            def on_request(self, *args) -> None:
+                super().on_request(*args)
+                c.send_data(99, b"reply")
+
+        c = h2.connection.H2Connection(config=self.server_config)
+        c.receive_data(frame_factory.preamble())
+        handler = BadSendHandler()
+        c.set_event_handler(handler)
+        f = frame_factory.build_headers_frame(helpers.EXAMPLE_REQUEST_HEADERS)
+
+        with pytest.raises(h2.exceptions.NoSuchStreamError):
+            c.receive_data(f.serialize())
+
+        assert c.state_machine.state != h2.connection.ConnectionState.CLOSED
+        assert not c.data_to_send()
+        c.send_headers(1, self.example_response_headers)
+        assert c.data_to_send()
+
+    def test_default_methods_do_nothing(self) -> None:
+        """
+        The base EventHandler accepts every event without doing anything.
+        """
+        handler = h2.handlers.EventHandler()
+        stream_ended = h2.events.StreamEnded(stream_id=1)
+        events = [
+            h2.events.RequestReceived(stream_id=1, headers=[], stream_ended=stream_ended),
+            h2.events.ResponseReceived(stream_id=1, headers=[]),
+            h2.events.TrailersReceived(stream_id=1, headers=[]),
+            h2.events.InformationalResponseReceived(stream_id=1, headers=[]),
+            h2.events.DataReceived(stream_id=1, data=b"", flow_controlled_length=0),
+            h2.events.WindowUpdated(stream_id=1, delta=1),
+            h2.events.StreamReset(stream_id=1, error_code=0),
+            stream_ended,
+            h2.events.PingReceived(ping_data=b"\x00" * 8),
+        ]
+        for event in events:
+            assert handler.handle_event(event) is None
+
+    def test_stream_ended_not_reported(self) -> None:
+        """
+        StreamEnded events are not passed to the handler on their own.
+        """
+        handler = RecordingHandler()
+        handler.handle_event(h2.events.StreamEnded(stream_id=1))
+        handler.handle_event(
+            h2.events.DataReceived(
+                stream_id=1,
+                data=b"hi",
+                flow_controlled_length=2,
+                stream_ended=h2.events.StreamEnded(stream_id=1),
+            ),
+        )
+
+        assert handler.calls == [("data", 1, b"hi", 2, True)]
@@ -358,6 +358,17 @@ class TestEventReprs:
             'field_value:h2=":8000"; ma=60>'
         )
 
+    def test_priorityupdatereceived_repr(self) -> None:
+        """
+        PriorityUpdateReceived has a useful debug representation.
+        """
+        e = h2.events.PriorityUpdateReceived(
+            stream_id=5, urgency=1, incremental=True, field_value=b"u=1, i",
+        )
+        assert repr(e) == (
+            "<PriorityUpdateReceived stream_id:5, urgency:1, incremental:True>"
+        )
+
     def test_unknownframereceived_repr(self) -> None:
         """
         UnknownFrameReceived has a useful debug representation.
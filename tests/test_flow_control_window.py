@@ -6,6 +6,7 @@ Tests of the flow control management in h2
 """
 from __future__ import annotations
 
+import hyperframe.frame
 import pytest
 from hypothesis import HealthCheck, given, settings
 from hypothesis.strategies import integers
@@ -15,7 +16,10 @@ import h2.connection
 import h2.errors
 import h2.events
 import h2.exceptions
+import h2.frame_buffer
+import h2.handlers
 import h2.settings
+import h2.windows
 
 
 class TestFlowControl:
@@ -656,12 +660,9 @@ class TestFlowControl:
         expected = frame_factory.build_rst_stream_frame(
             stream_id=1,
             error_code=h2.errors.ErrorCodes.STREAM_CLOSED,
-        ).serialize() * 2 + frame_factory.build_window_update_frame(
+        ).serialize() * 3 + frame_factory.build_window_update_frame(
             stream_id=0,
             increment=40500,
-        ).serialize() + frame_factory.build_rst_stream_frame(
-            stream_id=1,
-            error_code=h2.errors.ErrorCodes.STREAM_CLOSED,
         ).serialize()
         assert c.data_to_send() == expected
 
@@ -957,3 +958,789 @@ class TestAutomaticFlowControl:
             stream_id=1, increment=increment,
         ).serialize()
         assert c.data_to_send() == expected_data
+
+
+class TestWindowStrategies:
+    """
+    Tests for the pluggable window strategies.
+    """
+
+    example_request_headers = [
+        (":authority", "example.com"),
+        (":path", "/"),
+        (":scheme", "https"),
+        (":method", "GET"),
+    ]
+
+    DEFAULT_FLOW_WINDOW = 65535
+
+    def _setup_connection(self, frame_factory, strategy=None, stream_ids=(1,)) -> h2.connection.H2Connection:
+        """
+        Setup a server-side H2Connection using ``strategy``, open some streams
+        and receive a little data on each of them.
+        """
+        kwargs = {} if strategy is None else {"window_strategy": strategy}
+        c = h2.connection.H2Connection(
+            config=h2.config.H2Configuration(client_side=False, **kwargs),
+        )
+        c.initiate_connection()
+        c.receive_data(frame_factory.preamble())
+        for stream_id in stream_ids:
+            c.receive_data(
+                frame_factory.build_headers_frame(
+                    headers=self.example_request_headers, stream_id=stream_id,
+                ).serialize(),
+            )
+            c.receive_data(
+                frame_factory.build_data_frame(
+                    b"some data", stream_id=stream_id,
+                ).serialize(),
+            )
+        c.clear_outbound_data_buffer()
+        return c
+
+    @given(
+        bytes_processed=integers(min_value=1, max_value=2**20),
+        max_window_size=integers(min_value=0, max_value=2**20),
+    )
+    def test_half_window_strategy(self, bytes_processed, max_window_size) -> None:
+        """
+        The default strategy updates at half the window, or sooner when the
+        window has no space left.
+        """
+        strategy = h2.windows.HalfWindowStrategy()
+        assert strategy.should_update(bytes_processed, 1, max_window_size) == (
+            bytes_processed >= max_window_size // 2
+        )
+        assert strategy.should_update(bytes_processed, 0, max_window_size) == (
+            bytes_processed > min(1024, max_window_size // 4) or
+            bytes_processed >= max_window_size // 2
+        )
+
+    def test_base_strategy_is_abstract(self) -> None:
+        """
+        The base WindowStrategy cannot be used without implementing
+        should_update.
+        """
+        with pytest.raises(TypeError):
+            h2.windows.WindowStrategy()
+
+    def test_eager_strategy_updates_on_every_ack(self, frame_factory) -> None:
+        """
+        The eager strategy emits window updates for every acknowledgement.
+        """
+        c = self._setup_connection(frame_factory, h2.windows.EagerWindowStrategy())
+        c.acknowledge_received_data(9, stream_id=1)
+
+        expected_data = (
+            frame_factory.build_window_update_frame(stream_id=0, increment=9).serialize() +
+            frame_factory.build_window_update_frame(stream_id=1, increment=9).serialize()
+        )
+        assert c.data_to_send() == expected_data
+
+    def test_ratio_strategy(self, frame_factory) -> None:
+        """
+        The ratio strategy waits until the processed bytes make up the ratio
+        of the window.
+        """
+        strategy = h2.windows.RatioWindowStrategy(0.25)
+        assert not strategy.should_update(16383, 65535 - 16383, 65535)
+        assert strategy.should_update(16384, 65535 - 16384, 65535)
+        assert strategy.should_update(1, 0, 65535)
+
+        c = self._setup_connection(frame_factory, strategy)
+        c.acknowledge_received_data(9, stream_id=1)
+        assert not c.data_to_send()
+
+    @pytest.mark.parametrize("ratio", [0, -0.5, 1.5])
+    def test_ratio_must_be_a_fraction(self, ratio) -> None:
+        """
+        The ratio must be greater than 0 and at most 1.
+        """
+        with pytest.raises(ValueError, match="ratio"):
+            h2.windows.RatioWindowStrategy(ratio)
+
+    def test_set_window_strategy_for_stream(self, frame_factory) -> None:
+        """
+        The strategy can be changed for a single stream, leaving the
+        connection and the other streams alone.
+        """
+        c = self._setup_connection(frame_factory, stream_ids=(1, 3))
+        c.set_window_strategy(h2.windows.EagerWindowStrategy(), stream_id=3)
+        c.acknowledge_received_data(9, stream_id=1)
+        c.acknowledge_received_data(9, stream_id=3)
+
+        expected_data = frame_factory.build_window_update_frame(
+            stream_id=3, increment=9,
+        ).serialize()
+        assert c.data_to_send() == expected_data
+
+    def test_set_window_strategy_for_connection(self, frame_factory) -> None:
+        """
+        The strategy can be changed for the connection, leaving the streams
+        alone.
+        """
+        c = self._setup_connection(frame_factory)
+        c.set_window_strategy(h2.windows.EagerWindowStrategy())
+        c.acknowledge_received_data(9, stream_id=1)
+
+        expected_data = frame_factory.build_window_update_frame(
+            stream_id=0, increment=9,
+        ).serialize()
+        assert c.data_to_send() == expected_data
+
+    def test_strategy_must_be_a_window_strategy(self, frame_factory) -> None:
+        """
+        Only window strategies are accepted.
+        """
+        with pytest.raises(ValueError, match="window_strategy"):
+            h2.config.H2Configuration(window_strategy=object())
+
+        c = self._setup_connection(frame_factory)
+        with pytest.raises(ValueError, match="strategy"):
+            c.set_window_strategy(object())
+
+
+class TestWindowAutotuning:
+    """
+    Tests for the automatic tuning of the inbound windows.
+    """
+
+    example_request_headers = [
+        (":authority", "example.com"),
+        (":path", "/"),
+        (":scheme", "https"),
+        (":method", "GET"),
+    ]
+
+    DEFAULT_FLOW_WINDOW = 65535
+
+    def _setup_connection(self, frame_factory, ceiling=2**20) -> h2.connection.H2Connection:
+        """
+        Setup a server-side H2Connection that tunes its windows up to
+        ``ceiling`` and open a stream.
+        """
+        c = h2.connection.H2Connection(
+            config=h2.config.H2Configuration(
+                client_side=False, window_autotuning_ceiling=ceiling,
+            ),
+        )
+        c.initiate_connection()
+        c.receive_data(frame_factory.preamble())
+        c.receive_data(
+            frame_factory.build_headers_frame(
+                headers=self.example_request_headers,
+            ).serialize(),
+        )
+        c.clear_outbound_data_buffer()
+        return c
+
+    def _receive(self, c, frame_factory, size) -> None:
+        """
+        Receive and acknowledge ``size`` bytes of data on stream 1, in frames
+        of at most 16384 bytes.
+        """
+        while size:
+            length = min(size, 16384)
+            size -= length
+            data_frame = frame_factory.build_data_frame(b"\x00" * length)
+            c.receive_data(data_frame.serialize())
+            c.acknowledge_received_data(length, stream_id=1)
+
+    def _frames(self, c) -> list:
+        buffer = h2.frame_buffer.FrameBuffer(server=False)
+        buffer.max_frame_size = 16384
+        buffer.add_data(c.data_to_send())
+        return list(buffer)
+
+    def _probe_ack(self, frame_factory) -> bytes:
+        return frame_factory.build_ping_frame(
+            ping_data=b"h2bdpest", flags=["ACK"],
+        ).serialize()
+
+    def test_disabled_by_default(self, frame_factory) -> None:
+        """
+        No probes are sent unless tuning is enabled.
+        """
+        c = self._setup_connection(frame_factory, ceiling=None)
+        data_frame = frame_factory.build_data_frame(b"some data")
+        c.receive_data(data_frame.serialize())
+
+        assert not c.data_to_send()
+
+    def test_receiving_data_sends_one_probe(self, frame_factory) -> None:
+        """
+        Receiving data starts a probe, and no other probe is started until it
+        has been acknowledged.
+        """
+        c = self._setup_connection(frame_factory)
+        self._receive(c, frame_factory, 100)
+        self._receive(c, frame_factory, 100)
+
+        frames = self._frames(c)
+        assert [type(f) for f in frames] == [hyperframe.frame.PingFrame]
+        assert "ACK" not in frames[0].flags
+
+    def test_windows_grow_when_limiting(self, frame_factory) -> None:
+        """
+        When a probe sees at least 2/3 of the window, the windows grow to
+        twice what it saw, and the acknowledgement causes no event.
+        """
+        c = self._setup_connection(frame_factory)
+        self._receive(c, frame_factory, 30000)
+        self._receive(c, frame_factory, 20000)
+        c.clear_outbound_data_buffer()
+
+        events = c.receive_data(self._probe_ack(frame_factory))
+        assert not events
+
+        frames = self._frames(c)
+        assert [type(f) for f in frames] == [
+            hyperframe.frame.SettingsFrame, hyperframe.frame.WindowUpdateFrame,
+        ]
+        assert frames[1].stream_id == 0
+        assert frames[1].window_increment == 100000 - self.DEFAULT_FLOW_WINDOW
+        assert frames[0].settings == {
+            h2.settings.SettingCodes.INITIAL_WINDOW_SIZE: 100000,
+        }
+
+    def test_windows_do_not_grow_when_not_limiting(self, frame_factory) -> None:
+        """
+        When a probe sees less than 2/3 of the window, nothing grows, and the
+        next data received starts another probe.
+        """
+        c = self._setup_connection(frame_factory)
+        self._receive(c, frame_factory, 100)
+        c.clear_outbound_data_buffer()
+
+        c.receive_data(self._probe_ack(frame_factory))
+        assert not c.data_to_send()
+
+        self._receive(c, frame_factory, 100)
+        assert [type(f) for f in self._frames(c)] == [hyperframe.frame.PingFrame]
+
+    def test_windows_grow_up_to_the_ceiling(self, frame_factory) -> None:
+        """
+        The windows never grow beyond the ceiling, and no more probes are sent
+        once they have reached it.
+        """
+        c = self._setup_connection(frame_factory, ceiling=80000)
+        self._receive(c, frame_factory, 50000)
+        c.clear_outbound_data_buffer()
+        c.receive_data(self._probe_ack(frame_factory))
+
+        frames = self._frames(c)
+        assert frames[1].window_increment == 80000 - self.DEFAULT_FLOW_WINDOW
+        assert frames[0].settings == {
+            h2.settings.SettingCodes.INITIAL_WINDOW_SIZE: 80000,
+        }
+        self._receive(c, frame_factory, 100)
+        assert not c.data_to_send()
+
+    def test_windows_grow_twice(self, frame_factory) -> None:
+        """
+        A second growth step grows the connection window from the size it was
+        grown to, even though data received before the first step had not all
+        been handed back when it was taken.
+        """
+        c = self._setup_connection(frame_factory)
+        self._receive(c, frame_factory, 50000)
+        c.clear_outbound_data_buffer()
+        c.receive_data(self._probe_ack(frame_factory))
+
+        frames = self._frames(c)
+        assert frames[1].window_increment == 100000 - self.DEFAULT_FLOW_WINDOW
+
+        c.receive_data(frame_factory.build_settings_frame({}, ack=True).serialize())
+        self._receive(c, frame_factory, 70000)
+        c.clear_outbound_data_buffer()
+        c.receive_data(self._probe_ack(frame_factory))
+
+        frames = self._frames(c)
+        assert frames[1].window_increment == 140000 - 100000
+        assert frames[0].settings == {
+            h2.settings.SettingCodes.INITIAL_WINDOW_SIZE: 140000,
+        }
+        assert c._inbound_flow_control_window_manager.max_window_size == 140000
+
+    def test_manual_increments_are_accounted_for(self, frame_factory) -> None:
+        """
+        A probe is judged against the connection window including increments
+        made by the application, and growth starts from that size.
+        """
+        c = self._setup_connection(frame_factory)
+        c.increment_flow_control_window(20000)
+        self._receive(c, frame_factory, 60000)
+        c.clear_outbound_data_buffer()
+        c.receive_data(self._probe_ack(frame_factory))
+
+        frames = self._frames(c)
+        assert frames[1].window_increment == 120000 - (self.DEFAULT_FLOW_WINDOW + 20000)
+        assert frames[0].settings == {
+            h2.settings.SettingCodes.INITIAL_WINDOW_SIZE: 120000,
+        }
+        assert c._inbound_flow_control_window_manager.max_window_size == 120000
+
+    def test_manual_increments_can_make_growth_unneeded(self, frame_factory) -> None:
+        """
+        A probe that would have filled the initial window does not grow the
+        windows if the application has made the connection window large
+        enough.
+        """
+        c = self._setup_connection(frame_factory)
+        c.increment_flow_control_window(100000)
+        self._receive(c, frame_factory, 50000)
+        c.clear_outbound_data_buffer()
+        c.receive_data(self._probe_ack(frame_factory))
+
+        assert not c.data_to_send()
+
+    def test_other_ping_acks_are_reported(self, frame_factory) -> None:
+        """
+        Acknowledgements of PINGs sent by the user still cause events while a
+        probe is outstanding.
+        """
+        c = self._setup_connection(frame_factory)
+        self._receive(c, frame_factory, 100)
+
+        ping_ack = frame_factory.build_ping_frame(
+            ping_data=b"12345678", flags=["ACK"],
+        )
+        events = c.receive_data(ping_ack.serialize())
+        assert len(events) == 1
+        assert isinstance(events[0], h2.events.PingAckReceived)
+
+
+class TestAcknowledgeReceivedDataMany:
+    """
+    Tests for acknowledging received data on several streams at once.
+    """
+
+    example_request_headers = [
+        (":authority", "example.com"),
+        (":path", "/"),
+        (":scheme", "https"),
+        (":method", "GET"),
+    ]
+
+    def _setup_connection(self, frame_factory, stream_ids=(1, 3, 5)) -> h2.connection.H2Connection:
+        """
+        Setup a server-side H2Connection that updates its windows on every
+        acknowledgement, and receive 100 bytes on each of some streams.
+        """
+        c = h2.connection.H2Connection(
+            config=h2.config.H2Configuration(
+                client_side=False,
+                window_strategy=h2.windows.EagerWindowStrategy(),
+            ),
+        )
+        c.initiate_connection()
+        c.receive_data(frame_factory.preamble())
+        for stream_id in stream_ids:
+            c.receive_data(
+                frame_factory.build_headers_frame(
+                    headers=self.example_request_headers, stream_id=stream_id,
+                ).serialize(),
+            )
+            c.receive_data(
+                frame_factory.build_data_frame(
+                    b"\x00" * 100, stream_id=stream_id,
+                ).serialize(),
+            )
+        c.clear_outbound_data_buffer()
+        return c
+
+    def _window_updates(self, c) -> list[tuple[int, int]]:
+        buffer = h2.frame_buffer.FrameBuffer(server=False)
+        buffer.max_frame_size = 16384
+        buffer.add_data(c.data_to_send())
+        return [(f.stream_id, f.window_increment) for f in buffer]
+
+    def test_one_window_update_for_the_connection(self, frame_factory) -> None:
+        """
+        At most one WINDOW_UPDATE is emitted for the connection, and one for
+        each stream.
+        """
+        c = self._setup_connection(frame_factory)
+        c.acknowledge_received_data_many({1: 100, 3: 50, 5: 0})
+
+        assert self._window_updates(c) == [(0, 150), (1, 100), (3, 50)]
+
+    def test_same_windows_as_acknowledging_each_stream(self, frame_factory) -> None:
+        """
+        The windows end up the same as when each stream is acknowledged
+        separately.
+        """
+        windows = []
+        for many in (False, True):
+            frame_factory.refresh_encoder()
+            c = self._setup_connection(frame_factory)
+            if many:
+                c.acknowledge_received_data_many({1: 100, 3: 100, 5: 100})
+            else:
+                for stream_id in (1, 3, 5):
+                    c.acknowledge_received_data(100, stream_id)
+            windows.append((
+                c.inbound_flow_control_window,
+                [c._get_stream_by_id(i).inbound_flow_control_window for i in (1, 3, 5)],
+            ))
+
+        assert windows[0] == windows[1]
+
+    def test_closed_streams_are_ignored(self, frame_factory) -> None:
+        """
+        Data acknowledged on closed streams only widens the connection window.
+        """
+        c = self._setup_connection(frame_factory)
+        c.reset_stream(3)
+        c.clear_outbound_data_buffer()
+        c.acknowledge_received_data_many({1: 100, 3: 100})
+
+        assert self._window_updates(c) == [(0, 200), (1, 100)]
+
+    @pytest.mark.parametrize(
+        ("acknowledged_sizes", "match"),
+        [({0: 100}, "not valid"), ({1: -1}, "negative")],
+    )
+    def test_invalid_acknowledgements(self, frame_factory, acknowledged_sizes, match) -> None:
+        """
+        Invalid stream IDs and sizes are refused before anything is
+        acknowledged.
+        """
+        c = self._setup_connection(frame_factory)
+        with pytest.raises(ValueError, match=match):
+            c.acknowledge_received_data_many({3: 100, **acknowledged_sizes})
+
+        assert not c.data_to_send()
+
+
+class TestAutoAcknowledge:
+    """
+    Tests for acknowledging received data automatically.
+    """
+
+    example_request_headers = [
+        (":authority", "example.com"),
+        (":path", "/"),
+        (":scheme", "https"),
+        (":method", "GET"),
+    ]
+
+    def _setup_connection(self, frame_factory, **kwargs) -> h2.connection.H2Connection:
+        """
+        Setup a server-side H2Connection that acknowledges data itself and
+        updates its windows on every acknowledgement, and open a stream.
+        """
+        kwargs.setdefault("window_strategy", h2.windows.EagerWindowStrategy())
+        kwargs.setdefault("auto_acknowledge_received_data", True)
+        c = h2.connection.H2Connection(
+            config=h2.config.H2Configuration(client_side=False, **kwargs),
+        )
+        c.initiate_connection()
+        c.receive_data(frame_factory.preamble())
+        c.receive_data(
+            frame_factory.build_headers_frame(
+                headers=self.example_request_headers,
+            ).serialize(),
+        )
+        c.clear_outbound_data_buffer()
+        return c
+
+    def _window_updates(self, c) -> list[tuple[int, int]]:
+        buffer = h2.frame_buffer.FrameBuffer(server=False)
+        buffer.max_frame_size = 16384
+        buffer.add_data(c.data_to_send())
+        return [(f.stream_id, f.window_increment) for f in buffer]
+
+    def test_data_is_acknowledged(self, frame_factory) -> None:
+        """
+        Received data is acknowledged without the application's help,
+        including padding.
+        """
+        c = self._setup_connection(frame_factory)
+        data_frame = frame_factory.build_data_frame(b"some data", padding_len=10)
+        events = c.receive_data(data_frame.serialize())
+
+        assert isinstance(events[0], h2.events.DataReceived)
+        assert self._window_updates(c) == [(0, 20), (1, 20)]
+
+    def test_window_strategy_decides_updates(self, frame_factory) -> None:
+        """
+        The window strategy still decides when window updates are emitted.
+        """
+        c = self._setup_connection(
+            frame_factory, window_strategy=h2.windows.HalfWindowStrategy(),
+        )
+        data_frame = frame_factory.build_data_frame(b"some data")
+        c.receive_data(data_frame.serialize())
+        assert not c.data_to_send()
+
+        for _ in range(2):
+            data_frame = frame_factory.build_data_frame(b"\x00" * 16384)
+            c.receive_data(data_frame.serialize())
+        assert self._window_updates(c) == [(0, 32777), (1, 32777)]
+
+    def test_stream_budget(self, frame_factory) -> None:
+        """
+        Only the first bytes of a stream, up to the budget, are acknowledged
+        automatically. The application acknowledges the rest.
+        """
+        c = self._setup_connection(frame_factory, auto_acknowledge_stream_budget=15)
+        for _ in range(3):
+            data_frame = frame_factory.build_data_frame(b"some data")
+            c.receive_data(data_frame.serialize())
+        assert self._window_updates(c) == [(0, 9), (1, 9), (0, 6), (1, 6)]
+
+        c.acknowledge_received_data(12, stream_id=1)
+        assert self._window_updates(c) == [(0, 12), (1, 12)]
+
+    def test_closed_stream_only_acknowledges_connection(self, frame_factory) -> None:
+        """
+        Data that ends the stream only widens the connection window, as the
+        stream window is of no further use.
+        """
+        c = self._setup_connection(frame_factory)
+        c.send_headers(1, [(":status", "200")], end_stream=True)
+        c.clear_outbound_data_buffer()
+
+        data_frame = frame_factory.build_data_frame(b"some data", flags=["END_STREAM"])
+        c.receive_data(data_frame.serialize())
+
+        assert self._window_updates(c) == [(0, 9)]
+
+    def test_event_handler(self, frame_factory) -> None:
+        """
+        Data is acknowledged when it is reported to an event handler.
+        """
+        c = self._setup_connection(frame_factory)
+        received = []
+
+        class Handler(h2.handlers.EventHandler):
+            def on_data(self, stream_id, data, flow_controlled_length, end_stream) -> None:
+                received.append(data)
+
+        c.set_event_handler(Handler())
+        data_frame = frame_factory.build_data_frame(b"some data")
+        c.receive_data(data_frame.serialize())
+
+        assert received == [b"some data"]
+        assert self._window_updates(c) == [(0, 9), (1, 9)]
+
+    def test_disabled_by_default(self, frame_factory) -> None:
+        """
+        Nothing is acknowledged automatically by default.
+        """
+        c = self._setup_connection(frame_factory, auto_acknowledge_received_data=False)
+        data_frame = frame_factory.build_data_frame(b"some data")
+        c.receive_data(data_frame.serialize())
+
+        assert not c.data_to_send()
+
+
+class TestDeferredWindowUpdates:
+    """
+    Tests for holding back WINDOW_UPDATE frames until the end of a receive
+    call.
+    """
+
+    example_request_headers = [
+        (":authority", "example.com"),
+        (":path", "/"),
+        (":scheme", "https"),
+        (":method", "GET"),
+    ]
+
+    def _setup_connection(self, frame_factory, stream_ids=range(1, 17, 2), **kwargs) -> h2.connection.H2Connection:
+        """
+        Setup a server-side H2Connection with 1 MiB of room in its windows,
+        which updates them on every acknowledgement, and open some streams.
+        """
+        kwargs.setdefault("window_strategy", h2.windows.EagerWindowStrategy())
+        c = h2.connection.H2Connection(
+            config=h2.config.H2Configuration(client_side=False, **kwargs),
+        )
+        c.initiate_connection()
+        c.update_settings({h2.settings.SettingCodes.INITIAL_WINDOW_SIZE: 2**20})
+        c.increment_flow_control_window(2**20)
+        c.receive_data(
+            frame_factory.preamble() +
+            frame_factory.build_settings_frame({}, ack=True).serialize(),
+        )
+        for stream_id in stream_ids:
+            c.receive_data(
+                frame_factory.build_headers_frame(
+                    headers=self.example_request_headers, stream_id=stream_id,
+                ).serialize(),
+            )
+        c.clear_outbound_data_buffer()
+        return c
+
+    def _data(self, frame_factory, stream_ids=range(1, 17, 2), count=8) -> bytes:
+        """
+        Build ``count`` 16 KiB DATA frames for each stream, interleaved.
+        """
+        return b"".join(
+            frame_factory.build_data_frame(b"\x00" * 16384, stream_id=stream_id).serialize()
+            for _ in range(count)
+            for stream_id in stream_ids
+        )
+
+    def _window_updates(self, c) -> list[tuple[int, int]]:
+        buffer = h2.frame_buffer.FrameBuffer(server=False)
+        buffer.max_frame_size = 16384
+        buffer.add_data(c.data_to_send())
+        return [(f.stream_id, f.window_increment) for f in buffer]
+
+    def test_one_window_update_per_stream(self, frame_factory) -> None:
+        """
+        One 1 MiB read of 64 DATA frames on 8 streams, all acknowledged as they
+        are received, produces 9 WINDOW_UPDATE frames.
+        """
+        c = self._setup_connection(frame_factory, auto_acknowledge_received_data=True)
+        c.receive_data(self._data(frame_factory))
+
+        updates = self._window_updates(c)
+        assert len(updates) == 9
+        assert updates == [(0, 2**20)] + [(i, 2**17) for i in range(1, 17, 2)]
+
+    def test_event_handler_acknowledgements(self, frame_factory) -> None:
+        """
+        Data acknowledged by an event handler during a receive call produces
+        one WINDOW_UPDATE frame per stream.
+        """
+        c = self._setup_connection(frame_factory)
+
+        class Handler(h2.handlers.EventHandler):
+            def on_data(self, stream_id, data, flow_controlled_length, end_stream) -> None:
+                c.acknowledge_received_data(flow_controlled_length, stream_id)
+
+        c.set_event_handler(Handler())
+        c.receive_data(self._data(frame_factory))
+
+        assert len(self._window_updates(c)) == 9
+
+    def test_acknowledgements_outside_receive_are_sent_at_once(self, frame_factory) -> None:
+        """
+        Acknowledgements made after the receive call has returned are not
+        held back.
+        """
+        c = self._setup_connection(frame_factory, stream_ids=[1])
+        events = c.receive_data(self._data(frame_factory, stream_ids=[1], count=2))
+        for event in events:
+            c.acknowledge_received_data(event.flow_controlled_length, event.stream_id)
+
+        assert self._window_updates(c) == [(0, 16384), (1, 16384)] * 2
+
+    def test_updates_for_closed_streams_are_dropped(self, frame_factory) -> None:
+        """
+        Held back updates for streams that were closed during the receive call
+        are dropped, while the connection update is kept.
+        """
+        c = self._setup_connection(
+            frame_factory, stream_ids=[1], auto_acknowledge_received_data=True,
+        )
+        data = (
+            self._data(frame_factory, stream_ids=[1], count=1) +
+            frame_factory.build_rst_stream_frame(stream_id=1).serialize()
+        )
+        c.receive_data(data)
+
+        assert self._window_updates(c) == [(0, 16384)]
+
+    def test_connection_update_kept_when_stream_ends(self, frame_factory) -> None:
+        """
+        The connection update is still sent when the only stream that data was
+        received on is closed by that data ending it.
+        """
+        c = self._setup_connection(
+            frame_factory, stream_ids=[1], auto_acknowledge_received_data=True,
+        )
+        c.send_headers(1, [(":status", "200")], end_stream=True)
+        c.clear_outbound_data_buffer()
+        data = (
+            self._data(frame_factory, stream_ids=[1], count=1) +
+            frame_factory.build_data_frame(b"\x00" * 100, flags=["END_STREAM"]).serialize()
+        )
+        c.receive_data(data)
+
+        assert c.streams[1].closed
+        assert self._window_updates(c) == [(0, 16484)]
+
+    def test_updates_are_dropped_when_connection_fails(self, frame_factory) -> None:
+        """
+        Updates held back before a frame causes a connection error are not
+        sent after the GOAWAY.
+        """
+        c = self._setup_connection(
+            frame_factory, stream_ids=[1], auto_acknowledge_received_data=True,
+        )
+        data = (
+            self._data(frame_factory, stream_ids=[1], count=1) +
+            frame_factory.build_window_update_frame(stream_id=0, increment=0).serialize()
+        )
+        with pytest.raises(h2.exceptions.ProtocolError):
+            c.receive_data(data)
+
+        frames = h2.frame_buffer.FrameBuffer(server=False)
+        frames.max_frame_size = 16384
+        frames.add_data(c.data_to_send())
+        assert [f.__class__ for f in frames] == [hyperframe.frame.GoAwayFrame]
+
+    def test_iter_events_matches_receive_data(self, frame_factory) -> None:
+        """
+        iter_events holds back the same WINDOW_UPDATE frames as receive_data,
+        and sends them once the iterator is exhausted.
+        """
+        expected = self._setup_connection(frame_factory, auto_acknowledge_received_data=True)
+        expected.receive_data(self._data(frame_factory))
+
+        frame_factory.refresh_encoder()
+        c = self._setup_connection(frame_factory, auto_acknowledge_received_data=True)
+        events = c.iter_events(self._data(frame_factory))
+        next(events)
+        assert not c.data_to_send()
+        list(events)
+
+        assert self._window_updates(c) == self._window_updates(expected)
+
+    def test_closing_iter_events_sends_updates(self, frame_factory) -> None:
+        """
+        Closing the iterator returned by iter_events early sends the
+        WINDOW_UPDATE frames held back for the frames processed so far.
+        """
+        c = self._setup_connection(
+            frame_factory, stream_ids=[1], auto_acknowledge_received_data=True,
+        )
+        events = c.iter_events(self._data(frame_factory, stream_ids=[1], count=2))
+        next(events)
+        events.close()
+
+        assert self._window_updates(c) == [(0, 16384), (1, 16384)]
+
+    def test_large_increments_are_split(self, frame_factory) -> None:
+        """
+        Held back increments that sum to more than the largest allowed
+        increment are sent as several WINDOW_UPDATE frames.
+        """
+        c = self._setup_connection(frame_factory, auto_acknowledge_received_data=True)
+
+        class Handler(h2.handlers.EventHandler):
+            def on_event(self, event) -> None:
+                c.increment_flow_control_window(
+                    c.MAX_WINDOW_INCREMENT - c.inbound_flow_control_window,
+                )
+
+        c.set_event_handler(Handler())
+        c.receive_data(
+            frame_factory.build_ping_frame(b"12345678").serialize() +
+            self._data(frame_factory, count=9),
+        )
+
+        frames = h2.frame_buffer.FrameBuffer(server=False)
+        frames.max_frame_size = 16384
+        frames.add_data(c.data_to_send())
+        updates = [
+            f.window_increment for f in frames
+            if isinstance(f, hyperframe.frame.WindowUpdateFrame) and f.stream_id == 0
+        ]
+        assert updates == [c.MAX_WINDOW_INCREMENT, 9 * 8 * 16384 - 2**20 - 65535]
@@ -0,0 +1,470 @@
+"""
+test_frame_buffer
+~~~~~~~~~~~~~~~~~
+
+Tests for the FrameBuffer, which turns received bytes into HTTP/2 frames.
+"""
+from __future__ import annotations
+
+import hyperframe.exceptions
+import hyperframe.frame
+import pytest
+
+import h2.config
+import h2.connection
+import h2.events
+import h2.exceptions
+import h2.frame_buffer
+
+
+class TestFrameBuffer:
+    """
+    Tests of the receive-side frame buffer.
+    """
+
+    def _buffer(self) -> h2.frame_buffer.FrameBuffer:
+        buffer = h2.frame_buffer.FrameBuffer(server=False)
+        buffer.max_frame_size = 65535
+        return buffer
+
+    def test_parses_many_frames_from_one_read(self, frame_factory) -> None:
+        """
+        A single read containing many frames yields all of them, in order.
+        """
+        buffer = self._buffer()
+        frames = [
+            frame_factory.build_data_frame(b"x" * i, stream_id=1)
+            for i in range(100)
+        ]
+        buffer.add_data(b"".join(f.serialize() for f in frames))
+
+        parsed = list(buffer)
+
+        assert len(parsed) == 100
+        assert [f.data for f in parsed] == [f.data for f in frames]
+        assert len(buffer) == 0
+
+    def test_partial_frames_are_kept(self, frame_factory) -> None:
+        """
+        Partial frames stay in the buffer until the rest of their data is
+        received, even when the frame is split inside the header.
+        """
+        buffer = self._buffer()
+        data = frame_factory.build_data_frame(b"hello").serialize() * 2
+
+        for split in range(len(data) + 1):
+            buffer.add_data(data[:split])
+            first = list(buffer)
+            buffer.add_data(data[split:])
+            second = list(buffer)
+            assert len(first) + len(second) == 2
+            assert len(buffer) == 0
+
+    def test_buffer_is_compacted(self, frame_factory) -> None:
+        """
+        Once most of the buffer has been parsed, the consumed bytes are thrown
+        away when more data is added.
+        """
+        buffer = self._buffer()
+        frame = frame_factory.build_data_frame(b"hello").serialize()
+        buffer.add_data(frame * 10 + frame[:4])
+        assert len(list(buffer)) == 10
+
+        # Nothing has been discarded yet: the parse happened in place.
+        assert len(buffer._data) == len(frame) * 10 + 4
+        assert len(buffer) == 4
+
+        buffer.add_data(frame[4:])
+        assert buffer._offset == 0
+        assert len(buffer._data) == len(frame)
+        assert len(list(buffer)) == 1
+
+    def test_buffer_is_not_compacted_early(self, frame_factory) -> None:
+        """
+        While only a small part of the buffer has been consumed, adding data
+        does not move the unparsed data.
+        """
+        buffer = self._buffer()
+        frame = frame_factory.build_data_frame(b"hello").serialize()
+        big_frame = frame_factory.build_data_frame(b"x" * 100).serialize()
+        buffer.add_data(frame + big_frame[:50])
+        next(buffer)
+
+        buffer.add_data(big_frame[50:])
+        assert buffer._offset == len(frame)
+        assert len(list(buffer)) == 1
+
+    def test_compaction_survives_outstanding_views(self, frame_factory) -> None:
+        """
+        If something still holds a view onto the receive buffer, it can't be
+        compacted in place. The frame buffer copes by replacing it instead.
+        """
+        buffer = self._buffer()
+        frame = frame_factory.build_data_frame(b"hello").serialize()
+        buffer.add_data(frame + frame[:4])
+        assert len(list(buffer)) == 1
+
+        view = memoryview(buffer._data)
+        buffer.add_data(frame[4:])
+        assert len(list(buffer)) == 1
+        assert bytes(view[:len(frame)]) == frame
+
+    def test_appending_survives_outstanding_views(self, frame_factory) -> None:
+        """
+        If something still holds a view onto the receive buffer, it can't be
+        grown in place. The frame buffer copes by replacing it instead.
+        """
+        buffer = self._buffer()
+        frame = frame_factory.build_data_frame(b"hello").serialize()
+        buffer.add_data(frame[:4])
+
+        view = memoryview(buffer._data)
+        buffer.add_data(frame[4:])
+        assert len(list(buffer)) == 1
+        assert bytes(view) == frame[:4]
+
+    def test_frames_do_not_reference_buffer(self, frame_factory) -> None:
+        """
+        Frames parsed out of the buffer own their data, so the buffer can be
+        reused after they are handed out.
+        """
+        buffer = self._buffer()
+        buffer.add_data(frame_factory.build_data_frame(b"hello").serialize())
+        f = next(buffer)
+        buffer.add_data(frame_factory.build_data_frame(b"world").serialize())
+        next(buffer)
+
+        assert isinstance(f, hyperframe.frame.DataFrame)
+        assert isinstance(f.data, bytes)
+        assert f.data == b"hello"
+
+    def test_overlong_frame_is_rejected(self, frame_factory) -> None:
+        """
+        Frames larger than the maximum frame size are rejected once they are
+        complete.
+        """
+        buffer = self._buffer()
+        buffer.max_frame_size = 4
+        buffer.add_data(frame_factory.build_data_frame(b"hello").serialize())
+
+        with pytest.raises(h2.exceptions.FrameTooLargeError):
+            next(buffer)
+
+    def test_frames_are_parsed_after_compaction(self, frame_factory) -> None:
+        """
+        Compacting the buffer moves the unparsed frames, which are still
+        parsed correctly.
+        """
+        buffer = self._buffer()
+        frames = [
+            frame_factory.build_data_frame(b"x" * i).serialize()
+            for i in range(1, 5)
+        ]
+        buffer.add_data(b"".join(frames))
+        for _ in range(3):
+            next(buffer)
+
+        buffer.add_data(frames[0])
+        assert buffer._offset == 0
+        assert [f.data for f in buffer] == [b"xxxx", b"x"]
+
+    def test_skip_filters_drop_frames(self, frame_factory) -> None:
+        """
+        Frames claimed by a skip filter are never returned, but frames of the
+        same type that the filter rejects are.
+        """
+        buffer = self._buffer()
+        seen = []
+
+        def skip(stream_id, body) -> bool:
+            seen.append((stream_id, bytes(body)))
+            return stream_id == 1
+        buffer.skip_filters[hyperframe.frame.DataFrame.type] = skip
+
+        buffer.add_data(
+            frame_factory.build_data_frame(b"one", stream_id=1).serialize() +
+            frame_factory.build_data_frame(b"three", stream_id=3).serialize() +
+            frame_factory.build_ping_frame(b"\x00" * 8).serialize(),
+        )
+        parsed = list(buffer)
+
+        assert seen == [(1, b"one"), (3, b"three")]
+        assert [type(f) for f in parsed] == [
+            hyperframe.frame.DataFrame, hyperframe.frame.PingFrame,
+        ]
+        assert len(buffer) == 0
+
+    def test_skipped_frames_must_not_be_too_long(self, frame_factory) -> None:
+        """
+        Skipped frames are still subject to the maximum frame size.
+        """
+        buffer = self._buffer()
+        buffer.max_frame_size = 4
+        buffer.skip_filters[hyperframe.frame.DataFrame.type] = lambda *args: True
+        buffer.add_data(frame_factory.build_data_frame(b"hello").serialize())
+
+        with pytest.raises(h2.exceptions.FrameTooLargeError):
+            next(buffer)
+
+    def test_frames_are_not_skipped_in_header_blocks(self, frame_factory) -> None:
+        """
+        Skip filters are not consulted while a header block is being received,
+        so a frame in the middle of one is still an error.
+        """
+        buffer = self._buffer()
+        buffer.skip_filters[hyperframe.frame.DataFrame.type] = lambda *args: True
+        headers = frame_factory.build_headers_frame([])
+        headers.flags.discard("END_HEADERS")
+        buffer.add_data(
+            headers.serialize() +
+            frame_factory.build_data_frame(b"hello").serialize(),
+        )
+
+        with pytest.raises(h2.exceptions.ProtocolError):
+            next(buffer)
+
+    def test_oversized_fragment_is_not_added(self, frame_factory) -> None:
+        """
+        A CONTINUATION frame that would take the header block past the size
+        limit is rejected before its fragment is added to the block.
+        """
+        buffer = self._buffer()
+        buffer.max_header_block_size = 100
+        headers = frame_factory.build_headers_frame([])
+        headers.data = b"x" * 60
+        headers.flags.discard("END_HEADERS")
+        buffer.add_data(
+            headers.serialize() +
+            frame_factory.build_continuation_frame(b"x" * 60000).serialize(),
+        )
+
+        with pytest.raises(h2.exceptions.DenialOfServiceError):
+            next(buffer)
+        assert len(buffer._header_block) == 60
+
+    def test_unknown_frames_are_extension_frames(self) -> None:
+        """
+        Frames of unknown types are returned as extension frames.
+        """
+        buffer = self._buffer()
+        buffer.add_data(b"\x00\x00\x02\xfa\x01\x00\x00\x00\x01hi")
+
+        f = next(buffer)
+        assert isinstance(f, hyperframe.frame.ExtensionFrame)
+        assert f.type == 0xFA
+        assert f.flag_byte == 0x01
+        assert f.stream_id == 1
+        assert f.body == b"hi"
+
+    @pytest.mark.parametrize(
+        ("flags", "pad_length"),
+        [
+            ([], 0),
+            (["END_STREAM"], 0),
+            (["PADDED"], 0),
+            (["PADDED"], 10),
+            (["END_STREAM", "PADDED"], 3),
+        ],
+    )
+    def test_decoding_data_frames(self, frame_factory, flags, pad_length) -> None:
+        """
+        DATA frames decoded directly from the buffer match the frames that
+        hyperframe would have built.
+        """
+        buffer = self._buffer()
+        buffer.decode_data_frames = True
+        frame = frame_factory.build_data_frame(
+            b"hello", flags=flags, stream_id=3, padding_len=pad_length,
+        )
+        buffer.add_data(frame.serialize())
+
+        decoded = next(buffer)
+        assert isinstance(decoded, h2.frame_buffer.ReceivedDataFrame)
+        assert decoded.stream_id == 3
+        assert decoded.flags == set(flags)
+        assert isinstance(decoded.data, bytes)
+        assert decoded.data == b"hello"
+        assert decoded.flow_controlled_length == frame.flow_controlled_length
+        assert repr(decoded) == (
+            f"ReceivedDataFrame(stream_id=3, flags={sorted(flags)!r}): <5 bytes>"
+        )
+        assert len(buffer) == 0
+
+    @pytest.mark.parametrize(
+        ("data", "exception"),
+        [
+            # PADDED, but with no room for the pad length.
+            (
+                b"\x00\x00\x00\x00\x08\x00\x00\x00\x01",
+                h2.exceptions.FrameDataMissingError,
+            ),
+            # More padding than there is frame body.
+            (
+                b"\x00\x00\x02\x00\x08\x00\x00\x00\x01\x02\x00",
+                hyperframe.exceptions.InvalidPaddingError,
+            ),
+            # Stream 0.
+            (
+                b"\x00\x00\x02\x00\x00\x00\x00\x00\x00hi",
+                h2.exceptions.ProtocolError,
+            ),
+        ],
+    )
+    def test_decoding_invalid_data_frames(self, data, exception) -> None:
+        """
+        Malformed DATA frames raise exactly the same errors whether or not DATA
+        frames are decoded directly from the buffer.
+        """
+        for decode_data_frames in (False, True):
+            buffer = self._buffer()
+            buffer.decode_data_frames = decode_data_frames
+            buffer.add_data(data)
+
+            with pytest.raises(exception):
+                next(buffer)
+
+    def test_receiving_into_lent_buffer(self, frame_factory) -> None:
+        """
+        Data written into a buffer lent out by get_buffer is parsed once
+        buffer_updated is called.
+        """
+        buffer = self._buffer()
+        data = frame_factory.build_data_frame(b"hello").serialize() * 3
+
+        view = buffer.get_buffer(len(data))
+        assert len(view) == len(data)
+        view[:len(data)] = data
+        buffer.buffer_updated(len(data))
+
+        assert [f.data for f in buffer] == [b"hello"] * 3
+
+    def test_lent_buffer_reuses_spare_space(self, frame_factory) -> None:
+        """
+        Space lent out but not written into is reused by the next get_buffer
+        call.
+        """
+        buffer = self._buffer()
+        data = frame_factory.build_data_frame(b"hello").serialize()
+
+        view = buffer.get_buffer()
+        assert len(view) == h2.frame_buffer.DEFAULT_BUFFER_SIZE
+        view[:5] = data[:5]
+        buffer.buffer_updated(5)
+        assert not list(buffer)
+
+        capacity = len(buffer._data)
+        view = buffer.get_buffer(len(data) - 5)
+        view[:] = data[5:]
+        buffer.buffer_updated(len(data) - 5)
+
+        assert len(buffer._data) == capacity
+        assert [f.data for f in buffer] == [b"hello"]
+
+    def test_lent_buffer_is_released(self, frame_factory) -> None:
+        """
+        Lent buffers are released when buffer_updated or add_data is called,
+        so that the buffer can be resized again.
+        """
+        buffer = self._buffer()
+        data = frame_factory.build_data_frame(b"hello").serialize()
+
+        view = buffer.get_buffer(4)
+        buffer.add_data(data)
+        with pytest.raises(ValueError, match="released"):
+            view[0]
+
+        view = buffer.get_buffer(4)
+        buffer.buffer_updated(0)
+        with pytest.raises(ValueError, match="released"):
+            view[0]
+
+        assert [f.data for f in buffer] == [b"hello"]
+
+    def test_lent_buffer_survives_outstanding_views(self) -> None:
+        """
+        Lending a buffer works even if something else still holds a view onto
+        the receive buffer.
+        """
+        buffer = self._buffer()
+        old_view = memoryview(buffer.get_buffer(4).obj)
+        buffer.buffer_updated(0)
+
+        view = buffer.get_buffer(8)
+        assert len(view) == 8
+        assert len(old_view) == 4
+
+    def test_buffer_updated_requires_lent_buffer(self) -> None:
+        """
+        buffer_updated must only be called after get_buffer.
+        """
+        buffer = self._buffer()
+        with pytest.raises(RuntimeError):
+            buffer.buffer_updated(0)
+
+    @pytest.mark.parametrize("nbytes", [-1, 5])
+    def test_buffer_updated_rejects_bad_sizes(self, nbytes) -> None:
+        """
+        buffer_updated rejects byte counts that can't have been written into
+        the lent buffer.
+        """
+        buffer = self._buffer()
+        buffer.get_buffer(4)
+        with pytest.raises(ValueError, match="nbytes"):
+            buffer.buffer_updated(nbytes)
+
+
+class TestReceiveInto:
+    """
+    Tests of receiving data directly into the connection's receive buffer.
+    """
+
+    example_request_headers = [
+        (":authority", "example.com"),
+        (":path", "/"),
+        (":scheme", "https"),
+        (":method", "GET"),
+    ]
+    server_config = h2.config.H2Configuration(client_side=False)
+
+    def _receive_into(self, c, data, chunk_size):
+        events = []
+        for i in range(0, len(data), chunk_size):
+            chunk = data[i:i+chunk_size]
+            view = c.get_receive_buffer(len(chunk))
+            view[:len(chunk)] = chunk
+            events.extend(c.receive_into(len(chunk)))
+        return events
+
+    @pytest.mark.parametrize("chunk_size", [1, 7, 24, 1000])
+    def test_receive_into_matches_receive_data(self, frame_factory, chunk_size) -> None:
+        """
+        Receiving data via get_receive_buffer and receive_into produces the
+        same events as receive_data, however the data is split, including
+        through the connection preamble.
+        """
+        data = (
+            frame_factory.preamble() +
+            frame_factory.build_headers_frame(self.example_request_headers).serialize() +
+            frame_factory.build_data_frame(b"hello", flags=["END_STREAM"]).serialize()
+        )
+
+        c = h2.connection.H2Connection(config=self.server_config)
+        events = self._receive_into(c, data, chunk_size)
+
+        assert [type(e) for e in events] == [
+            h2.events.RequestReceived,
+            h2.events.DataReceived,
+            h2.events.StreamEnded,
+        ]
+        assert events[1].data == b"hello"
+
+    def test_receive_into_rejects_bad_preamble(self) -> None:
+        """
+        An invalid preamble received into the buffer is a ProtocolError.
+        """
+        c = h2.connection.H2Connection(config=self.server_config)
+        view = c.get_receive_buffer(4)
+        view[:] = b"GET "
+
+        with pytest.raises(h2.exceptions.ProtocolError):
+            c.receive_into(4)
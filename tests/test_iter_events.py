@@ -0,0 +1,147 @@
+"""
+test_iter_events
+~~~~~~~~~~~~~~~~
+
+Tests for processing received data lazily with iter_events.
+"""
+from __future__ import annotations
+
+import pytest
+
+import h2.config
+import h2.connection
+import h2.errors
+import h2.events
+import h2.exceptions
+
+
+class TestIterEvents:
+    """
+    Tests of the incremental event API.
+    """
+
+    example_request_headers = [
+        (":authority", "example.com"),
+        (":path", "/"),
+        (":scheme", "https"),
+        (":method", "POST"),
+    ]
+    server_config = h2.config.H2Configuration(client_side=False)
+
+    def _data(self, frame_factory) -> bytes:
+        return (
+            frame_factory.preamble() +
+            frame_factory.build_settings_frame({}).serialize() +
+            frame_factory.build_headers_frame(self.example_request_headers).serialize() +
+            frame_factory.build_data_frame(b"hello").serialize() +
+            frame_factory.build_ping_frame(b"\x01" * 8).serialize() +
+            frame_factory.build_data_frame(b"world", flags=["END_STREAM"]).serialize()
+        )
+
+    def test_matches_receive_data(self, frame_factory) -> None:
+        """
+        iter_events produces the same events and outbound data as
+        receive_data.
+        """
+        data = self._data(frame_factory)
+
+        c = h2.connection.H2Connection(config=self.server_config)
+        c.initiate_connection()
+        expected_events = c.receive_data(data)
+        expected_data = c.data_to_send()
+
+        frame_factory.refresh_encoder()
+        data = self._data(frame_factory)
+        c = h2.connection.H2Connection(config=self.server_config)
+        c.initiate_connection()
+        events = list(c.iter_events(data))
+
+        assert [type(e) for e in events] == [type(e) for e in expected_events]
+        assert [repr(e) for e in events] == [repr(e) for e in expected_events]
+        assert c.data_to_send() == expected_data
+
+    def test_frames_are_processed_lazily(self, frame_factory) -> None:
+        """
+        Each frame is only processed when the events before it have been
+        consumed, and outbound frames are written as frames are processed.
+        """
+        c = h2.connection.H2Connection(config=self.server_config)
+        c.initiate_connection()
+        c.receive_data(frame_factory.preamble())
+        c.clear_outbound_data_buffer()
+
+        ping = frame_factory.build_ping_frame(b"\x01" * 8)
+        ack = frame_factory.build_ping_frame(b"\x01" * 8, flags=["ACK"])
+        events = c.iter_events(ping.serialize() * 3)
+        assert not c.data_to_send()
+
+        assert isinstance(next(events), h2.events.PingReceived)
+        assert c.data_to_send() == ack.serialize()
+        assert c.has_pending_frames
+
+        assert len(list(events)) == 2
+        assert c.data_to_send() == ack.serialize() * 2
+        assert not c.has_pending_frames
+
+    def test_abandoned_iterator_leaves_frames_pending(self, frame_factory) -> None:
+        """
+        If the iterator is not exhausted, the remaining frames can be processed
+        later.
+        """
+        c = h2.connection.H2Connection(config=self.server_config)
+        c.initiate_connection()
+
+        events = c.iter_events(self._data(frame_factory))
+        assert isinstance(next(events), h2.events.RemoteSettingsChanged)
+        del events
+
+        assert c.has_pending_frames
+        events = c.process_pending()
+        assert [type(e) for e in events] == [
+            h2.events.RequestReceived,
+            h2.events.DataReceived,
+            h2.events.PingReceived,
+            h2.events.DataReceived,
+            h2.events.StreamEnded,
+        ]
+
+    def test_budget(self, frame_factory) -> None:
+        """
+        iter_events respects the frame budget.
+        """
+        c = h2.connection.H2Connection(config=self.server_config)
+        c.initiate_connection()
+
+        events = list(c.iter_events(self._data(frame_factory), max_frames=2))
+        assert [type(e) for e in events] == [
+            h2.events.RemoteSettingsChanged, h2.events.RequestReceived,
+        ]
+        assert c.has_pending_frames
+
+        with pytest.raises(ValueError):
+            c.iter_events(b"", max_bytes=0)
+
+    def test_protocol_errors_terminate_connection(self, frame_factory) -> None:
+        """
+        A protocol error raised while iterating closes the connection, after
+        the events before it have been yielded.
+        """
+        c = h2.connection.H2Connection(config=self.server_config)
+        c.initiate_connection()
+        c.receive_data(frame_factory.preamble())
+        c.clear_outbound_data_buffer()
+
+        ping = frame_factory.build_ping_frame(b"\x01" * 8)
+        bad_data = frame_factory.build_data_frame(b"hello", stream_id=3)
+        events = c.iter_events(ping.serialize() + bad_data.serialize())
+
+        assert isinstance(next(events), h2.events.PingReceived)
+        c.clear_outbound_data_buffer()
+        with pytest.raises(h2.exceptions.ProtocolError):
+            next(events)
+
+        expected_frame = frame_factory.build_goaway_frame(
+            last_stream_id=0,
+            error_code=h2.errors.ErrorCodes.PROTOCOL_ERROR,
+        )
+        assert c.data_to_send() == expected_frame.serialize()
@@ -0,0 +1,179 @@
+"""
+test_receive_budget
+~~~~~~~~~~~~~~~~~~~
+
+Tests for limiting how many received frames are processed in one call.
+"""
+from __future__ import annotations
+
+import pytest
+
+import h2.config
+import h2.connection
+import h2.events
+
+
+class TestReceiveBudget:
+    """
+    Tests of the frame and byte budgets for processing received data.
+    """
+
+    example_request_headers = [
+        (":authority", "example.com"),
+        (":path", "/"),
+        (":scheme", "https"),
+        (":method", "POST"),
+    ]
+    server_config = h2.config.H2Configuration(client_side=False)
+
+    def _connection(self, frame_factory, config=None) -> h2.connection.H2Connection:
+        c = h2.connection.H2Connection(config=config or self.server_config)
+        c.initiate_connection()
+        c.receive_data(
+            frame_factory.preamble() +
+            frame_factory.build_headers_frame(self.example_request_headers).serialize(),
+        )
+        c.clear_outbound_data_buffer()
+        return c
+
+    def _data(self, frame_factory, count=10) -> bytes:
+        return b"".join(
+            frame_factory.build_data_frame(b"x" * 10).serialize()
+            for _ in range(count)
+        )
+
+    def test_unlimited_by_default(self, frame_factory) -> None:
+        """
+        By default all complete frames are processed in one call.
+        """
+        c = self._connection(frame_factory)
+        events = c.receive_data(self._data(frame_factory))
+
+        assert len(events) == 10
+        assert not c.has_pending_frames
+
+    def test_max_frames(self, frame_factory) -> None:
+        """
+        With a frame budget, processing stops once the budget is used up, and
+        the remaining frames can be processed later.
+        """
+        c = self._connection(frame_factory)
+        events = c.receive_data(self._data(frame_factory), max_frames=3)
+
+        assert len(events) == 3
+        assert all(isinstance(e, h2.events.DataReceived) for e in events)
+        assert c.has_pending_frames
+
+        events = c.process_pending(max_frames=5)
+        assert len(events) == 5
+        assert c.has_pending_frames
+
+        events = c.process_pending()
+        assert len(events) == 2
+        assert not c.has_pending_frames
+        assert not c.process_pending()
+
+    def test_max_bytes(self, frame_factory) -> None:
+        """
+        With a byte budget, processing stops once frames totalling at least
+        that many bytes have been processed.
+        """
+        c = self._connection(frame_factory)
+        frame_length = 9 + 10
+
+        events = c.receive_data(self._data(frame_factory), max_bytes=frame_length * 2 + 1)
+        assert len(events) == 3
+        assert c.has_pending_frames
+
+        events = c.process_pending(max_bytes=frame_length)
+        assert len(events) == 1
+
+        events = c.process_pending(max_bytes=1, max_frames=10)
+        assert len(events) == 1
+
+    def test_budget_from_config(self, frame_factory) -> None:
+        """
+        The configured budgets apply when none is given, and can be overridden
+        per call.
+        """
+        config = h2.config.H2Configuration(
+            client_side=False, max_frames_per_receive=1,
+        )
+        c = self._connection(frame_factory, config)
+        events = c.receive_data(self._data(frame_factory))
+        assert len(events) == 1
+
+        events = c.process_pending(max_frames=4)
+        assert len(events) == 4
+
+        config.max_frames_per_receive = None
+        config.max_bytes_per_receive = 19
+        events = c.process_pending()
+        assert len(events) == 1
+
+    def test_budget_in_receive_into(self, frame_factory) -> None:
+        """
+        The budgets also apply to receive_into.
+        """
+        c = self._connection(frame_factory)
+        data = self._data(frame_factory)
+        view = c.get_receive_buffer(len(data))
+        view[:len(data)] = data
+
+        events = c.receive_into(len(data), max_frames=2)
+        assert len(events) == 2
+        assert len(c.process_pending()) == 8
+
+    def test_partial_frames_are_not_pending(self, frame_factory) -> None:
+        """
+        A partially received frame does not count as a pending frame.
+        """
+        c = self._connection(frame_factory)
+        data = self._data(frame_factory, count=1)
+
+        assert not c.receive_data(data[:-1], max_frames=1)
+        assert not c.has_pending_frames
+        assert len(c.receive_data(data[-1:], max_frames=1)) == 1
+
+    def test_header_block_counts_as_one_frame(self, frame_factory) -> None:
+        """
+        A header block split over CONTINUATION frames is a single frame for the
+        purposes of the frame budget.
+        """
+        c = h2.connection.H2Connection(config=self.server_config)
+        c.initiate_connection()
+        c.receive_data(frame_factory.preamble())
+
+        headers = frame_factory.build_headers_frame(self.example_request_headers)
+        block = headers.data
+        headers.data = block[:1]
+        headers.flags = set()
+        continuations = [
+            frame_factory.build_continuation_frame(block[i:i+1])
+            for i in range(1, len(block) - 1)
+        ]
+        continuations.append(
+            frame_factory.build_continuation_frame(block[-1:], flags=["END_HEADERS"]),
+        )
+        data = headers.serialize() + b"".join(f.serialize() for f in continuations)
+
+        events = c.receive_data(data + self._data(frame_factory), max_frames=1)
+        assert [type(e) for e in events] == [h2.events.RequestReceived]
+        assert len(c.process_pending()) == 10
+
+    @pytest.mark.parametrize("kwargs", [{"max_frames": 0}, {"max_bytes": -1}])
+    def test_budgets_must_be_positive(self, frame_factory, kwargs) -> None:
+        """
+        Budgets of less than one are rejected before any data is buffered.
+        """
+        c = self._connection(frame_factory)
+        data = self._data(frame_factory)
+
+        with pytest.raises(ValueError):
+            c.receive_data(data, **kwargs)
+        with pytest.raises(ValueError):
+            c.process_pending(**kwargs)
+        with pytest.raises(ValueError):
+            c.receive_into(0, **kwargs)
+
+        assert not c.has_pending_frames
@@ -0,0 +1,212 @@
+"""
+Test the RFC 9218 Extensible Prioritization Scheme support.
+"""
+from __future__ import annotations
+
+import hyperframe.frame
+import pytest
+
+import h2.config
+import h2.connection
+import h2.events
+import h2.exceptions
+import h2.priority
+
+
+class TestPriorityFieldValues:
+    """
+    Tests of parsing and serializing priority field values.
+    """
+
+    @pytest.mark.parametrize(("value", "priority"), [
+        (b"", (3, False)),
+        (b"u=0", (0, False)),
+        (b"u=7, i", (7, True)),
+        ("u=5,i", (5, True)),
+        (b"i=?1", (3, True)),
+        (b"i=?0", (3, False)),
+        (b"u=2;foo=bar, i;x", (2, True)),
+        (b"u=1, x-custom=\"abc\"", (1, False)),
+        (b"u=1, u=6", (6, False)),
+        (b"u=8", (3, False)),
+        (b"u=-1", (3, False)),
+        (b"u=1.5", (3, False)),
+        (b"u=\"1\"", (3, False)),
+        (b"i=1", (3, False)),
+        (b"U=1", (3, False)),
+        (b"u=1, 1i", (3, False)),
+        ("u=1, \xe9", (3, False)),
+    ])
+    def test_parse(self, value, priority) -> None:
+        """
+        Urgency and incremental are parsed from the field value, with defaults
+        for anything missing or invalid.
+        """
+        assert h2.priority.parse_priority_field(value) == priority
+
+    @pytest.mark.parametrize(("priority", "value"), [
+        ((3, False), b""),
+        ((0, False), b"u=0"),
+        ((3, True), b"i"),
+        ((7, True), b"u=7, i"),
+    ])
+    def test_serialize(self, priority, value) -> None:
+        """
+        Default values are left out of serialized field values, which parse
+        back to the same priority.
+        """
+        assert h2.priority.priority_field_value(*priority) == value
+        assert h2.priority.parse_priority_field(value) == priority
+
+    @pytest.mark.parametrize("urgency", [-1, 8])
+    def test_serialize_invalid_urgency(self, urgency) -> None:
+        """
+        Urgencies outside 0 to 7 cannot be serialized.
+        """
+        with pytest.raises(ValueError, match="urgency"):
+            h2.priority.priority_field_value(urgency)
+
+
+class TestRFC9218:
+    """
+    Tests that the client can send PRIORITY_UPDATE frames and that the server
+    applies them, and ``priority`` header fields, to its streams.
+    """
+
+    example_request_headers = [
+        (b":authority", b"example.com"),
+        (b":path", b"/"),
+        (b":scheme", b"https"),
+        (b":method", b"GET"),
+    ]
+
+    def _connections(self) -> tuple[h2.connection.H2Connection, h2.connection.H2Connection]:
+        client = h2.connection.H2Connection()
+        client.initiate_connection()
+        server = h2.connection.H2Connection(
+            config=h2.config.H2Configuration(client_side=False),
+        )
+        server.initiate_connection()
+        server.receive_data(client.data_to_send())
+        return client, server
+
+    def _priority_update_frame(self, body, stream_id=0) -> bytes:
+        frame = hyperframe.frame.ExtensionFrame(
+            h2.priority.PRIORITY_UPDATE_FRAME_TYPE, stream_id, body=body,
+        )
+        frame.body_len = len(body)
+        return frame.serialize()
+
+    def test_priority_update(self) -> None:
+        """
+        A PRIORITY_UPDATE frame for an open stream changes its priority.
+        """
+        client, server = self._connections()
+        client.send_headers(1, self.example_request_headers)
+        server.receive_data(client.data_to_send())
+        assert server.streams[1].urgency == 3
+        assert not server.streams[1].incremental
+
+        client.send_priority_update(1, urgency=1, incremental=True)
+        events = server.receive_data(client.data_to_send())
+
+        assert len(events) == 1
+        event = events[0]
+        assert isinstance(event, h2.events.PriorityUpdateReceived)
+        assert event.stream_id == 1
+        assert event.urgency == 1
+        assert event.incremental
+        assert event.field_value == b"u=1, i"
+        assert server.streams[1].urgency == 1
+        assert server.streams[1].incremental
+
+    def test_priority_update_before_request(self) -> None:
+        """
+        A PRIORITY_UPDATE frame for a stream that has not been opened yet is
+        applied when its request arrives, instead of its priority header.
+        """
+        client, server = self._connections()
+        client.send_priority_update(1, urgency=0)
+        client.send_priority_update(3, urgency=6)
+        server.receive_data(client.data_to_send())
+
+        client.send_headers(1, [*self.example_request_headers, (b"priority", b"u=5")])
+        client.send_headers(3, self.example_request_headers)
+        server.receive_data(client.data_to_send())
+
+        assert server.streams[1].urgency == 0
+        assert server.streams[3].urgency == 6
+
+        # The pending priority is only used once.
+        assert not server._pending_priority_updates
+
+    def test_priority_update_for_closed_stream_is_ignored(self) -> None:
+        """
+        A PRIORITY_UPDATE frame for a stream that has already been closed is
+        reported, but not kept for later.
+        """
+        client, server = self._connections()
+        client.send_headers(3, self.example_request_headers, end_stream=True)
+        server.receive_data(client.data_to_send())
+        server.send_headers(3, [(b":status", b"200")], end_stream=True)
+
+        client.send_priority_update(1, urgency=0)
+        events = server.receive_data(client.data_to_send())
+
+        assert isinstance(events[0], h2.events.PriorityUpdateReceived)
+        assert not server._pending_priority_updates
+
+    @pytest.mark.parametrize("headers", [
+        [(b"priority", b"u=1"), (b"priority", b"i")],
+        [("priority", "u=1"), ("priority", "i")],
+    ])
+    def test_priority_header(self, headers) -> None:
+        """
+        The priority of a request is taken from its priority header fields,
+        which may be split over several fields.
+        """
+        client, server = self._connections()
+        client.send_headers(1, [*self.example_request_headers, *headers])
+        server.receive_data(client.data_to_send())
+
+        assert server.streams[1].urgency == 1
+        assert server.streams[1].incremental
+
+    def test_server_cannot_send_priority_update(self) -> None:
+        """
+        Servers cannot send PRIORITY_UPDATE frames.
+        """
+        _, server = self._connections()
+        with pytest.raises(h2.exceptions.ProtocolError):
+            server.send_priority_update(1)
+
+    def test_cannot_prioritize_stream_zero(self) -> None:
+        """
+        Stream 0 cannot be prioritized.
+        """
+        client, _ = self._connections()
+        with pytest.raises(ValueError, match="stream ID 0"):
+            client.send_priority_update(0)
+
+    def test_client_cannot_receive_priority_update(self) -> None:
+        """
+        Receiving a PRIORITY_UPDATE frame on a client is a protocol error.
+        """
+        client, server = self._connections()
+        client.receive_data(server.data_to_send())
+        with pytest.raises(h2.exceptions.ProtocolError):
+            client.receive_data(self._priority_update_frame(b"\x00\x00\x00\x01u=1"))
+
+    @pytest.mark.parametrize(("body", "stream_id", "error"), [
+        (b"\x00\x00\x00\x01u=1", 1, h2.exceptions.ProtocolError),
+        (b"\x00\x00\x00\x00u=1", 0, h2.exceptions.ProtocolError),
+        (b"\x00\x00\x01", 0, h2.exceptions.FrameDataMissingError),
+    ])
+    def test_invalid_priority_update(self, body, stream_id, error) -> None:
+        """
+        PRIORITY_UPDATE frames on a stream, for stream 0 or too short to hold a
+        stream ID are protocol errors.
+        """
+        _, server = self._connections()
+        with pytest.raises(error):
+            server.receive_data(self._priority_update_frame(body, stream_id))
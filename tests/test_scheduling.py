@@ -0,0 +1,745 @@
+"""
+test_scheduling
+~~~~~~~~~~~~~~~
+
+Tests for the schedulers that decide the order in which buffered data is sent.
+"""
+from __future__ import annotations
+
+import pytest
+from hypothesis import given
+from hypothesis.strategies import booleans, integers, lists, tuples
+
+import h2.config
+import h2.connection
+import h2.scheduling
+import h2.settings
+
+from . import helpers
+
+
+class LowestStreamFirstScheduler(h2.scheduling.Scheduler):
+    """
+    Sends the data of the stream with the lowest ID first.
+    """
+
+    def __init__(self) -> None:
+        self.streams = {}
+
+    def add_stream(self, stream) -> None:
+        self.streams[stream.stream_id] = stream
+
+    def next_frames(self, budget_bytes) -> list:
+        frames = []
+        for stream_id in sorted(self.streams):
+            stream = self.streams[stream_id]
+            length = stream.buffered_data_length
+            frames.extend(stream.send_buffered_data(
+                min(budget_bytes, stream.outbound_flow_control_window),
+            ))
+            budget_bytes -= length - stream.buffered_data_length
+            if not stream.has_buffered_data:
+                del self.streams[stream_id]
+        return frames
+
+
+class TestScheduling:
+    """
+    Tests of the order in which buffered data is sent on several streams.
+    """
+
+    server_config = h2.config.H2Configuration(client_side=False)
+
+    def test_streams_take_turns(self, frame_factory) -> None:
+        """
+        By default, streams take turns of one frame's worth of data each, so
+        a short response is not held up behind long ones.
+        """
+        c = h2.connection.H2Connection(config=self.server_config)
+        c.receive_data(
+            frame_factory.preamble() +
+            frame_factory.build_settings_frame(
+                {h2.settings.SettingCodes.INITIAL_WINDOW_SIZE: 2**20},
+            ).serialize(),
+        )
+        for stream_id in (1, 3, 5):
+            f = frame_factory.build_headers_frame(
+                helpers.EXAMPLE_REQUEST_HEADERS, flags=["END_STREAM"], stream_id=stream_id,
+            )
+            c.receive_data(f.serialize())
+            c.send_headers(stream_id, [(b":status", b"200")])
+        # Fill the connection window, so that data is sent as it opens.
+        c.send_data_buffered(1, b"\x00" * 65535)
+        c.clear_outbound_data_buffer()
+        c.send_data_buffered(1, b"x" * 50000, end_stream=True)
+        c.send_data_buffered(3, b"y" * 50000, end_stream=True)
+        c.send_data_buffered(5, b"z" * 1000, end_stream=True)
+
+        c.receive_data(frame_factory.build_window_update_frame(0, 40000).serialize())
+        frames = helpers.decode_frames(c.data_to_send())
+        assert [(f.stream_id, len(f.data), "END_STREAM" in f.flags) for f in frames] == [
+            (1, 16384, False), (3, 16384, False), (5, 1000, True), (1, 6232, False),
+        ]
+        c.receive_data(frame_factory.build_window_update_frame(0, 100000).serialize())
+        frames = helpers.decode_frames(c.data_to_send())
+        assert [(f.stream_id, len(f.data), "END_STREAM" in f.flags) for f in frames] == [
+            (1, 10152, False), (3, 16384, False), (1, 16384, False),
+            (3, 16384, False), (1, 848, True), (3, 848, True),
+        ]
+
+    def test_quantum(self, frame_factory) -> None:
+        """
+        The amount of data sent per turn can be changed.
+        """
+        c = h2.connection.H2Connection(config=self.server_config)
+        c.receive_data(
+            frame_factory.preamble() +
+            frame_factory.build_settings_frame(
+                {h2.settings.SettingCodes.INITIAL_WINDOW_SIZE: 2**20},
+            ).serialize(),
+        )
+        for stream_id in (1, 3):
+            f = frame_factory.build_headers_frame(
+                helpers.EXAMPLE_REQUEST_HEADERS, flags=["END_STREAM"], stream_id=stream_id,
+            )
+            c.receive_data(f.serialize())
+            c.send_headers(stream_id, [(b":status", b"200")])
+        # Fill the connection window, so that data is sent as it opens.
+        c.send_data_buffered(1, b"\x00" * 65535)
+        c.clear_outbound_data_buffer()
+        c.set_scheduler(h2.scheduling.DeficitRoundRobinScheduler(quantum=1000))
+        c.send_data_buffered(1, b"x" * 2500, end_stream=True)
+        c.send_data_buffered(3, b"y" * 2500, end_stream=True)
+
+        c.receive_data(frame_factory.build_window_update_frame(0, 5000).serialize())
+        frames = helpers.decode_frames(c.data_to_send())
+        assert [(f.stream_id, len(f.data), "END_STREAM" in f.flags) for f in frames] == [
+            (1, 1000, False), (3, 1000, False), (1, 1000, False),
+            (3, 1000, False), (1, 500, True), (3, 500, True),
+        ]
+
+    def test_stream_blocked_by_its_window_is_skipped(self, frame_factory) -> None:
+        """
+        A stream that cannot send because of its own flow control window does
+        not hold up the others, and finishes its turn once its window opens.
+        """
+        c = h2.connection.H2Connection(config=self.server_config)
+        c.receive_data(
+            frame_factory.preamble() +
+            frame_factory.build_settings_frame(
+                {h2.settings.SettingCodes.INITIAL_WINDOW_SIZE: 2**20},
+            ).serialize(),
+        )
+        for stream_id in (1, 3):
+            f = frame_factory.build_headers_frame(
+                helpers.EXAMPLE_REQUEST_HEADERS, flags=["END_STREAM"], stream_id=stream_id,
+            )
+            c.receive_data(f.serialize())
+            c.send_headers(stream_id, [(b":status", b"200")])
+        # Fill the connection window, so that data is sent as it opens.
+        c.send_data_buffered(1, b"\x00" * 65535)
+        c.clear_outbound_data_buffer()
+        c.set_scheduler(h2.scheduling.DeficitRoundRobinScheduler(quantum=1000))
+        c.send_data_buffered(1, b"x" * 2000)
+        c.send_data_buffered(3, b"y" * 4000)
+        c.streams[1].outbound_flow_control_window = 300
+
+        c.receive_data(frame_factory.build_window_update_frame(0, 2300).serialize())
+        frames = helpers.decode_frames(c.data_to_send())
+        assert [(f.stream_id, len(f.data), "END_STREAM" in f.flags) for f in frames] == [
+            (1, 300, False), (3, 1000, False), (3, 1000, False),
+        ]
+
+        c.receive_data(frame_factory.build_window_update_frame(1, 5000).serialize())
+        assert c.data_to_send() == b""
+        assert c.buffered_data_length(1) == 1700
+        c.receive_data(frame_factory.build_window_update_frame(0, 2000).serialize())
+        frames = helpers.decode_frames(c.data_to_send())
+        assert [(f.stream_id, len(f.data), "END_STREAM" in f.flags) for f in frames] == [
+            (1, 700, False), (3, 1000, False), (1, 300, False),
+        ]
+
+    def test_turn_cut_short_by_budget_continues(self, frame_factory) -> None:
+        """
+        A stream whose turn is cut short because the connection window runs
+        out continues it when the window opens again.
+        """
+        c = h2.connection.H2Connection(config=self.server_config)
+        c.receive_data(
+            frame_factory.preamble() +
+            frame_factory.build_settings_frame(
+                {h2.settings.SettingCodes.INITIAL_WINDOW_SIZE: 2**20},
+            ).serialize(),
+        )
+        for stream_id in (1, 3):
+            f = frame_factory.build_headers_frame(
+                helpers.EXAMPLE_REQUEST_HEADERS, flags=["END_STREAM"], stream_id=stream_id,
+            )
+            c.receive_data(f.serialize())
+            c.send_headers(stream_id, [(b":status", b"200")])
+        # Fill the connection window, so that data is sent as it opens.
+        c.send_data_buffered(1, b"\x00" * 65535)
+        c.clear_outbound_data_buffer()
+        c.set_scheduler(h2.scheduling.DeficitRoundRobinScheduler(quantum=1000))
+        c.send_data_buffered(1, b"x" * 2000)
+        c.send_data_buffered(3, b"y" * 2000)
+
+        c.receive_data(frame_factory.build_window_update_frame(0, 1400).serialize())
+        frames = helpers.decode_frames(c.data_to_send())
+        assert [(f.stream_id, len(f.data), "END_STREAM" in f.flags) for f in frames] == [
+            (1, 1000, False), (3, 400, False),
+        ]
+        c.receive_data(frame_factory.build_window_update_frame(0, 1400).serialize())
+        frames = helpers.decode_frames(c.data_to_send())
+        assert [(f.stream_id, len(f.data), "END_STREAM" in f.flags) for f in frames] == [
+            (3, 600, False), (1, 800, False),
+        ]
+
+    def test_remove_stream(self, frame_factory) -> None:
+        """
+        Streams can be removed from a DeficitRoundRobinScheduler without
+        sending the rest of their data.
+        """
+        c = h2.connection.H2Connection(config=self.server_config)
+        c.receive_data(
+            frame_factory.preamble() +
+            frame_factory.build_settings_frame(
+                {h2.settings.SettingCodes.INITIAL_WINDOW_SIZE: 2**20},
+            ).serialize(),
+        )
+        for stream_id in (1, 3):
+            f = frame_factory.build_headers_frame(
+                helpers.EXAMPLE_REQUEST_HEADERS, flags=["END_STREAM"], stream_id=stream_id,
+            )
+            c.receive_data(f.serialize())
+            c.send_headers(stream_id, [(b":status", b"200")])
+        # Fill the connection window, so that data is sent as it opens.
+        c.send_data_buffered(1, b"\x00" * 65535)
+        c.clear_outbound_data_buffer()
+        scheduler = h2.scheduling.DeficitRoundRobinScheduler()
+        c.set_scheduler(scheduler)
+        c.send_data_buffered(1, b"x" * 1000)
+        c.send_data_buffered(3, b"y" * 1000)
+
+        scheduler.remove_stream(c.streams[1])
+        scheduler.remove_stream(c.streams[1])
+        assert c.streams[1] not in scheduler
+        assert c.streams[3] in scheduler
+        c.receive_data(frame_factory.build_window_update_frame(0, 5000).serialize())
+        frames = helpers.decode_frames(c.data_to_send())
+        assert [(f.stream_id, len(f.data), "END_STREAM" in f.flags) for f in frames] == [(3, 1000, False)]
+
+    def test_invalid_quantum(self) -> None:
+        """
+        The quantum must be positive.
+        """
+        with pytest.raises(ValueError, match="quantum"):
+            h2.scheduling.DeficitRoundRobinScheduler(quantum=0)
+
+    def test_custom_scheduler(self, frame_factory) -> None:
+        """
+        A custom scheduler can be installed, and takes over the streams that
+        already have data buffered.
+        """
+        c = h2.connection.H2Connection(config=self.server_config)
+        c.receive_data(
+            frame_factory.preamble() +
+            frame_factory.build_settings_frame(
+                {h2.settings.SettingCodes.INITIAL_WINDOW_SIZE: 2**20},
+            ).serialize(),
+        )
+        for stream_id in (1, 3, 5):
+            f = frame_factory.build_headers_frame(
+                helpers.EXAMPLE_REQUEST_HEADERS, flags=["END_STREAM"], stream_id=stream_id,
+            )
+            c.receive_data(f.serialize())
+            c.send_headers(stream_id, [(b":status", b"200")])
+        # Fill the connection window, so that data is sent as it opens.
+        c.send_data_buffered(1, b"\x00" * 65535)
+        c.clear_outbound_data_buffer()
+        c.send_data_buffered(5, b"z" * 1000)
+        c.send_data_buffered(3, b"y" * 1000)
+        c.set_scheduler(LowestStreamFirstScheduler())
+        c.send_data_buffered(1, b"x" * 1000)
+
+        c.receive_data(frame_factory.build_window_update_frame(0, 2500).serialize())
+        frames = helpers.decode_frames(c.data_to_send())
+        assert [(f.stream_id, len(f.data), "END_STREAM" in f.flags) for f in frames] == [
+            (1, 1000, False), (3, 1000, False), (5, 500, False),
+        ]
+
+    def test_base_scheduler_is_abstract(self) -> None:
+        """
+        The base Scheduler does not implement any scheduling, and neither can
+        a subclass that misses one of the methods it must implement.
+        """
+        class PartialScheduler(h2.scheduling.Scheduler):
+            def add_stream(self, stream) -> None:
+                pass
+
+        with pytest.raises(TypeError):
+            h2.scheduling.Scheduler()
+        with pytest.raises(TypeError):
+            PartialScheduler()
+
+
+class TestUrgencyScheduler:
+    """
+    Tests of sending buffered data in the order of the RFC 9218 priorities of
+    the streams.
+    """
+
+    server_config = h2.config.H2Configuration(client_side=False)
+
+    def test_urgent_streams_first(self, frame_factory) -> None:
+        """
+        More urgent streams send first. Within an urgency, streams that are not
+        incremental send one at a time before incremental streams take turns.
+        """
+        c = h2.connection.H2Connection(config=self.server_config)
+        c.receive_data(
+            frame_factory.preamble() +
+            frame_factory.build_settings_frame(
+                {h2.settings.SettingCodes.INITIAL_WINDOW_SIZE: 2**20},
+            ).serialize(),
+        )
+        for stream_id in (1, 3, 5, 7):
+            f = frame_factory.build_headers_frame(
+                helpers.EXAMPLE_REQUEST_HEADERS, flags=["END_STREAM"], stream_id=stream_id,
+            )
+            c.receive_data(f.serialize())
+            c.send_headers(stream_id, [(b":status", b"200")])
+        # Fill the connection window, so that data is sent as it opens.
+        c.send_data_buffered(1, b"\x00" * 65535)
+        c.clear_outbound_data_buffer()
+        c.set_scheduler(h2.scheduling.UrgencyScheduler(quantum=1000))
+        c.receive_data(frame_factory.build_priority_update_frame(3, b"u=1").serialize())
+        c.receive_data(frame_factory.build_priority_update_frame(5, b"u=1, i").serialize())
+        c.receive_data(frame_factory.build_priority_update_frame(7, b"u=1, i").serialize())
+        for stream_id in (1, 7, 5, 3):
+            c.send_data_buffered(stream_id, b"x" * 3000, end_stream=True)
+
+        c.receive_data(frame_factory.build_window_update_frame(0, 20000).serialize())
+        frames = helpers.decode_frames(c.data_to_send())
+        assert [(f.stream_id, len(f.data), "END_STREAM" in f.flags) for f in frames] == [
+            (3, 3000, True), (7, 1000, False), (5, 1000, False),
+            (7, 1000, False), (5, 1000, False), (7, 1000, True),
+            (5, 1000, True), (1, 3000, True),
+        ]
+
+    def test_sequential_streams_in_stream_id_order(self, frame_factory) -> None:
+        """
+        Streams of the same urgency that are not incremental are sent in
+        stream ID order, and one blocked by its own flow control window does
+        not hold up the others.
+        """
+        c = h2.connection.H2Connection(config=self.server_config)
+        c.receive_data(
+            frame_factory.preamble() +
+            frame_factory.build_settings_frame(
+                {h2.settings.SettingCodes.INITIAL_WINDOW_SIZE: 2**20},
+            ).serialize(),
+        )
+        for stream_id in (1, 3, 5, 7):
+            f = frame_factory.build_headers_frame(
+                helpers.EXAMPLE_REQUEST_HEADERS, flags=["END_STREAM"], stream_id=stream_id,
+            )
+            c.receive_data(f.serialize())
+            c.send_headers(stream_id, [(b":status", b"200")])
+        # Fill the connection window, so that data is sent as it opens.
+        c.send_data_buffered(1, b"\x00" * 65535)
+        c.clear_outbound_data_buffer()
+        c.set_scheduler(h2.scheduling.UrgencyScheduler(quantum=1000))
+        c.send_data_buffered(7, b"w" * 1000)
+        c.send_data_buffered(5, b"z" * 1000)
+        c.send_data_buffered(3, b"y" * 1000)
+        c.send_data_buffered(3, b"y" * 1000)
+        c.streams[3].outbound_flow_control_window = 500
+
+        c.receive_data(frame_factory.build_window_update_frame(0, 2000).serialize())
+        frames = helpers.decode_frames(c.data_to_send())
+        assert [(f.stream_id, len(f.data), "END_STREAM" in f.flags) for f in frames] == [
+            (3, 500, False), (5, 1000, False), (7, 500, False),
+        ]
+
+    def test_priority_change_moves_buffered_stream(self, frame_factory) -> None:
+        """
+        A change of priority applies to data that is already buffered.
+        """
+        c = h2.connection.H2Connection(config=self.server_config)
+        c.receive_data(
+            frame_factory.preamble() +
+            frame_factory.build_settings_frame(
+                {h2.settings.SettingCodes.INITIAL_WINDOW_SIZE: 2**20},
+            ).serialize(),
+        )
+        for stream_id in (1, 3, 5):
+            f = frame_factory.build_headers_frame(
+                helpers.EXAMPLE_REQUEST_HEADERS, flags=["END_STREAM"], stream_id=stream_id,
+            )
+            c.receive_data(f.serialize())
+            c.send_headers(stream_id, [(b":status", b"200")])
+        # Fill the connection window, so that data is sent as it opens.
+        c.send_data_buffered(1, b"\x00" * 65535)
+        c.clear_outbound_data_buffer()
+        c.set_scheduler(h2.scheduling.UrgencyScheduler(quantum=1000))
+        c.receive_data(frame_factory.build_priority_update_frame(1, b"u=5").serialize())
+        c.receive_data(frame_factory.build_priority_update_frame(5, b"u=4, i").serialize())
+        c.send_data_buffered(1, b"x" * 1000)
+        c.send_data_buffered(3, b"y" * 1000)
+        c.send_data_buffered(5, b"z" * 1000)
+        c.send_data_buffered(5, b"z" * 1000)
+
+        c.receive_data(frame_factory.build_priority_update_frame(1, b"u=0, i").serialize())
+        c.receive_data(frame_factory.build_priority_update_frame(5, b"u=2").serialize())
+        c.receive_data(frame_factory.build_priority_update_frame(3, b"u=6").serialize())
+
+        c.receive_data(frame_factory.build_window_update_frame(0, 5000).serialize())
+        frames = helpers.decode_frames(c.data_to_send())
+        assert [(f.stream_id, len(f.data), "END_STREAM" in f.flags) for f in frames] == [
+            (1, 1000, False), (5, 1000, False), (5, 1000, False), (3, 1000, False),
+        ]
+
+    def test_closed_streams_are_dropped(self, frame_factory) -> None:
+        """
+        Streams reset while they have buffered data are forgotten.
+        """
+        c = h2.connection.H2Connection(config=self.server_config)
+        c.receive_data(
+            frame_factory.preamble() +
+            frame_factory.build_settings_frame(
+                {h2.settings.SettingCodes.INITIAL_WINDOW_SIZE: 2**20},
+            ).serialize(),
+        )
+        for stream_id in (1, 3, 5):
+            f = frame_factory.build_headers_frame(
+                helpers.EXAMPLE_REQUEST_HEADERS, flags=["END_STREAM"], stream_id=stream_id,
+            )
+            c.receive_data(f.serialize())
+            c.send_headers(stream_id, [(b":status", b"200")])
+        # Fill the connection window, so that data is sent as it opens.
+        c.send_data_buffered(1, b"\x00" * 65535)
+        c.clear_outbound_data_buffer()
+        c.set_scheduler(h2.scheduling.UrgencyScheduler(quantum=1000))
+        c.receive_data(frame_factory.build_priority_update_frame(5, b"u=3, i").serialize())
+        c.send_data_buffered(1, b"x" * 1000)
+        c.send_data_buffered(3, b"y" * 1000)
+        c.send_data_buffered(5, b"z" * 1000)
+        c.receive_data(
+            frame_factory.build_rst_stream_frame(1).serialize() +
+            frame_factory.build_rst_stream_frame(5).serialize(),
+        )
+
+        c.receive_data(frame_factory.build_window_update_frame(0, 5000).serialize())
+        frames = helpers.decode_frames(c.data_to_send())
+        assert [(f.stream_id, len(f.data), "END_STREAM" in f.flags) for f in frames] == [(3, 1000, False)]
+        assert c.streams[1].buffered_data_length == 0
+        assert c.streams[5].buffered_data_length == 0
+
+
+class TestPriorityTree:
+    """
+    Tests of the RFC 7540 priority tree.
+    """
+
+    def _turns(self, tree, count) -> list[int]:
+        return [tree.next_stream() for _ in range(count)]
+
+    def test_empty_tree(self) -> None:
+        """
+        A tree with no unblocked streams has no stream to send.
+        """
+        tree = h2.scheduling.PriorityTree()
+        assert tree.next_stream() is None
+        tree.prioritize(1)
+        assert tree.next_stream() is None
+        assert len(tree) == 1
+
+    def test_turns_follow_weights(self) -> None:
+        """
+        Streams that depend on the same stream get turns in proportion to their
+        weights.
+        """
+        tree = h2.scheduling.PriorityTree()
+        tree.prioritize(1, weight=64)
+        tree.prioritize(3, weight=192)
+        tree.unblock(1)
+        tree.unblock(3)
+
+        turns = self._turns(tree, 400)
+        assert turns.count(1) == 100
+        assert turns.count(3) == 300
+
+    def test_dependencies_wait_for_parents(self) -> None:
+        """
+        A stream only gets turns while the stream it depends on is blocked.
+        """
+        tree = h2.scheduling.PriorityTree()
+        tree.prioritize(1)
+        tree.prioritize(3, depends_on=1)
+        tree.prioritize(5, depends_on=1)
+        for stream_id in (1, 3, 5):
+            tree.unblock(stream_id)
+
+        assert self._turns(tree, 3) == [1, 1, 1]
+        tree.block(1)
+        assert self._turns(tree, 4) == [3, 5, 3, 5]
+        tree.unblock(1)
+        assert tree.next_stream() == 1
+
+    def test_exclusive_dependency(self) -> None:
+        """
+        An exclusive dependency takes on the other dependencies of its parent.
+        """
+        tree = h2.scheduling.PriorityTree()
+        tree.prioritize(1)
+        tree.prioritize(3, depends_on=1)
+        tree.prioritize(5, depends_on=1)
+        tree.prioritize(7, weight=32, depends_on=1, exclusive=True)
+        tree.unblock(3)
+        tree.unblock(7)
+
+        assert tree.priority(7) == (32, 1)
+        assert tree.priority(3) == (16, 7)
+        assert tree.priority(5) == (16, 7)
+        assert self._turns(tree, 2) == [7, 7]
+        tree.block(7)
+        assert tree.next_stream() == 3
+
+    def test_depending_on_a_dependency(self) -> None:
+        """
+        A stream made to depend on one of its own dependencies swaps places
+        with it, as in RFC 7540 Section 5.3.3.
+        """
+        tree = h2.scheduling.PriorityTree()
+        tree.prioritize(1)
+        tree.prioritize(3, depends_on=1)
+        tree.prioritize(5, depends_on=3)
+        tree.prioritize(1, depends_on=5, exclusive=True)
+
+        assert tree.priority(5) == (16, 0)
+        assert tree.priority(1) == (16, 5)
+        assert tree.priority(3) == (16, 1)
+
+    def test_unknown_parent_is_added(self) -> None:
+        """
+        A stream that depends on a stream not in the tree adds that stream with
+        the default priority, unless the tree is full, when the stream gets the
+        default priority itself.
+        """
+        tree = h2.scheduling.PriorityTree(max_streams=2)
+        tree.prioritize(3, weight=200, depends_on=1, exclusive=True)
+        assert tree.priority(3) == (200, 1)
+        assert tree.priority(1) == (16, 0)
+
+        tree.prioritize(3, weight=200, depends_on=5, exclusive=True)
+        assert tree.priority(3) == (16, 0)
+        assert 5 not in tree
+
+    def test_remove_stream_shares_weight(self) -> None:
+        """
+        The dependencies of a removed stream come to depend on its parent,
+        sharing its weight.
+        """
+        tree = h2.scheduling.PriorityTree()
+        tree.prioritize(1, weight=100)
+        tree.prioritize(3, weight=30, depends_on=1)
+        tree.prioritize(5, weight=10, depends_on=1)
+        tree.unblock(1)
+        tree.unblock(5)
+
+        tree.remove_stream(1)
+        tree.remove_stream(1)
+        assert 1 not in tree
+        assert tree.priority(3) == (75, 0)
+        assert tree.priority(5) == (25, 0)
+        assert tree.next_stream() == 5
+
+    def test_max_streams(self) -> None:
+        """
+        Priority information for streams beyond the limit is ignored, but
+        streams with data to send are always added.
+        """
+        tree = h2.scheduling.PriorityTree(max_streams=2)
+        tree.prioritize(1)
+        tree.prioritize(3)
+        tree.prioritize(5)
+        assert 5 not in tree
+
+        tree.prioritize(3, weight=8)
+        tree.unblock(7)
+        assert tree.priority(3) == (8, 0)
+        assert tree.next_stream() == 7
+
+    @pytest.mark.parametrize(("stream_id", "weight", "depends_on"), [
+        (1, 0, 0), (1, 257, 0), (1, 16, 1),
+    ])
+    def test_invalid_priorities(self, stream_id, weight, depends_on) -> None:
+        """
+        Weights must be between 1 and 256, and streams may not depend on
+        themselves.
+        """
+        tree = h2.scheduling.PriorityTree()
+        with pytest.raises(ValueError, match=r"(Weight|depend)"):
+            tree.prioritize(stream_id, weight, depends_on)
+
+    @given(lists(tuples(
+        integers(0, 3), integers(1, 8), integers(0, 8), integers(1, 256), booleans(),
+    )))
+    def test_next_stream_respects_dependencies(self, operations) -> None:
+        """
+        Whatever the changes made, the stream that gets the next turn is
+        unblocked and depends on no unblocked stream.
+        """
+        tree = h2.scheduling.PriorityTree()
+        unblocked = set()
+        for operation, stream_id, depends_on, weight, exclusive in operations:
+            if operation == 0 and stream_id != depends_on:
+                tree.prioritize(stream_id, weight, depends_on, exclusive)
+            elif operation == 1:
+                tree.remove_stream(stream_id)
+                unblocked.discard(stream_id)
+            elif operation == 2:
+                tree.unblock(stream_id)
+                unblocked.add(stream_id)
+            else:
+                tree.block(stream_id)
+                unblocked.discard(stream_id)
+
+            next_stream_id = tree.next_stream()
+            if not unblocked:
+                assert next_stream_id is None
+                continue
+            assert next_stream_id in unblocked
+            while next_stream_id:
+                next_stream_id = tree.priority(next_stream_id)[1]
+                assert next_stream_id not in unblocked
+
+
+class TestDependencyTreeScheduler:
+    """
+    Tests of sending buffered data in the order of the RFC 7540 priorities of
+    the streams.
+    """
+
+    server_config = h2.config.H2Configuration(client_side=False)
+
+    def test_priority_frames_order_data(self, frame_factory) -> None:
+        """
+        Streams only send once the streams they depend on have sent all their
+        data, and share the window by weight.
+        """
+        c = h2.connection.H2Connection(config=self.server_config)
+        c.receive_data(
+            frame_factory.preamble() +
+            frame_factory.build_settings_frame(
+                {h2.settings.SettingCodes.INITIAL_WINDOW_SIZE: 2**20},
+            ).serialize(),
+        )
+        for stream_id in (1, 3, 5, 7):
+            f = frame_factory.build_headers_frame(
+                helpers.EXAMPLE_REQUEST_HEADERS, flags=["END_STREAM"], stream_id=stream_id,
+            )
+            c.receive_data(f.serialize())
+            c.send_headers(stream_id, [(b":status", b"200")])
+        # Fill the connection window, so that data is sent as it opens.
+        c.send_data_buffered(1, b"\x00" * 65535)
+        c.clear_outbound_data_buffer()
+        c.set_scheduler(h2.scheduling.DependencyTreeScheduler(quantum=1000))
+        c.receive_data(
+            frame_factory.build_priority_frame(3, 63, depends_on=7).serialize() +
+            frame_factory.build_priority_frame(5, 191, depends_on=7).serialize() +
+            frame_factory.build_priority_frame(7, 15, depends_on=1).serialize(),
+        )
+        for stream_id in (1, 3, 5, 7):
+            c.send_data_buffered(stream_id, b"x" * 4000, end_stream=True)
+
+        c.receive_data(frame_factory.build_window_update_frame(0, 16000).serialize())
+        frames = [
+            (f.stream_id, len(f.data), "END_STREAM" in f.flags)
+            for f in helpers.decode_frames(c.data_to_send())
+        ]
+        assert frames[:8] == [
+            (1, 1000, False), (1, 1000, False), (1, 1000, False), (1, 1000, True),
+            (7, 1000, False), (7, 1000, False), (7, 1000, False), (7, 1000, True),
+        ]
+        assert [stream_id for stream_id, _, _ in frames[8:12]].count(5) == 3
+
+    def test_stream_blocked_by_own_window(self, frame_factory) -> None:
+        """
+        A stream blocked by its own flow control window lets the streams that
+        depend on it send.
+        """
+        c = h2.connection.H2Connection(config=self.server_config)
+        c.receive_data(
+            frame_factory.preamble() +
+            frame_factory.build_settings_frame(
+                {h2.settings.SettingCodes.INITIAL_WINDOW_SIZE: 2**20},
+            ).serialize(),
+        )
+        for stream_id in (1, 3):
+            f = frame_factory.build_headers_frame(
+                helpers.EXAMPLE_REQUEST_HEADERS, flags=["END_STREAM"], stream_id=stream_id,
+            )
+            c.receive_data(f.serialize())
+            c.send_headers(stream_id, [(b":status", b"200")])
+        # Fill the connection window, so that data is sent as it opens.
+        c.send_data_buffered(1, b"\x00" * 65535)
+        c.clear_outbound_data_buffer()
+        c.set_scheduler(h2.scheduling.DependencyTreeScheduler(quantum=1000))
+        c.receive_data(
+            frame_factory.build_priority_frame(3, 15, depends_on=1).serialize(),
+        )
+        c.send_data_buffered(1, b"x" * 2000)
+        c.send_data_buffered(3, b"y" * 2000)
+        c.streams[1].outbound_flow_control_window = 500
+
+        c.receive_data(frame_factory.build_window_update_frame(0, 3000).serialize())
+        frames = helpers.decode_frames(c.data_to_send())
+        assert [(f.stream_id, len(f.data), "END_STREAM" in f.flags) for f in frames] == [
+            (1, 500, False), (3, 1000, False), (3, 1000, False),
+        ]
+        c.receive_data(frame_factory.build_window_update_frame(1, 5000).serialize())
+        c.receive_data(frame_factory.build_window_update_frame(0, 3000).serialize())
+        frames = helpers.decode_frames(c.data_to_send())
+        assert [(f.stream_id, len(f.data), "END_STREAM" in f.flags) for f in frames] == [
+            (1, 500, False), (1, 1000, False),
+        ]
+
+    def test_closed_streams_are_removed(self, frame_factory) -> None:
+        """
+        Streams are removed from the tree once the connection forgets them,
+        and their dependencies move up.
+        """
+        c = h2.connection.H2Connection(config=self.server_config)
+        c.receive_data(
+            frame_factory.preamble() +
+            frame_factory.build_settings_frame(
+                {h2.settings.SettingCodes.INITIAL_WINDOW_SIZE: 2**20},
+            ).serialize(),
+        )
+        for stream_id in (1, 3):
+            f = frame_factory.build_headers_frame(
+                helpers.EXAMPLE_REQUEST_HEADERS, flags=["END_STREAM"], stream_id=stream_id,
+            )
+            c.receive_data(f.serialize())
+            c.send_headers(stream_id, [(b":status", b"200")])
+        # Fill the connection window, so that data is sent as it opens.
+        c.send_data_buffered(1, b"\x00" * 65535)
+        c.clear_outbound_data_buffer()
+        c.set_scheduler(h2.scheduling.DependencyTreeScheduler(quantum=1000))
+        scheduler = c._scheduler
+        c.receive_data(
+            frame_factory.build_priority_frame(3, 15, depends_on=1).serialize(),
+        )
+        c.send_data_buffered(1, b"x" * 1000)
+        c.receive_data(frame_factory.build_rst_stream_frame(1).serialize())
+
+        assert c.open_inbound_streams == 1
+        assert 1 not in scheduler.tree
+        assert scheduler.tree.priority(3) == (16, 0)
+
+        c.receive_data(
+            frame_factory.build_priority_frame(1, 15, depends_on=3).serialize(),
+        )
+        assert 1 not in scheduler.tree
@@ -0,0 +1,577 @@
+"""
+test_send_buffer
+~~~~~~~~~~~~~~~~
+
+Tests for the SendBuffer, which holds the data waiting to be sent.
+"""
+from __future__ import annotations
+
+import hyperframe.frame
+import pytest
+from hypothesis import given
+from hypothesis.strategies import integers, lists, one_of
+
+import h2.config
+import h2.connection
+import h2.exceptions
+import h2.frame_buffer
+import h2.send_buffer
+
+
+class TestSendBuffer:
+    """
+    Tests of the outbound data buffer.
+    """
+
+    large_size = h2.send_buffer.COPY_THRESHOLD
+    large = b"x" * large_size
+
+    def _data_frame(self, data, flags=()) -> hyperframe.frame.DataFrame:
+        f = hyperframe.frame.DataFrame(1)
+        f.data = data
+        for flag in flags:
+            f.flags.add(flag)
+        return f
+
+    def test_writes_are_coalesced(self) -> None:
+        """
+        Consecutive writes are copied into a single chunk.
+        """
+        buffer = h2.send_buffer.SendBuffer()
+        buffer.write(b"abc")
+        buffer.write(b"")
+        buffer.write(bytearray(b"def"))
+
+        assert len(buffer) == 6
+        assert [bytes(b) for b in buffer.read_buffers()] == [b"abcdef"]
+        assert len(buffer) == 0
+
+    @pytest.mark.parametrize("flags", [(), ("END_STREAM",)])
+    @pytest.mark.parametrize("wrap", [bytes, memoryview])
+    def test_large_payloads_are_not_copied(self, flags, wrap) -> None:
+        """
+        Large immutable DATA payloads are queued as they are, and serialize
+        the same way as with hyperframe.
+        """
+        buffer = h2.send_buffer.SendBuffer()
+        payload = wrap(self.large)
+        f = self._data_frame(payload, flags)
+        buffer.write_frames([f])
+
+        buffers = buffer.read_buffers()
+        assert len(buffers) == 2
+        assert buffers[1] is payload
+        assert b"".join(buffers) == self._data_frame(self.large, flags).serialize()
+        assert f.body_len == len(self.large)
+
+    @pytest.mark.parametrize("payload", [
+        b"x" * (h2.send_buffer.COPY_THRESHOLD - 1),
+        bytearray(b"x" * h2.send_buffer.COPY_THRESHOLD),
+        memoryview(bytearray(b"x" * h2.send_buffer.COPY_THRESHOLD)),
+    ])
+    def test_other_payloads_are_copied(self, payload) -> None:
+        """
+        Small payloads, and payloads that could be changed before they are
+        sent, are copied into the buffer.
+        """
+        buffer = h2.send_buffer.SendBuffer()
+        expected = self._data_frame(bytes(payload)).serialize()
+        buffer.write_frames([self._data_frame(payload)])
+        if not isinstance(payload, bytes):
+            payload[:1] = b"y"
+
+        buffers = buffer.read_buffers()
+        assert len(buffers) == 1
+        assert bytes(buffers[0]) == expected
+
+    def test_padded_frames_are_copied(self) -> None:
+        """
+        Padded DATA frames are serialized by hyperframe.
+        """
+        buffer = h2.send_buffer.SendBuffer()
+        f = self._data_frame(self.large, ["PADDED"])
+        f.pad_length = 3
+        expected = f.serialize()
+        buffer.write_frames([f])
+
+        assert buffer.read() == expected
+
+    def test_partial_reads(self) -> None:
+        """
+        Partial reads return the start of the buffer and keep the rest.
+        """
+        buffer = h2.send_buffer.SendBuffer()
+        buffer.write(b"abc")
+        buffer.write_frames([self._data_frame(self.large)])
+        expected = b"abc" + self._data_frame(self.large).serialize()
+
+        assert buffer.read(2) == expected[:2]
+        assert len(buffer) == len(expected) - 2
+        assert buffer.read(len(expected)) == expected[2:]
+        assert buffer.read(10) == b""
+
+    def test_small_reads_across_chunks(self) -> None:
+        """
+        Reading a buffer in small pieces returns all of it, in order, whatever
+        kind of chunk the pieces come from.
+        """
+        buffer = h2.send_buffer.SendBuffer()
+        expected = b""
+        for i in range(3):
+            buffer.write(b"header %d" % i)
+            f = self._data_frame(bytes([65 + i]) * (self.large_size + i))
+            buffer.write_frames([f])
+            expected += b"header %d" % i + f.serialize()
+
+        pieces = []
+        while len(buffer):
+            pieces.append(buffer.read(100))
+        assert all(len(p) == 100 for p in pieces[:-1])
+        assert b"".join(pieces) == expected
+
+    @pytest.mark.parametrize("amount", [1, 9, 10, 500])
+    def test_read_everything_after_partial_read(self, amount) -> None:
+        """
+        After a partial read, the rest of the buffer can be read in one go,
+        either as bytes or as buffers.
+        """
+        for use_buffers in (False, True):
+            buffer = h2.send_buffer.SendBuffer()
+            buffer.write_frames([self._data_frame(self.large)])
+            buffer.write(b"trailer")
+            expected = self._data_frame(self.large).serialize() + b"trailer"
+
+            assert buffer.read(amount) == expected[:amount]
+            if use_buffers:
+                rest = b"".join(buffer.read_buffers())
+            else:
+                rest = buffer.read()
+            assert rest == expected[amount:]
+
+    def test_partial_reads_from_tail(self) -> None:
+        """
+        Partial reads from the bytearray at the end of the buffer leave it
+        writable, and later writes are kept in order.
+        """
+        buffer = h2.send_buffer.SendBuffer()
+        buffer.write(b"abc")
+        buffer.write(b"def")
+        assert buffer.read(3) == b"abc"
+        buffer.write(b"ghi")
+        assert buffer.read(3) == b"def"
+        buffer.write_frames([self._data_frame(self.large)])
+        buffer.write(b"jkl")
+
+        assert buffer.read(3) == b"ghi"
+        assert buffer.read() == self._data_frame(self.large).serialize() + b"jkl"
+
+    def test_watermarks(self) -> None:
+        """
+        The buffer becomes full at the high watermark, and stays full until
+        it is drained to the low watermark.
+        """
+        buffer = h2.send_buffer.SendBuffer()
+        buffer.high_watermark = 2000
+        buffer.low_watermark = 500
+
+        buffer.write(b"x" * 1000)
+        assert not buffer.full
+        buffer.write_frames([self._data_frame(self.large)])
+        assert buffer.full
+
+        buffer.read(1000)
+        assert buffer.full
+        buffer.read(len(buffer) - 500)
+        assert not buffer.full
+
+        buffer.write_frames([self._data_frame(b"x" * 2000)])
+        assert buffer.full
+        buffer.read_buffers()
+        assert not buffer.full
+
+    def test_clear(self) -> None:
+        """
+        Clearing the buffer discards everything in it.
+        """
+        buffer = h2.send_buffer.SendBuffer()
+        buffer.write(b"abc")
+        buffer.clear()
+        buffer.write(b"def")
+
+        assert buffer.read() == b"def"
+
+
+class TestControlLane:
+    """
+    Tests of sending control frames ahead of queued data.
+    """
+
+    example_request_headers = [
+        (":authority", "example.com"),
+        (":path", "/"),
+        (":scheme", "https"),
+        (":method", "GET"),
+    ]
+
+    def _data_frame(self, stream_id, length) -> hyperframe.frame.DataFrame:
+        f = hyperframe.frame.DataFrame(stream_id)
+        f.data = b"x" * length
+        return f
+
+    def _frames(self, data) -> list:
+        buffer = h2.frame_buffer.FrameBuffer(server=False)
+        buffer.max_frame_size = 2**24 - 1
+        buffer.add_data(data)
+        return [(type(f).__name__, f.stream_id) for f in buffer]
+
+    def test_control_frames_go_first(self) -> None:
+        """
+        Control frames are read ahead of frames queued before them, which keep
+        their own order.
+        """
+        buffer = h2.send_buffer.SendBuffer()
+        buffer.write_frames([
+            hyperframe.frame.HeadersFrame(1, flags=["END_HEADERS"]),
+            self._data_frame(1, 5000),
+            hyperframe.frame.HeadersFrame(3, flags=["END_HEADERS"]),
+            hyperframe.frame.PingFrame(0, flags=["ACK"]),
+            hyperframe.frame.WindowUpdateFrame(0, window_increment=10),
+            hyperframe.frame.WindowUpdateFrame(5, window_increment=10),
+            hyperframe.frame.RstStreamFrame(7),
+            hyperframe.frame.SettingsFrame(0, settings={1: 0}),
+            hyperframe.frame.GoAwayFrame(0),
+        ])
+
+        assert self._frames(buffer.read()) == [
+            ("PingFrame", 0), ("WindowUpdateFrame", 0), ("WindowUpdateFrame", 5),
+            ("RstStreamFrame", 7), ("SettingsFrame", 0), ("GoAwayFrame", 0),
+            ("HeadersFrame", 1), ("DataFrame", 1), ("HeadersFrame", 3),
+        ]
+
+    def test_stream_frames_stay_behind_the_stream(self) -> None:
+        """
+        Control frames for a stream with frames in the data lane are not sent
+        ahead of them.
+        """
+        buffer = h2.send_buffer.SendBuffer()
+        buffer.write_frames([
+            hyperframe.frame.HeadersFrame(1, flags=["END_HEADERS"]),
+            hyperframe.frame.WindowUpdateFrame(1, window_increment=10),
+            hyperframe.frame.RstStreamFrame(1),
+            hyperframe.frame.RstStreamFrame(3),
+        ])
+
+        assert self._frames(buffer.read()) == [
+            ("RstStreamFrame", 3), ("HeadersFrame", 1),
+            ("WindowUpdateFrame", 1), ("RstStreamFrame", 1),
+        ]
+
+        # Once the stream's frames have been read, they are sent ahead again.
+        buffer.write_frames([
+            self._data_frame(3, 100),
+            hyperframe.frame.RstStreamFrame(1),
+        ])
+        assert self._frames(buffer.read()) == [("RstStreamFrame", 1), ("DataFrame", 3)]
+
+    def test_settings_ack_stays_behind_data_lane(self) -> None:
+        """
+        A SETTINGS ACK is not sent ahead of anything in the data lane, which
+        may have been built under the settings it acknowledges. Other SETTINGS
+        frames are.
+        """
+        buffer = h2.send_buffer.SendBuffer()
+        buffer.write_frames([hyperframe.frame.SettingsFrame(0, flags=["ACK"])])
+        buffer.write_frames([
+            self._data_frame(1, 100),
+            hyperframe.frame.SettingsFrame(0, flags=["ACK"]),
+            hyperframe.frame.HeadersFrame(3, flags=["END_HEADERS"]),
+            hyperframe.frame.SettingsFrame(0, flags=["ACK"]),
+            hyperframe.frame.SettingsFrame(0, settings={1: 0}),
+        ])
+
+        assert self._frames(buffer.read()) == [
+            ("SettingsFrame", 0), ("SettingsFrame", 0), ("DataFrame", 1),
+            ("SettingsFrame", 0), ("HeadersFrame", 3), ("SettingsFrame", 0),
+        ]
+
+    def test_settings_ack_stays_behind_large_data(self, frame_factory) -> None:
+        """
+        A SETTINGS ACK lowering the maximum frame size is not sent ahead of
+        DATA frames that were built under the larger size.
+        """
+        c = h2.connection.H2Connection(
+            config=h2.config.H2Configuration(client_side=False),
+        )
+        c.initiate_connection()
+        c.receive_data(
+            frame_factory.preamble() +
+            frame_factory.build_settings_frame({
+                hyperframe.frame.SettingsFrame.MAX_FRAME_SIZE: 2**17,
+                hyperframe.frame.SettingsFrame.INITIAL_WINDOW_SIZE: 2**17,
+            }).serialize() +
+            frame_factory.build_window_update_frame(0, 2**17).serialize() +
+            frame_factory.build_headers_frame(
+                self.example_request_headers, flags=["END_STREAM"],
+            ).serialize(),
+        )
+        c.clear_outbound_data_buffer()
+        c.send_headers(1, [(":status", "200")])
+        c.send_data(1, b"x" * 100000)
+        c.send_data(1, b"x" * 20000)
+        start = c.data_to_send(1000)
+
+        c.receive_data(frame_factory.build_settings_frame({
+            hyperframe.frame.SettingsFrame.MAX_FRAME_SIZE: 16384,
+        }).serialize())
+
+        assert self._frames(start + c.data_to_send()) == [
+            ("HeadersFrame", 1), ("DataFrame", 1), ("DataFrame", 1),
+            ("SettingsFrame", 0),
+        ]
+
+    @pytest.mark.parametrize("use_buffers", [False, True])
+    def test_partly_read_frame_is_finished_first(self, use_buffers) -> None:
+        """
+        A frame that has been partly read from the data lane is finished
+        before any control frames are read.
+        """
+        buffer = h2.send_buffer.SendBuffer()
+        buffer.write_frames([self._data_frame(1, 5000), self._data_frame(3, 5000)])
+        start = buffer.read(100)
+        buffer.write_frames([hyperframe.frame.PingFrame(0)])
+
+        if use_buffers:
+            rest = b"".join(buffer.read_buffers())
+        else:
+            rest = buffer.read(4909) + buffer.read(10) + buffer.read()
+        assert self._frames(start + rest) == [
+            ("DataFrame", 1), ("PingFrame", 0), ("DataFrame", 3),
+        ]
+
+    @pytest.mark.parametrize("use_buffers", [False, True])
+    def test_control_frames_after_full_drain(self, use_buffers) -> None:
+        """
+        Draining the buffer in full leaves it counting the data lane from the
+        right place, so control frames written afterwards are placed the same
+        way whichever way it was drained.
+        """
+        buffer = h2.send_buffer.SendBuffer()
+        buffer.write_frames([
+            hyperframe.frame.HeadersFrame(1, flags=["END_HEADERS"]),
+            self._data_frame(1, 5000),
+        ])
+        if use_buffers:
+            drained = b"".join(buffer.read_buffers())
+        else:
+            drained = buffer.read()
+        assert buffer._data_read == len(drained)
+
+        buffer.write_frames([
+            self._data_frame(1, 100),
+            hyperframe.frame.SettingsFrame(0, flags=["ACK"]),
+            hyperframe.frame.WindowUpdateFrame(1, window_increment=10),
+            hyperframe.frame.WindowUpdateFrame(3, window_increment=10),
+        ])
+        assert self._frames(buffer.read()) == [
+            ("WindowUpdateFrame", 3), ("DataFrame", 1), ("SettingsFrame", 0),
+            ("WindowUpdateFrame", 1),
+        ]
+
+    @given(lists(one_of(integers(0, 4), integers(1, 20000))))
+    def test_frames_are_never_split(self, operations) -> None:
+        """
+        However reads and writes are interleaved, every frame is read whole,
+        and frames on each stream keep their order.
+        """
+        buffer = h2.send_buffer.SendBuffer()
+        written = []
+        output = b""
+        for operation in operations:
+            if operation == 0:
+                f = hyperframe.frame.PingFrame(0)
+            elif operation <= 4:
+                f = self._data_frame(operation, operation * 700)
+            else:
+                output += buffer.read(operation)
+                continue
+            buffer.write_frames([f])
+            written.append((type(f).__name__, f.stream_id))
+        output += buffer.read()
+
+        frames = self._frames(output)
+        assert sorted(frames) == sorted(written)
+        for stream_id in range(1, 5):
+            assert [f for f in frames if f[1] == stream_id] == [f for f in written if f[1] == stream_id]
+
+    def test_ping_ack_skips_queued_data(self, frame_factory) -> None:
+        """
+        A PING ACK is returned by data_to_send ahead of the DATA frames
+        already waiting to be sent.
+        """
+        c = h2.connection.H2Connection(
+            config=h2.config.H2Configuration(client_side=False),
+        )
+        c.initiate_connection()
+        c.receive_data(
+            frame_factory.preamble() +
+            frame_factory.build_headers_frame(
+                self.example_request_headers, flags=["END_STREAM"],
+            ).serialize(),
+        )
+        c.send_headers(1, [(":status", "200")])
+        c.send_data(1, b"x" * 16384)
+        c.receive_data(frame_factory.build_ping_frame(b"12345678").serialize())
+
+        assert self._frames(c.data_to_send()) == [
+            ("SettingsFrame", 0), ("PingFrame", 0), ("HeadersFrame", 1), ("DataFrame", 1),
+        ]
+
+
+class TestBuffersToSend:
+    """
+    Tests of H2Connection.buffers_to_send.
+    """
+
+    example_request_headers = [
+        (":authority", "example.com"),
+        (":path", "/"),
+        (":scheme", "https"),
+        (":method", "GET"),
+    ]
+
+    def test_matches_data_to_send(self, frame_factory) -> None:
+        """
+        The buffers hold the same data as data_to_send would return, with the
+        body passed through without being copied.
+        """
+        body = b"x" * 16384
+        outputs = []
+        for use_buffers in (False, True):
+            c = h2.connection.H2Connection(
+                config=h2.config.H2Configuration(client_side=False),
+            )
+            c.initiate_connection()
+            c.receive_data(
+                frame_factory.preamble() +
+                frame_factory.build_headers_frame(
+                    self.example_request_headers, flags=["END_STREAM"],
+                ).serialize(),
+            )
+            c.send_headers(1, [(":status", "200")])
+            c.send_data(1, body, end_stream=True)
+            frame_factory.refresh_encoder()
+
+            if use_buffers:
+                buffers = c.buffers_to_send()
+                assert any(b is body for b in buffers)
+                outputs.append(b"".join(buffers))
+            else:
+                outputs.append(c.data_to_send())
+
+            assert c.buffers_to_send() == []
+            assert c.data_to_send() == b""
+
+        assert outputs[0] == outputs[1]
+
+
+class TestOutboundBufferWatermarks:
+    """
+    Tests of the outbound buffer watermarks on H2Connection.
+    """
+
+    example_request_headers = [
+        (":authority", "example.com"),
+        (":path", "/"),
+        (":scheme", "https"),
+        (":method", "GET"),
+    ]
+
+    def _connection(self, frame_factory, **kwargs) -> h2.connection.H2Connection:
+        c = h2.connection.H2Connection(
+            config=h2.config.H2Configuration(client_side=False, **kwargs),
+        )
+        c.initiate_connection()
+        c.receive_data(
+            frame_factory.preamble() +
+            frame_factory.build_headers_frame(
+                self.example_request_headers, flags=["END_STREAM"],
+            ).serialize(),
+        )
+        c.send_headers(1, [(":status", "200")])
+        c.clear_outbound_data_buffer()
+        return c
+
+    def test_no_watermark_by_default(self, frame_factory) -> None:
+        """
+        Without a high watermark the buffer is never full.
+        """
+        c = self._connection(frame_factory)
+        for _ in range(3):
+            c.send_data(1, b"x" * 16384)
+
+        assert c.outbound_buffer_size == 3 * (16384 + 9)
+        assert not c.outbound_buffer_full
+
+    def test_full_until_drained(self, frame_factory) -> None:
+        """
+        The buffer is full from the high watermark until it is drained down
+        to the low watermark, which defaults to half the high watermark.
+        """
+        c = self._connection(frame_factory, outbound_buffer_high_watermark=30000)
+        c.send_data(1, b"x" * 16384)
+        assert not c.outbound_buffer_full
+        c.send_data(1, b"x" * 16384)
+        assert c.outbound_buffer_full
+
+        c.data_to_send(10000)
+        assert c.outbound_buffer_size > 15000
+        assert c.outbound_buffer_full
+        c.data_to_send(10000)
+        assert c.outbound_buffer_size <= 15000
+        assert not c.outbound_buffer_full
+
+    def test_low_watermark_above_high_watermark(self, frame_factory) -> None:
+        """
+        A low watermark above the high watermark is treated as equal to it.
+        """
+        c = self._connection(
+            frame_factory,
+            outbound_buffer_high_watermark=1000,
+            outbound_buffer_low_watermark=5000,
+        )
+        c.send_data(1, b"x" * 2000)
+        assert c.outbound_buffer_full
+        c.data_to_send(1009)
+        assert not c.outbound_buffer_full
+
+    def test_strict_mode(self, frame_factory) -> None:
+        """
+        In strict mode, sending data on a full buffer raises an error until
+        the buffer has been drained.
+        """
+        c = self._connection(
+            frame_factory,
+            outbound_buffer_high_watermark=1000,
+            outbound_buffer_low_watermark=0,
+            strict_outbound_buffer=True,
+        )
+        c.send_data(1, b"x" * 2000)
+
+        with pytest.raises(h2.exceptions.OutboundBufferFullError):
+            c.send_data(1, b"x")
+        c.ping(b"\x00" * 8)
+
+        c.data_to_send()
+        c.send_data(1, b"x")
+        assert c.outbound_buffer_size == 10
+
+    def test_non_strict_mode_keeps_buffering(self, frame_factory) -> None:
+        """
+        Without strict mode, data is still accepted on a full buffer.
+        """
+        c = self._connection(frame_factory, outbound_buffer_high_watermark=1000)
+        c.send_data(1, b"x" * 2000)
+        c.send_data(1, b"x" * 2000)
+
+        assert c.outbound_buffer_full
+        assert c.outbound_buffer_size == 2 * 2009
@@ -0,0 +1,325 @@
+"""
+test_send_data_buffered
+~~~~~~~~~~~~~~~~~~~~~~~
+
+Tests for having h2 buffer data until the flow control windows allow it to be
+sent.
+"""
+from __future__ import annotations
+
+import pytest
+
+import h2.config
+import h2.connection
+import h2.exceptions
+import h2.settings
+
+from . import helpers
+
+
+class TestSendDataBuffered:
+    """
+    Tests of send_data_buffered.
+    """
+
+    server_config = h2.config.H2Configuration(client_side=False)
+
+    def test_data_in_window_is_sent_at_once(self, frame_factory) -> None:
+        """
+        Data that fits in the flow control window is sent straight away.
+        """
+        c = h2.connection.H2Connection(config=self.server_config)
+        c.receive_data(frame_factory.preamble())
+        f = frame_factory.build_headers_frame(
+            helpers.EXAMPLE_REQUEST_HEADERS, flags=["END_STREAM"],
+        )
+        c.receive_data(f.serialize())
+        c.send_headers(1, [(b":status", b"200")])
+        c.clear_outbound_data_buffer()
+        c.send_data_buffered(1, b"x" * 20000, end_stream=True)
+
+        expected = (
+            frame_factory.build_data_frame(b"x" * 16384).serialize() +
+            frame_factory.build_data_frame(b"x" * 3616, flags=["END_STREAM"]).serialize()
+        )
+        assert c.data_to_send() == expected
+        assert c.buffered_data_length(1) == 0
+        assert c.local_flow_control_window(1) == 65535 - 20000
+
+    def test_data_beyond_window_is_buffered(self, frame_factory) -> None:
+        """
+        Data beyond the flow control window is held until WINDOW_UPDATE frames
+        open the windows, and the stream is only ended once it has all been
+        sent.
+        """
+        c = h2.connection.H2Connection(config=self.server_config)
+        c.receive_data(frame_factory.preamble())
+        f = frame_factory.build_headers_frame(
+            helpers.EXAMPLE_REQUEST_HEADERS, flags=["END_STREAM"],
+        )
+        c.receive_data(f.serialize())
+        c.send_headers(1, [(b":status", b"200")])
+        c.clear_outbound_data_buffer()
+        data = bytes(range(256)) * 400
+        c.send_data_buffered(1, data[:60000])
+        c.send_data_buffered(1, data[60000:], end_stream=True)
+
+        expected = b"".join(
+            frame_factory.build_data_frame(data[start:end]).serialize()
+            for start, end in (
+                (0, 16384), (16384, 32768), (32768, 49152),
+                (49152, 60000), (60000, 65535),
+            )
+        )
+        assert c.data_to_send() == expected
+        assert c.buffered_data_length(1) == 102400 - 65535
+        assert c.local_flow_control_window(1) == 0
+
+        # Opening only the stream window sends nothing: the connection window
+        # is closed too.
+        c.receive_data(frame_factory.build_window_update_frame(1, 50000).serialize())
+        assert c.data_to_send() == b""
+
+        c.receive_data(frame_factory.build_window_update_frame(0, 20000).serialize())
+        expected = (
+            frame_factory.build_data_frame(data[65535:81919]).serialize() +
+            frame_factory.build_data_frame(data[81919:85535]).serialize()
+        )
+        assert c.data_to_send() == expected
+        assert c.buffered_data_length(1) == 102400 - 85535
+
+        c.receive_data(frame_factory.build_window_update_frame(0, 20000).serialize())
+        expected = (
+            frame_factory.build_data_frame(data[85535:101919]).serialize() +
+            frame_factory.build_data_frame(data[101919:], flags=["END_STREAM"]).serialize()
+        )
+        assert c.data_to_send() == expected
+        assert c.buffered_data_length(1) == 0
+        assert c.outbound_flow_control_window == 3135
+        assert c.streams[1].closed
+
+    def test_buffered_data_is_not_copied(self, frame_factory) -> None:
+        """
+        Buffered data is sent as slices of the original data.
+        """
+        c = h2.connection.H2Connection(config=self.server_config)
+        c.receive_data(frame_factory.preamble())
+        f = frame_factory.build_headers_frame(
+            helpers.EXAMPLE_REQUEST_HEADERS, flags=["END_STREAM"],
+        )
+        c.receive_data(f.serialize())
+        c.send_headers(1, [(b":status", b"200")])
+        c.clear_outbound_data_buffer()
+        data = b"x" * 70000
+        c.send_data_buffered(1, data)
+        c.clear_outbound_data_buffer()
+
+        c.receive_data(
+            frame_factory.build_window_update_frame(0, 10000).serialize() +
+            frame_factory.build_window_update_frame(1, 10000).serialize(),
+        )
+        buffers = c.buffers_to_send()
+        payloads = [b for b in buffers if isinstance(b, memoryview) and b.obj is data]
+        assert [len(p) for p in payloads] == [4465]
+
+    def test_streams_share_window_in_order(self, frame_factory) -> None:
+        """
+        Streams waiting for the connection window are given it in the order in
+        which they first had data buffered.
+        """
+        c = h2.connection.H2Connection(config=self.server_config)
+        c.receive_data(frame_factory.preamble())
+        for stream_id in (1, 3):
+            f = frame_factory.build_headers_frame(
+                helpers.EXAMPLE_REQUEST_HEADERS, flags=["END_STREAM"], stream_id=stream_id,
+            )
+            c.receive_data(f.serialize())
+            c.send_headers(stream_id, [(b":status", b"200")])
+        c.clear_outbound_data_buffer()
+        c.send_data_buffered(3, b"x" * 65535)
+        c.send_data_buffered(3, b"x" * 1000)
+        c.send_data_buffered(1, b"y" * 1000)
+        c.clear_outbound_data_buffer()
+
+        c.receive_data(
+            frame_factory.build_window_update_frame(3, 1000).serialize() +
+            frame_factory.build_window_update_frame(0, 1500).serialize(),
+        )
+        expected = (
+            frame_factory.build_data_frame(b"x" * 1000, stream_id=3).serialize() +
+            frame_factory.build_data_frame(b"y" * 500).serialize()
+        )
+        assert c.data_to_send() == expected
+
+        c.receive_data(frame_factory.build_window_update_frame(0, 1500).serialize())
+        assert c.data_to_send() == frame_factory.build_data_frame(b"y" * 500).serialize()
+        assert c.buffered_data_length(1) == 0
+        assert c.buffered_data_length(3) == 0
+
+    def test_settings_change_sends_buffered_data(self, frame_factory) -> None:
+        """
+        Raising SETTINGS_INITIAL_WINDOW_SIZE sends buffered data, after the
+        SETTINGS acknowledgement.
+        """
+        c = h2.connection.H2Connection(config=self.server_config)
+        c.receive_data(frame_factory.preamble())
+        f = frame_factory.build_headers_frame(
+            helpers.EXAMPLE_REQUEST_HEADERS, flags=["END_STREAM"],
+        )
+        c.receive_data(f.serialize())
+        c.send_headers(1, [(b":status", b"200")])
+        c.clear_outbound_data_buffer()
+        c.send_data_buffered(1, b"x" * 70000)
+        c.clear_outbound_data_buffer()
+        c.receive_data(frame_factory.build_window_update_frame(0, 10000).serialize())
+        assert c.data_to_send() == b""
+
+        c.receive_data(
+            frame_factory.build_settings_frame(
+                {h2.settings.SettingCodes.INITIAL_WINDOW_SIZE: 70000},
+            ).serialize(),
+        )
+        expected = (
+            frame_factory.build_settings_frame({}, ack=True).serialize() +
+            frame_factory.build_data_frame(b"x" * 4465).serialize()
+        )
+        assert c.data_to_send() == expected
+
+    def test_end_stream_without_window(self, frame_factory) -> None:
+        """
+        Ending a stream with no more data does not need any flow control
+        window.
+        """
+        c = h2.connection.H2Connection(config=self.server_config)
+        c.receive_data(frame_factory.preamble())
+        f = frame_factory.build_headers_frame(
+            helpers.EXAMPLE_REQUEST_HEADERS, flags=["END_STREAM"],
+        )
+        c.receive_data(f.serialize())
+        c.send_headers(1, [(b":status", b"200")])
+        c.clear_outbound_data_buffer()
+        c.send_data_buffered(1, b"x" * 65535)
+        c.send_data_buffered(1, b"", end_stream=True)
+
+        expected = frame_factory.build_data_frame(b"", flags=["END_STREAM"])
+        assert c.data_to_send().endswith(expected.serialize())
+        assert c.streams[1].closed
+
+    def test_end_stream_waits_for_data(self, frame_factory) -> None:
+        """
+        Ending a stream with no more data waits for data already buffered.
+        """
+        c = h2.connection.H2Connection(config=self.server_config)
+        c.receive_data(frame_factory.preamble())
+        f = frame_factory.build_headers_frame(
+            helpers.EXAMPLE_REQUEST_HEADERS, flags=["END_STREAM"],
+        )
+        c.receive_data(f.serialize())
+        c.send_headers(1, [(b":status", b"200")])
+        c.clear_outbound_data_buffer()
+        c.send_data_buffered(1, b"x" * 70000)
+        c.send_data_buffered(1, b"", end_stream=True)
+        c.clear_outbound_data_buffer()
+        assert not c.streams[1].closed
+
+        c.receive_data(
+            frame_factory.build_window_update_frame(0, 10000).serialize() +
+            frame_factory.build_window_update_frame(1, 10000).serialize(),
+        )
+        expected = frame_factory.build_data_frame(b"x" * 4465, flags=["END_STREAM"])
+        assert c.data_to_send() == expected.serialize()
+
+    @pytest.mark.parametrize(
+        "send",
+        [
+            lambda c: c.send_data(1, b"x"),
+            lambda c: c.send_data_chunked(1, b"x"),
+            lambda c: c.end_stream(1),
+            lambda c: c.send_headers(1, [(b"x-trailer", b"1")], end_stream=True),
+        ],
+    )
+    def test_cannot_send_while_buffered(self, frame_factory, send) -> None:
+        """
+        Nothing else can be sent on a stream while it has buffered data.
+        """
+        c = h2.connection.H2Connection(config=self.server_config)
+        c.receive_data(frame_factory.preamble())
+        f = frame_factory.build_headers_frame(
+            helpers.EXAMPLE_REQUEST_HEADERS, flags=["END_STREAM"],
+        )
+        c.receive_data(f.serialize())
+        c.send_headers(1, [(b":status", b"200")])
+        c.clear_outbound_data_buffer()
+        c.send_data_buffered(1, b"x" * 70000)
+        c.receive_data(frame_factory.build_window_update_frame(0, 10000).serialize())
+
+        with pytest.raises(h2.exceptions.ProtocolError):
+            send(c)
+
+    def test_cannot_buffer_after_end_stream(self, frame_factory) -> None:
+        """
+        No more data can be buffered once the end of the stream has been.
+        """
+        c = h2.connection.H2Connection(config=self.server_config)
+        c.receive_data(frame_factory.preamble())
+        f = frame_factory.build_headers_frame(
+            helpers.EXAMPLE_REQUEST_HEADERS, flags=["END_STREAM"],
+        )
+        c.receive_data(f.serialize())
+        c.send_headers(1, [(b":status", b"200")])
+        c.clear_outbound_data_buffer()
+        c.send_data_buffered(1, b"x" * 70000, end_stream=True)
+
+        with pytest.raises(h2.exceptions.ProtocolError):
+            c.send_data_buffered(1, b"x")
+
+    def test_cannot_buffer_on_ended_stream(self, frame_factory) -> None:
+        """
+        Data cannot be buffered on a stream in a state that does not allow data
+        to be sent.
+        """
+        c = h2.connection.H2Connection(config=self.server_config)
+        c.receive_data(frame_factory.preamble())
+        f = frame_factory.build_headers_frame(
+            helpers.EXAMPLE_REQUEST_HEADERS, flags=["END_STREAM"],
+        )
+        c.receive_data(f.serialize())
+        c.send_headers(1, [(b":status", b"200")])
+        c.clear_outbound_data_buffer()
+        c.end_stream(1)
+
+        with pytest.raises(h2.exceptions.ProtocolError):
+            c.send_data_buffered(1, b"x")
+        assert c.buffered_data_length(1) == 0
+
+    def test_reset_discards_buffered_data(self, frame_factory) -> None:
+        """
+        Resetting a stream discards its buffered data, whether or not the
+        stream has been cleaned up by the time the windows open.
+        """
+        c = h2.connection.H2Connection(config=self.server_config)
+        c.receive_data(frame_factory.preamble())
+        for stream_id in (1, 3):
+            f = frame_factory.build_headers_frame(
+                helpers.EXAMPLE_REQUEST_HEADERS, flags=["END_STREAM"], stream_id=stream_id,
+            )
+            c.receive_data(f.serialize())
+            c.send_headers(stream_id, [(b":status", b"200")])
+        c.clear_outbound_data_buffer()
+        c.send_data_buffered(1, b"x" * 70000)
+        c.send_data_buffered(3, b"y" * 1000)
+        c.reset_stream(1)
+        assert c.buffered_data_length(1) == 0
+        c.clear_outbound_data_buffer()
+
+        # Counting the open streams cleans up stream 1, but stream 3 is
+        # still known when the connection window opens.
+        assert c.open_inbound_streams == 1
+        assert 1 not in c.streams
+        c.receive_data(frame_factory.build_rst_stream_frame(3).serialize())
+        c.receive_data(frame_factory.build_window_update_frame(0, 2000).serialize())
+
+        assert c.data_to_send() == b""
+        assert c.streams[3].closed
+        assert c.streams[3].buffered_data_length == 0
+        assert not c._scheduler._streams
@@ -0,0 +1,140 @@
+"""
+test_send_data_chunked
+~~~~~~~~~~~~~~~~~~~~~~
+
+Tests for sending data larger than the maximum frame size in one call.
+"""
+from __future__ import annotations
+
+import pytest
+
+import h2.config
+import h2.connection
+import h2.exceptions
+import h2.settings
+
+from . import helpers
+
+
+class TestSendDataChunked:
+    """
+    Tests of send_data_chunked.
+    """
+
+    server_config = h2.config.H2Configuration(client_side=False)
+
+    @pytest.mark.parametrize("size", [0, 1, 16384, 16385, 50000])
+    @pytest.mark.parametrize("end_stream", [False, True])
+    def test_frames_are_split(self, frame_factory, size, end_stream) -> None:
+        """
+        send_data_chunked sends the data in frames of the maximum frame size,
+        and ends the stream on the last one.
+        """
+        data = bytes(range(256)) * (size // 256) + b"x" * (size % 256)
+        c = h2.connection.H2Connection(config=self.server_config)
+        c.receive_data(frame_factory.preamble())
+        f = frame_factory.build_headers_frame(
+            helpers.EXAMPLE_REQUEST_HEADERS, flags=["END_STREAM"],
+        )
+        c.receive_data(f.serialize())
+        c.send_headers(1, [(b":status", b"200")])
+        c.clear_outbound_data_buffer()
+
+        chunks = [data[i:i + 16384] for i in range(0, size, 16384)] or [b""]
+        expected = b"".join(
+            frame_factory.build_data_frame(
+                chunk,
+                flags=["END_STREAM"] if end_stream and i == len(chunks) - 1 else [],
+            ).serialize()
+            for i, chunk in enumerate(chunks)
+        )
+
+        c.send_data_chunked(1, data, end_stream=end_stream)
+
+        assert c.data_to_send() == expected
+        assert c.outbound_flow_control_window == 65535 - size
+        assert c.local_flow_control_window(1) == 65535 - size
+        assert c.streams[1].closed == end_stream
+
+    def test_frames_refer_to_data(self, frame_factory) -> None:
+        """
+        The frames carry slices of the data rather than copies of it.
+        """
+        data = b"x" * 40000
+        c = h2.connection.H2Connection(config=self.server_config)
+        c.receive_data(frame_factory.preamble())
+        f = frame_factory.build_headers_frame(
+            helpers.EXAMPLE_REQUEST_HEADERS, flags=["END_STREAM"],
+        )
+        c.receive_data(f.serialize())
+        c.send_headers(1, [(b":status", b"200")])
+        c.clear_outbound_data_buffer()
+        c.send_data_chunked(1, data)
+
+        buffers = c.buffers_to_send()
+        payloads = [b for b in buffers if isinstance(b, memoryview) and b.obj is data]
+        assert [len(p) for p in payloads] == [16384, 16384, 7232]
+
+    def test_respects_max_frame_size(self, frame_factory) -> None:
+        """
+        Frames are split at the peer's maximum frame size.
+        """
+        c = h2.connection.H2Connection(config=self.server_config)
+        c.receive_data(frame_factory.preamble())
+        f = frame_factory.build_headers_frame(
+            helpers.EXAMPLE_REQUEST_HEADERS, flags=["END_STREAM"],
+        )
+        c.receive_data(f.serialize())
+        c.send_headers(1, [(b":status", b"200")])
+        c.clear_outbound_data_buffer()
+        c.receive_data(
+            frame_factory.build_settings_frame({
+                h2.settings.SettingCodes.MAX_FRAME_SIZE: 20000,
+            }).serialize(),
+        )
+        c.clear_outbound_data_buffer()
+        c.send_data_chunked(1, b"x" * 30000)
+
+        buffers = c.buffers_to_send()
+        assert [len(b) for b in buffers if len(b) > 9] == [20000, 10000]
+
+    def test_flow_control_window_exceeded(self, frame_factory) -> None:
+        """
+        Data beyond the flow control window is rejected without sending
+        anything.
+        """
+        c = h2.connection.H2Connection(config=self.server_config)
+        c.receive_data(frame_factory.preamble())
+        f = frame_factory.build_headers_frame(
+            helpers.EXAMPLE_REQUEST_HEADERS, flags=["END_STREAM"],
+        )
+        c.receive_data(f.serialize())
+        c.send_headers(1, [(b":status", b"200")])
+        c.clear_outbound_data_buffer()
+
+        with pytest.raises(h2.exceptions.FlowControlError):
+            c.send_data_chunked(1, b"x" * 65536)
+        assert c.data_to_send() == b""
+        assert c.local_flow_control_window(1) == 65535
+
+    def test_strict_outbound_buffer(self, frame_factory) -> None:
+        """
+        In strict mode, data is rejected while the outbound buffer is full.
+        """
+        c = h2.connection.H2Connection(
+            config=h2.config.H2Configuration(
+                client_side=False,
+                outbound_buffer_high_watermark=100,
+                strict_outbound_buffer=True,
+            ),
+        )
+        c.receive_data(frame_factory.preamble())
+        f = frame_factory.build_headers_frame(
+            helpers.EXAMPLE_REQUEST_HEADERS, flags=["END_STREAM"],
+        )
+        c.receive_data(f.serialize())
+        c.send_headers(1, [(b":status", b"200")])
+        c.send_data_chunked(1, b"x" * 200)
+
+        with pytest.raises(h2.exceptions.OutboundBufferFullError):
+            c.send_data_chunked(1, b"x")
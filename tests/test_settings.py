@@ -53,6 +53,7 @@ class TestSettings:
             h2.settings.SettingCodes.MAX_CONCURRENT_STREAMS: 100,
             h2.settings.SettingCodes.MAX_HEADER_LIST_SIZE: 2**16,
             h2.settings.SettingCodes.ENABLE_CONNECT_PROTOCOL: 1,
+            h2.settings.SettingCodes.NO_RFC7540_PRIORITIES: 1,
         }
         s = h2.settings.Settings(client=client, initial_values=overrides)
 
@@ -63,6 +64,7 @@ class TestSettings:
         assert s[h2.settings.SettingCodes.MAX_CONCURRENT_STREAMS] == 100
         assert s[h2.settings.SettingCodes.MAX_HEADER_LIST_SIZE] == 2**16
         assert s[h2.settings.SettingCodes.ENABLE_CONNECT_PROTOCOL] == 1
+        assert s[h2.settings.SettingCodes.NO_RFC7540_PRIORITIES] == 1
 
     @pytest.mark.parametrize(
         ("setting", "value"),
@@ -75,6 +77,7 @@ class TestSettings:
             (h2.settings.SettingCodes.MAX_FRAME_SIZE, 2**30),
             (h2.settings.SettingCodes.MAX_HEADER_LIST_SIZE, -1),
             (h2.settings.SettingCodes.ENABLE_CONNECT_PROTOCOL, -1),
+            (h2.settings.SettingCodes.NO_RFC7540_PRIORITIES, 2),
         ],
     )
     def test_cannot_set_invalid_initial_values(self, setting, value) -> None:
@@ -239,6 +242,7 @@ class TestSettings:
         assert s.enable_connect_protocol == s[
             h2.settings.SettingCodes.ENABLE_CONNECT_PROTOCOL
         ]
+        assert s.no_rfc7540_priorities == 0
 
     def test_settings_setters(self) -> None:
         """
@@ -253,6 +257,7 @@ class TestSettings:
         s.max_concurrent_streams = 4
         s.max_header_list_size = 2**16
         s.enable_connect_protocol = 1
+        s.no_rfc7540_priorities = 1
 
         s.acknowledge()
         assert s[h2.settings.SettingCodes.HEADER_TABLE_SIZE] == 0
@@ -262,6 +267,7 @@ class TestSettings:
         assert s[h2.settings.SettingCodes.MAX_CONCURRENT_STREAMS] == 4
         assert s[h2.settings.SettingCodes.MAX_HEADER_LIST_SIZE] == 2**16
         assert s[h2.settings.SettingCodes.ENABLE_CONNECT_PROTOCOL] == 1
+        assert s[h2.settings.SettingCodes.NO_RFC7540_PRIORITIES] == 1
 
     @given(integers())
     def test_cannot_set_invalid_values_for_enable_push(self, val) -> None:
@@ -392,6 +398,21 @@ class TestSettings:
         assert e.value.error_code == h2.errors.ErrorCodes.PROTOCOL_ERROR
         assert s[h2.settings.SettingCodes.ENABLE_CONNECT_PROTOCOL] == 0
 
+    @given(integers())
+    def test_cannot_set_invalid_values_for_no_rfc7540_priorities(self, val) -> None:
+        """
+        SETTINGS_NO_RFC7540_PRIORITIES only allows two values: 0, 1.
+        """
+        assume(val not in (0, 1))
+        s = h2.settings.Settings()
+
+        with pytest.raises(h2.exceptions.InvalidSettingsValueError) as e:
+            s.no_rfc7540_priorities = val
+
+        s.acknowledge()
+        assert e.value.error_code == h2.errors.ErrorCodes.PROTOCOL_ERROR
+        assert s.no_rfc7540_priorities == 0
+
 
 class TestSettingsEquality:
     """